@@ -0,0 +1,54 @@
+import numpy as np
+from scipy.interpolate import RegularGridInterpolator
+
+from core.atmos.shared import bname_to_slotnum
+from core.atmos.run.l2r.ac import apply_dsf
+
+from benchmarks.registry import benchmark
+from benchmarks.synthetic import make_array
+
+LUT_NAMES = ['MOD1', 'MOD2']
+BAND_WAVES = {'B2': 492., 'B3': 560., 'B4': 665., 'B8': 833.}
+
+# per pixel dark spectrum fitting with a reverse lut and min_dtau model selection, no lut files are needed
+DSF_SETTINGS = {
+    'dsf_aot_estimate': 'resolved', 'dsf_spectrum_option': 'darkest', 'dsf_allow_lut_boundaries': False, 'dsf_fixed_aot': None,
+    'dsf_nbands': 2, 'dsf_nbands_fit': 2, 'dsf_aot_compute': 'min', 'dsf_filter_aot': False, 'dsf_smooth_aot': False,
+    'dsf_model_selection': 'min_dtau', 'dsf_aot_most_common_model': True, 'dsf_percentile': 1, 'dsf_intercept_pixels': 1000,
+    'dsf_exclude_bands': [], 'dsf_filter_rhot': False, 'min_tgas_aot': 0.85, 'dsf_wave_range': [400, 2500],
+    'dsf_filter_box': [10, 10], 'dsf_filter_percentile': 50, 'dsf_min_tile_cover': 0.1, 'resolved_geometry': True,
+    'dsf_aot_fillnan': True, 'dsf_min_tile_aot': 0.01, 'dsf_max_tile_aot': 1.2
+}
+
+def _rev_lut(band_slots:list[str], scale:float) -> dict:
+    # (pressure, raa, vza, sza, rhot) -> aot, increasing with rhot and the path length
+    grid = (np.array([900., 1013.25, 1100.]), np.linspace(0., 180., 5), np.linspace(0., 60., 4), np.linspace(0., 80., 5), np.linspace(0., 0.5, 32))
+    mesh = np.meshgrid(*grid, indexing='ij')
+    path = 1. / np.cos(np.radians(mesh[2])) + 1. / np.cos(np.radians(mesh[3]))
+    rgi = {}
+    for i, band_slot in enumerate(band_slots):
+        aot = scale * (i + 1) * mesh[4] * path * mesh[0] / 1013.25
+        rgi[bname_to_slotnum(band_slot)] = RegularGridInterpolator(grid, aot, bounds_error=False, fill_value=None)
+    return {'rgi': rgi, 'minaot': 0.001, 'maxaot': 5.}
+
+@benchmark('apply_dsf', group='atmos')
+def bench_apply_dsf(size, tmp_dir):
+    width, height, _ = size
+    rhot = make_array((width, height, len(BAND_WAVES)))
+
+    band_table = {}
+    for i, (band_slot, wave) in enumerate(BAND_WAVES.items()):
+        band_table[band_slot] = {'data': rhot[i], 'att': {'rhot_ds': f'rhot_{int(wave)}', 'tt_gas': 0.95,
+                                                          'wave_nm': wave, 'wave_name': f'{int(wave)}'}}
+    l1r_band_list = [b['att']['rhot_ds'] for b in band_table.values()]
+
+    var_mem = {'pressure': np.full((height, width), 1013.25, dtype=np.float32),
+               'raa': np.full((height, width), 90., dtype=np.float32),
+               'vza': np.full((height, width), 5., dtype=np.float32),
+               'sza': np.full((height, width), 40., dtype=np.float32),
+               'wind': np.full((height, width), 2., dtype=np.float32)}
+    rev_lut_table = {lut_name: _rev_lut(list(BAND_WAVES), scale) for lut_name, scale in zip(LUT_NAMES, [1., 1.5])}
+
+    return lambda: apply_dsf(band_table=band_table, var_mem=var_mem, lut_table={}, rsrd={}, lut_mod_names=LUT_NAMES,
+                             l1r_band_list=l1r_band_list, ro_type='romix', user_settings=dict(DSF_SETTINGS),
+                             use_rev_lut=True, rev_lut_table=rev_lut_table)
@@ -0,0 +1,32 @@
+import numpy as np
+
+from core.util import lee_filter, calculate_back_coef, tiles_interp, fillnan
+
+from benchmarks.registry import benchmark
+from benchmarks.synthetic import make_array, make_bands
+
+TILE_SIZE = 100
+
+@benchmark('lee_filter', group='filters')
+def bench_lee_filter(size, tmp_dir):
+    img = make_array(size)[0]
+    return lambda: lee_filter(img, 5)
+
+@benchmark('calculate_back_coef', group='filters')
+def bench_calculate_back_coef(size, tmp_dir):
+    bands = make_bands(size)
+    return lambda: calculate_back_coef(bands)
+
+@benchmark('fillnan', group='filters')
+def bench_fillnan(size, tmp_dir):
+    data = make_array(size, nan_ratio=0.2)[0]
+    return lambda: fillnan(data)
+
+@benchmark('tiles_interp', group='filters')
+def bench_tiles_interp(size, tmp_dir):
+    # tiled aot of the dark spectrum fitting interpolated to the full scene
+    width, height, _ = size
+    tiles = make_array((max(2, width // TILE_SIZE), max(2, height // TILE_SIZE), 1), nan_ratio=0.1)[0]
+    xnew = np.linspace(0, tiles.shape[1] - 1, width, dtype=np.float32)
+    ynew = np.linspace(0, tiles.shape[0] - 1, height, dtype=np.float32)
+    return lambda: tiles_interp(tiles, xnew, ynew, smooth=True, kern_size=3, method='linear')
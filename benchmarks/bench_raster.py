@@ -0,0 +1,85 @@
+import os
+from osgeo import gdal
+
+from core.raster.funcs import read_band_from_raw, update_raw_from_cache
+from core.raster.funcs.writer import get_writer
+from core.util.gdal import mosaic_tiles, ds_to_fileinfos, merge, warp_gdal, stack_vrt, mosaic_vrt, materialize_ds, COG_PROFILE
+
+from benchmarks.registry import benchmark
+from benchmarks.synthetic import make_ds, read_raster
+
+WARP_PARAMS = {'crs': 'EPSG:4326', 'resamplingName': 'bilinear'}
+
+@benchmark('read_band_from_raw', group='raster')
+def bench_read_band_from_raw(size, tmp_dir):
+    raster = read_raster(size, tmp_dir)
+    return lambda: read_band_from_raw(raster, add_to_cache=True)
+
+@benchmark('update_raw_from_cache', group='raster')
+def bench_update_raw_from_cache(size, tmp_dir):
+    raster = read_band_from_raw(read_raster(size, tmp_dir), add_to_cache=True)
+    for band in raster.bands.values():
+        band['value'] = band['value'] * 2
+    return lambda: update_raw_from_cache(raster)
+
+def _tiles(size):
+    # 2 x 2 tiles covering the synthetic scene
+    width, height, bands = size
+    tile_size = (width // 2, height // 2, bands)
+    return [make_ds(tile_size, ulx=300000. + x * tile_size[0] * 10., uly=4000000. - y * tile_size[1] * 10.)
+            for y in range(2) for x in range(2)]
+
+@benchmark('mosaic_tiles', group='raster')
+def bench_mosaic_tiles(size, tmp_dir):
+    file_infos = ds_to_fileinfos(_tiles(size))
+    return lambda: mosaic_tiles(file_infos)
+
+@benchmark('mosaic_vrt_materialized', group='raster')
+def bench_mosaic_vrt(size, tmp_dir):
+    datasets = _tiles(size)
+    return lambda: materialize_ds(mosaic_vrt(datasets))
+
+@benchmark('merge', group='raster')
+def bench_merge(size, tmp_dir):
+    datasets = [make_ds(size), make_ds(size)]
+    return lambda: merge(datasets)
+
+@benchmark('stack_vrt_materialized', group='raster')
+def bench_stack_vrt(size, tmp_dir):
+    datasets = [make_ds(size), make_ds(size)]
+    return lambda: materialize_ds(stack_vrt(datasets))
+
+@benchmark('warp_gdal', group='raster')
+def bench_warp_gdal(size, tmp_dir):
+    ds = make_ds(size)
+    return lambda: warp_gdal(ds, dict(WARP_PARAMS), lazy=False)
+
+@benchmark('warp_gdal_vrt_materialized', group='raster')
+def bench_warp_gdal_vrt(size, tmp_dir):
+    ds = make_ds(size)
+    return lambda: materialize_ds(warp_gdal(ds, dict(WARP_PARAMS)))
+
+def _bench_write(size, tmp_dir, name, **write_options):
+    raster = read_raster(size, tmp_dir)
+    out_path = os.path.join(tmp_dir, f'write_{name}.tif')
+
+    def run():
+        get_writer(raster).write(out_path, **write_options)
+        gdal.Unlink(out_path)
+    return run
+
+@benchmark('write_gtiff_uncompressed', group='write')
+def bench_write_uncompressed(size, tmp_dir):
+    return _bench_write(size, tmp_dir, 'uncompressed', compress=False, tiled=False)
+
+@benchmark('write_gtiff_default', group='write')
+def bench_write_default(size, tmp_dir):
+    return _bench_write(size, tmp_dir, 'default')
+
+@benchmark('write_gtiff_lzw_single_thread', group='write')
+def bench_write_lzw(size, tmp_dir):
+    return _bench_write(size, tmp_dir, 'lzw', compress='lzw', num_threads=1)
+
+@benchmark('write_cog', group='write')
+def bench_write_cog(size, tmp_dir):
+    return _bench_write(size, tmp_dir, 'cog', profile=COG_PROFILE, overviews=True)
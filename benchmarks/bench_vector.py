@@ -0,0 +1,49 @@
+import os
+from osgeo import gdal, ogr, osr
+
+from core.util import ModuleType
+from core.vector import Vector
+from core.vector.funcs import VectorMerger
+
+from benchmarks.registry import benchmark
+from benchmarks.synthetic import EPSG
+
+MERGE_LAYERS = 20
+MERGE_FEATURES = 100000
+
+def make_gpkg(features:int, out_dir:str, name:str) -> str:
+    # a row of unit squares with an id and a value
+    out_path = os.path.join(out_dir, f'{name}_{features}.gpkg')
+    if os.path.exists(out_path):
+        return out_path
+
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(EPSG)
+    ds = ogr.GetDriverByName('GPKG').CreateDataSource(out_path)
+    layer = ds.CreateLayer(name, srs, ogr.wkbPolygon)
+    layer.CreateField(ogr.FieldDefn('fid_src', ogr.OFTInteger))
+    layer.CreateField(ogr.FieldDefn('value', ogr.OFTReal))
+
+    layer.StartTransaction()
+    for i in range(features):
+        feat = ogr.Feature(layer.GetLayerDefn())
+        feat.SetField('fid_src', i)
+        feat.SetField('value', i * 0.5)
+        feat.SetGeometry(ogr.CreateGeometryFromWkt(f'POLYGON (({i} 0,{i + 1} 0,{i + 1} 1,{i} 1,{i} 0))'))
+        layer.CreateFeature(feat)
+    layer.CommitTransaction()
+    ds = None
+    return out_path
+
+@benchmark('vector_merge', group='vector')
+def bench_vector_merge(size, tmp_dir):
+    # MERGE_LAYERS layers of MERGE_FEATURES features from the medium size on, fewer for the small one
+    width, height, _ = size
+    features = min(MERGE_FEATURES, width * height // 32)
+
+    vectors = []
+    for i in range(MERGE_LAYERS):
+        vector = Vector.create('', ModuleType.GDAL)
+        vector.raw = gdal.OpenEx(make_gpkg(features, tmp_dir, f'layer_{i}'), gdal.OF_VECTOR)
+        vectors.append(vector)
+    return lambda: VectorMerger.merge(vectors)
@@ -0,0 +1,19 @@
+from typing import Callable
+
+BENCHMARKS:dict[str, dict] = {}
+
+# synthetic raster sizes (width, height, bands), overridden by --width, --height and --bands of run_benchmarks.py
+SIZES = {
+    'small': (512, 512, 4),
+    'medium': (2048, 2048, 4),
+    'large': (8192, 8192, 4)
+}
+
+def benchmark(name:str, group:str):
+    # the decorated function does the setup for a given size and returns the function to be timed,
+    # it is called again before every repeat so inputs changed in place are not reused
+    def wrap(setup:Callable[[tuple[int, int, int], str], Callable[[], object]]):
+        assert name not in BENCHMARKS, f'benchmark {name} is already registered'
+        BENCHMARKS[name] = {'group': group, 'setup': setup}
+        return setup
+    return wrap
@@ -0,0 +1,141 @@
+## benchmarks of the core hot paths on synthetic rasters, offline and on cpu only
+## python -m benchmarks.run_benchmarks --size small                       # run and compare with benchmarks/baseline.json
+## python -m benchmarks.run_benchmarks --size small --save_baseline       # record the baseline of the reference machine
+## once a baseline of the size is recorded, a benchmark without one fails the run unless --allow_missing_baseline is given
+
+import os, sys, json, time, platform, tempfile, importlib, statistics
+from argparse import ArgumentParser
+from pathlib import Path
+from datetime import datetime
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+os.environ.setdefault('PROJECT_PATH', str(ROOT_DIR))
+
+from benchmarks.registry import BENCHMARKS, SIZES
+
+BENCHMARK_MODULES = ['benchmarks.bench_raster', 'benchmarks.bench_filters', 'benchmarks.bench_atmos', 'benchmarks.bench_vector']
+BASELINE_PATH = ROOT_DIR / 'benchmarks' / 'baseline.json'
+DEFAULT_TOLERANCE = 0.25
+
+def parse_args():
+    parser = ArgumentParser(description="benchmarks of core hot paths on synthetic rasters")
+    parser.add_argument('--size', default='small', choices=list(SIZES.keys()), help="size of the synthetic rasters")
+    parser.add_argument('--width', type=int, help="overrides the width of the size")
+    parser.add_argument('--height', type=int, help="overrides the height of the size")
+    parser.add_argument('--bands', type=int, help="overrides the number of bands of the size")
+    parser.add_argument('--repeat', type=int, default=5, help="number of timed runs of each benchmark")
+    parser.add_argument('--filter', default='', help="runs the benchmarks whose name or group contains this text")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help="baseline json to compare with")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown against the baseline, 0.25 = 25%%")
+    parser.add_argument('--save_baseline', action='store_true', help="writes the results to the baseline json")
+    parser.add_argument('--allow_missing_baseline', action='store_true', help="benchmarks without a baseline only warn instead of failing the run")
+    parser.add_argument('--out_path', help="json path to write the results")
+    return parser.parse_args()
+
+def load_benchmarks() -> dict[str, str]:
+    # a module whose dependencies are not installed is skipped, the reason is kept in the results
+    skipped = {}
+    for module_name in BENCHMARK_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            skipped[module_name] = str(e)
+    return skipped
+
+def run_benchmark(setup, size:tuple[int, int, int], repeat:int, tmp_dir:str) -> dict:
+    times = []
+    for _ in range(repeat):
+        run = setup(size, tmp_dir)
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+        run = None
+
+    return {'median': statistics.median(times), 'min': min(times), 'max': max(times), 'repeat': repeat}
+
+def compare(results:dict, baseline:dict, tolerance:float) -> tuple[list[str], list[str]]:
+    # names of the regressed benchmarks and of the ones without a baseline, which can not be checked
+    regressions, missing = [], []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f'{name:40s} {result["median"]:10.4f}s  NO BASELINE')
+            missing.append(name)
+            continue
+
+        ratio = result['median'] / baseline[name]['median']
+        mark = 'REGRESSION' if ratio > 1 + tolerance else ''
+        print(f'{name:40s} {result["median"]:10.4f}s  baseline {baseline[name]["median"]:10.4f}s  x{ratio:5.2f} {mark}')
+        if mark:
+            regressions.append(name)
+
+    # benchmarks of the baseline which did not run, e.g. their module could not be imported
+    for name in baseline:
+        if name not in results:
+            print(f'{name:40s} NOT RUN')
+            missing.append(name)
+    return regressions, missing
+
+def main(args) -> int:
+    width, height, bands = SIZES[args.size]
+    size = (args.width or width, args.height or height, args.bands or bands)
+    size_key = f'{size[0]}x{size[1]}x{size[2]}'
+
+    skipped = load_benchmarks()
+    for module_name, reason in skipped.items():
+        print(f'skipped {module_name}: {reason}')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, bench in BENCHMARKS.items():
+            if args.filter and args.filter not in name and args.filter not in bench['group']:
+                continue
+            results[name] = run_benchmark(bench['setup'], size, args.repeat, tmp_dir)
+            results[name]['group'] = bench['group']
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+                    'python': sys.version.split()[0]},
+        'sizes': {size_key: results},
+        'skipped': skipped
+    }
+
+    if args.out_path:
+        with open(args.out_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path) as f:
+            baseline_report = json.load(f)
+        baseline = baseline_report.get('sizes', {}).get(size_key, {})
+        if args.filter:
+            baseline = {name: b for name, b in baseline.items() if args.filter in name or args.filter in b.get('group', '')}
+    # until a baseline of the size is recorded, nothing can be compared and missing benchmarks only warn
+    baseline_recorded = len(baseline) > 0
+
+    regressions, missing = compare(results, baseline, args.tolerance)
+
+    if args.save_baseline:
+        # results of other sizes and of the benchmarks filtered out are kept
+        baseline_report = {'sizes': {}}
+        if baseline_path.exists():
+            with open(baseline_path) as f:
+                baseline_report = json.load(f)
+        baseline_report.update({k: report[k] for k in ['created', 'machine', 'skipped']})
+        baseline_report.setdefault('sizes', {}).setdefault(size_key, {}).update(results)
+        with open(baseline_path, 'w') as f:
+            json.dump(baseline_report, f, indent=2)
+        print(f'baseline is written to {baseline_path}')
+        return 0
+
+    if len(missing) > 0 or len(skipped) > 0:
+        print(f'WARNING : {len(missing)} benchmarks and {len(skipped)} skipped modules are not compared with the baseline of {size_key} '
+              f'in {baseline_path}, record it with --save_baseline on the reference machine')
+        if baseline_recorded and not args.allow_missing_baseline:
+            return 1
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
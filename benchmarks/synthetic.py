@@ -0,0 +1,39 @@
+import os
+import numpy as np
+from osgeo import gdal, osr
+
+from core.logic import Context
+from core.operations import Read
+from core.util.gdal import create_ds_with_arr
+
+SEED = 0
+EPSG = 32652
+
+def make_array(size:tuple[int, int, int], dtype:str='float32', nan_ratio:float=0.) -> np.ndarray:
+    # speckle like positive values, reproducible for the same size
+    width, height, bands = size
+    rng = np.random.default_rng(SEED)
+    arr = rng.gamma(shape=1., scale=0.1, size=(bands, height, width)).astype(dtype)
+
+    if nan_ratio > 0:
+        arr[rng.random(arr.shape) < nan_ratio] = np.nan
+    return arr
+
+def make_bands(size:tuple[int, int, int], dtype:str='float32') -> dict:
+    arr = make_array(size, dtype)
+    return {f'band_{i+1}': {'value': arr[i], 'no_data': 0} for i in range(arr.shape[0])}
+
+def make_ds(size:tuple[int, int, int], dtype:str='float32', ulx:float=300000., uly:float=4000000., psize:float=10.) -> gdal.Dataset:
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(EPSG)
+    return create_ds_with_arr(make_array(size, dtype), gdal_format='MEM', proj_wkt=srs.ExportToWkt(),
+                              transform=(ulx, psize, 0, uly, 0, -psize), no_data=0)
+
+def make_tif(size:tuple[int, int, int], out_dir:str, name:str='synthetic', dtype:str='float32') -> str:
+    out_path = os.path.join(out_dir, f'{name}_{size[0]}x{size[1]}x{size[2]}.tif')
+    if not os.path.exists(out_path):
+        gdal.GetDriverByName('GTiff').CreateCopy(out_path, make_ds(size, dtype), options=['TILED=YES']).FlushCache()
+    return out_path
+
+def read_raster(size:tuple[int, int, int], out_dir:str):
+    return Read(module='gdal')(make_tif(size, out_dir), Context(None))
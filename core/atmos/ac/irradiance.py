@@ -66,7 +66,7 @@ def irradiance(aot, sza, mod = 2, date = None, apply_cosine = True, settings = {
 
     ## load LUT
     lutid = [lut for lut in setu['luts'] if 'MOD{}'.format(mod) in lut][0]
-    lutdw = atmos.aerlut.import_luts(add_rsky=False, par='romix', sensor=None, base_luts=[lutid])
+    lutdw = atmos.aerlut.cached_import_luts(add_rsky=False, par='romix', sensor=None, base_luts=[lutid])
 
     ## compute downward total transmittance
     res = lutdw[lutid]['rgi']((pressure, lutdw[lutid]['ipd']['dtott'], wave, raa, vza, sza, aot))
@@ -4,3 +4,4 @@ from .merged_lut import *
 from .reverse_lut import *
 from .import_rsky_lut import *
 from .import_rsky_luts import *
+from .lut_cache import *
@@ -12,6 +12,7 @@
 ##                  2021-07-20 (QV) added retrieval of generic LUTs
 ##                  2021-10-22 (QV) compute ttot if not in LUT
 ##                2023-08-03 (QV) get lut url from ac.config
+##                added lut cache dir for decompressed luts
 
 import os, sys
 import numpy as np
@@ -29,38 +30,46 @@ def import_lut(lutid, lutdir, lut_par = ['utott', 'dtott', 'astot', 'ttot', 'rom
 
     ## generic LUT
     if sensor is None:
-        ## extract bz2 files
-        unzipped = False
-        lutncbz2 = f'{lutnc}.bz2'
+        ## use decompressed LUT from lut cache dir
+        cached_lut = atmos.aerlut.load_cached_lut(lutid)
+        if cached_lut is not None:
+            lut, meta = cached_lut
+        else:
+            ## extract bz2 files
+            unzipped = False
+            lutncbz2 = f'{lutnc}.bz2'
 
-        ## try downloading LUT from GitHub
-        if (not os.path.isfile(lutnc)) and (not os.path.isfile(lutncbz2)) and get_remote:
-            remote_lut = f'{remote_base}/{"-".join(lutid.split("-")[0:3])}/{os.path.basename(lutncbz2)}'
+            ## try downloading LUT from GitHub
+            if (not os.path.isfile(lutnc)) and (not os.path.isfile(lutncbz2)) and get_remote:
+                remote_lut = f'{remote_base}/{"-".join(lutid.split("-")[0:3])}/{os.path.basename(lutncbz2)}'
+                try:
+                    print('Getting remote LUT {}'.format(remote_lut))
+                    atmos.shared.download_file(remote_lut, lutncbz2)
+                except:
+                    print('Could not download remote lut {} to {}'.format(remote_lut, lutncbz2))
+                    if os.path.exists(lutncbz2):
+                        os.remove(lutncbz2)
+
+            ## extract bz LUT
+            if (not os.path.isfile(lutnc)) and (os.path.isfile(lutncbz2)):
+                import bz2, shutil
+                with bz2.BZ2File(lutncbz2) as fi, open(lutnc,"wb") as fo:
+                    shutil.copyfileobj(fi,fo)
+                unzipped = True
+            ## end extract bz2 files
+
+            ## read dataset from NetCDF
             try:
-                print('Getting remote LUT {}'.format(remote_lut))
-                atmos.shared.download_file(remote_lut, lutncbz2)
+                lut, meta = atmos.shared.lutnc_import(lutnc)
             except:
-                print('Could not download remote lut {} to {}'.format(remote_lut, lutncbz2))
-                if os.path.exists(lutncbz2):
-                    os.remove(lutncbz2)
-
-        ## extract bz LUT
-        if (not os.path.isfile(lutnc)) and (os.path.isfile(lutncbz2)):
-            import bz2, shutil
-            with bz2.BZ2File(lutncbz2) as fi, open(lutnc,"wb") as fo:
-                shutil.copyfileobj(fi,fo)
-            unzipped = True
-        ## end extract bz2 files
+                print(sys.exc_info()[0])
+                print('Failed to open LUT data from NetCDF (id='+lutid+')')
 
-        ## read dataset from NetCDF
-        try:
-            lut, meta = atmos.shared.lutnc_import(lutnc)
-        except:
-            print(sys.exc_info()[0])
-            print('Failed to open LUT data from NetCDF (id='+lutid+')')
+            if unzipped:
+                os.remove(lutnc) ## clear unzipped LUT
 
-        if unzipped:
-            os.remove(lutnc) ## clear unzipped LUT
+            if lut is not None:
+                atmos.aerlut.store_cached_lut(lutid, lut, meta)
 
         if lut is None:
             print('Could not import LUT {} from {}'.format(lutid, lutdir))
@@ -183,12 +192,17 @@ def import_lut(lutid, lutdir, lut_par = ['utott', 'dtott', 'astot', 'ttot', 'rom
 
         ## read dataset from NetCDF
         if os.path.isfile(lutnc_s):
-            try:
-                # load params in shape of (19,13,13,16,1,16) for 13 bands, and each shape means (par, azi'muth', thv'view zenith angle', ths'solar zenith angle', wnd, tau)
-                lut_sensor, meta = atmos.shared.lutnc_import(lutnc_s)
-            except:
-                print(sys.exc_info()[0])
-                print('Failed to open LUT data from NetCDF (id='+lutid+')')
+            cached_lut = None if override else atmos.aerlut.load_cached_lut(lutid, sensor)
+            if cached_lut is not None:
+                lut_sensor, meta = cached_lut
+            else:
+                try:
+                    # load params in shape of (19,13,13,16,1,16) for 13 bands, and each shape means (par, azi'muth', thv'view zenith angle', ths'solar zenith angle', wnd, tau)
+                    lut_sensor, meta = atmos.shared.lutnc_import(lutnc_s)
+                    atmos.aerlut.store_cached_lut(lutid, lut_sensor, meta, sensor)
+                except:
+                    print(sys.exc_info()[0])
+                    print('Failed to open LUT data from NetCDF (id='+lutid+')')
 
         ## subset LUTs
         if lut_par is not None:
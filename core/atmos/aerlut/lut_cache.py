@@ -0,0 +1,102 @@
+## process-wide cache for luts
+## imported luts and reverse luts are kept in memory with LRU eviction, so rasters in one run share the same rgi
+## decompressed luts can be stored as npy files in lut_cache_dir (config.txt) and loaded as memory-mapped arrays
+
+import os, pickle, threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Any, Optional
+import numpy as np
+
+import core.atmos as atmos
+from core.util.logger import Logger
+
+LUT_CACHE_SIZE = 8
+LUT_META_FILE = 'meta.pkl'
+GENERIC_LUT_NAME = 'lut'
+
+class LutCache:
+    def __init__(self, max_size:int=LUT_CACHE_SIZE):
+        self._items:OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self.max_size = max_size
+
+    def __contains__(self, key:Hashable):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get_or_load(self, key:Hashable, loader:Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+            value = loader()
+            self._items[key] = value
+            while len(self._items) > self.max_size:
+                evicted_key, _ = self._items.popitem(last=False)
+                Logger.get_logger().log('debug', f'LUT cache evicted {evicted_key[0]}')
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+lut_cache = LutCache()
+
+def _to_key(value) -> Hashable:
+    if isinstance(value, (list, tuple)):
+        return tuple(_to_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _to_key(v)) for k, v in value.items()))
+    return value
+
+def make_lut_key(func_name:str, **kwargs) -> tuple:
+    return (func_name,) + _to_key(kwargs)
+
+def cached_import_luts(**kwargs) -> dict:
+    key = make_lut_key('import_luts', **kwargs)
+    return lut_cache.get_or_load(key, lambda: atmos.aerlut.import_luts(**kwargs))
+
+def cached_reverse_lut(sensor:str, **kwargs) -> dict:
+    key = make_lut_key('reverse_lut', sensor=sensor, **kwargs)
+    return lut_cache.get_or_load(key, lambda: atmos.aerlut.reverse_lut(sensor, **kwargs))
+
+def _lut_cache_dir(lutid:str, sensor:Optional[str]=None) -> Optional[str]:
+    cache_dir = atmos.config.get('lut_cache_dir', '')
+    if not cache_dir:
+        return None
+    if sensor is None:
+        return os.path.join(cache_dir, lutid)
+    return os.path.join(cache_dir, sensor, lutid)
+
+def load_cached_lut(lutid:str, sensor:Optional[str]=None):
+    lut_cache_dir = _lut_cache_dir(lutid, sensor)
+    if lut_cache_dir is None or not os.path.isfile(os.path.join(lut_cache_dir, LUT_META_FILE)):
+        return None
+
+    with open(os.path.join(lut_cache_dir, LUT_META_FILE), 'rb') as f:
+        meta, names = pickle.load(f)
+
+    # copy-on-write mapping, luts are subset or modified after loading without touching the cached files
+    luts = {name: np.load(os.path.join(lut_cache_dir, f'{name}.npy'), mmap_mode='c') for name in names}
+
+    if sensor is None:
+        return luts[GENERIC_LUT_NAME], meta
+    return luts, meta
+
+def store_cached_lut(lutid:str, lut, meta:dict, sensor:Optional[str]=None):
+    lut_cache_dir = _lut_cache_dir(lutid, sensor)
+    if lut_cache_dir is None:
+        return
+
+    os.makedirs(lut_cache_dir, exist_ok=True)
+    luts = {GENERIC_LUT_NAME: lut} if sensor is None else lut
+
+    for name, arr in luts.items():
+        np.save(os.path.join(lut_cache_dir, f'{name}.npy'), arr)
+
+    # meta is written last and marks the cache entry as complete
+    with open(os.path.join(lut_cache_dir, LUT_META_FILE), 'wb') as f:
+        pickle.dump((meta, list(luts.keys())), f)
@@ -6,8 +6,10 @@
 ##               2021-10-24 (QV) added pressures and get_remote as keyword to other functions
 ##               2021-10-25 (QV) test if the wind dimension is != 1 or missing
 ##                2023-08-03 (QV) get lut url from ac.config
+##               vectorised reverse lut generation, bands can be generated in parallel processes
 
 import time, os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from netCDF4 import Dataset
 import scipy.interpolate
@@ -15,11 +17,105 @@ import scipy.interpolate
 import core.atmos as atmos
 from core.util import rsr_read
 
+REVERSE_LUT_DIMENSIONS = ('pressure','raa','vza','sza','wind','rho')
+
+def interp_rows(x, xp, fp):
+    ## np.interp(x, xp[i], fp) for every row i of xp at once
+    ## x (nx,), xp (nrow, nxp) increasing along the last axis, fp (nxp,)
+    ## the index of the lower node is searchsorted(xp[i], x, side='right') - 1, counted for all rows in one comparison
+    x = np.asarray(x, dtype=np.float64)
+    xp = np.asarray(xp, dtype=np.float64)
+    fp = np.asarray(fp, dtype=np.float64)
+    nxp = xp.shape[-1]
+
+    j = np.sum(xp[:, :, None] <= x[None, None, :], axis=1) - 1
+    jc = np.clip(j, 0, nxp - 2)
+
+    x0 = np.take_along_axis(xp, jc, axis=1)
+    x1 = np.take_along_axis(xp, jc + 1, axis=1)
+    y0 = fp[jc]
+    y1 = fp[jc + 1]
+    xb = np.broadcast_to(x, jc.shape)
+
+    ## same arithmetic and fallbacks as np.interp so results are bitwise identical
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (y1 - y0) / (x1 - x0)
+        res = slope * (xb - x0) + y0
+        res = np.where(np.isnan(res), slope * (xb - x1) + y1, res)
+    res = np.where(np.isnan(res) & (y0 == y1), y0, res)
+    res = np.where(xb == x0, y0, res)
+    res = np.where(j >= nxp - 1, fp[-1], res)
+    res = np.where(j < 0, fp[0], res)
+    res = np.where(np.isnan(xb), xb, res)
+
+    return res
+
+def reverse_lut_band(lutd, pid, b, pct = (1,60), nbins = 20):
+    ## build the rpath -> aot lut of one band by evaluating the rgi on the whole grid at once
+    if len(lutd['dim']) == 7:
+        wind_dim = True
+        pressures, pids, raas, vzas, szas, winds, aots = lutd['dim']
+    else:
+        pressures, pids, raas, vzas, szas, aots = lutd['dim']
+        wind_dim = False
+        winds = np.atleast_1d(2)
+
+    tmp = lutd['lut'][b][:,pid,:,:,:,:,:].flatten()
+    tmp = np.log(tmp)
+    prc = np.nanpercentile(tmp, pct)
+    h = np.histogram(tmp, bins=nbins, range=prc)
+    rpath_bins = np.exp(h[1])
+
+    dim = [pressures, raas, vzas, szas, winds, rpath_bins]
+    dims = [len(d) for d in dim]
+
+    ## rgi is evaluated per pressure to keep the point array small
+    luta = np.zeros(dims) + np.nan
+    for pi, pressure in enumerate(pressures):
+        if wind_dim:
+            grid = np.meshgrid([pressure], [pid], raas, vzas, szas, winds, aots, indexing='ij')
+        else:
+            grid = np.meshgrid([pressure], [pid], raas, vzas, szas, aots, indexing='ij')
+        points = np.stack([g.ravel() for g in grid], axis=-1)
+        ret = lutd['rgi'][b](points).reshape(-1, len(aots))
+
+        ## without wind dimension the same curve is used for the single wind
+        luta[pi] = interp_rows(rpath_bins, ret, aots).reshape(dims[1:])
+
+    return dim, luta, aots
+
+def write_reverse_lut(lutnc, slut, lut, aots, dim, luta):
+    if os.path.exists(lutnc): os.remove(lutnc)
+    nc = Dataset(lutnc, 'w')
+    ## set attributes
+    setattr(nc, 'base', slut)
+    setattr(nc, 'aermod', lut[-1])
+    setattr(nc, 'aots', aots)
+    setattr(nc, 'lut_dimensions', REVERSE_LUT_DIMENSIONS)
+    for di, dn in enumerate(REVERSE_LUT_DIMENSIONS):
+        ## set attribute
+        setattr(nc, dn, dim[di])
+        ## create dimensions
+        nc.createDimension(dn, len(dim[di]))
+    ## write lut
+    var = nc.createVariable('lut',np.float32,REVERSE_LUT_DIMENSIONS)
+    var[:] = luta.astype(np.float32)
+    nc.close()
+
+def _make_reverse_lut(lutd, pid, b, slut, lut, lutnc, pct, nbins):
+    print('Starting {}'.format(slut))
+    t0 = time.time()
+    dim, luta, aots = reverse_lut_band(lutd, pid, b, pct=pct, nbins=nbins)
+    print('Resampling {} took {:.1f}s'.format(slut, time.time()-t0))
+    write_reverse_lut(lutnc, slut, lut, aots, dim, luta)
+    return lutnc
+
+
 def reverse_lut(sensor, lutdw=None, par = 'romix',
                 pct = (1,60), nbins = 20, override = False, pressures = [500, 750, 1013, 1100],
                 base_luts:list = ['ACOLITE-LUT-202110-MOD1', 'ACOLITE-LUT-202110-MOD2'],
                 rsky_lut:str = 'ACOLITE-RSKY-202102-82W',
-                get_remote = True, remote_base = None):
+                get_remote = True, remote_base = None, workers = 1):
 
     ## use URL from main config
     if remote_base is None: remote_base = '{}'.format(atmos.config['lut_url'])
@@ -38,6 +134,7 @@ def reverse_lut(sensor, lutdw=None, par = 'romix',
         if not os.path.exists(lutdir): os.makedirs(lutdir)
 
         rgi = {}
+        missing = []
         for b in bands:
             slut = '{}-reverse-{}-{}-{}'.format(lut, sensor, par, b)
             lutnc = '{}/{}.nc'.format(lutdir, slut)
@@ -59,69 +156,30 @@ def reverse_lut(sensor, lutdw=None, par = 'romix',
 
                 ## generate LUT if download did not work
                 if (not os.path.exists(lutnc)):
-                    print('Creating reverse LUTs for {}'.format(sensor))
-                    if lutdw is None:
-                        print('Importing source LUTs')
-                        lutdw = atmos.aerlut.import_luts(sensor=sensor, base_luts = base_luts,
-                                                         lut_par = [par], par = par, return_lut_array=True,
-                                                         pressures = pressures, get_remote = get_remote,
-                                                         add_rsky = par == 'romix+rsky_t', rsky_lut_name= rsky_lut)
-                    pid = lutdw[lut]['ipd'][par]
-                    if len(lutdw[lut]['dim']) == 7:
-                        wind_dim = True
-                        pressures, pids, raas, vzas, szas, winds, aots = lutdw[lut]['dim']
-                    else:
-                        pressures, pids, raas, vzas, szas, aots = lutdw[lut]['dim']
-                        wind_dim = False
-                        winds = np.atleast_1d(2)
-
-
-                    print('Starting {}'.format(slut))
-                    t0 = time.time()
-                    tmp = lutdw[lut]['lut'][b][:,pid,:,:,:,:,:].flatten()
-                    tmp = np.log(tmp)
-                    prc = np.nanpercentile(tmp, pct)
-                    h = np.histogram(tmp, bins=nbins, range=prc)
-                    rpath_bins = np.exp(h[1])
-
-                    ## set up dimensions for lut
-                    lut_dimensions = ('pressure','raa','vza','sza','wind','rho')
-                    dim = [pressures, raas, vzas, szas, winds, rpath_bins]
-                    dims = [len(d) for d in dim]
-                    luta = np.zeros(dims) + np.nan
-                    ii = 0
-                    ni = np.product(dims[:-1])
-                    for pi, pressure in enumerate(pressures):
-                        for ri, raa in enumerate(raas):
-                            for vi, vza in enumerate(vzas):
-                                for si, sza in enumerate(szas):
-                                    for wi, wind in enumerate(winds):
-                                        if wind_dim:
-                                            ret = lutdw[lut]['rgi'][b]((pressure, pid, raa, vza, sza, wind, aots))
-                                        else:
-                                            ret = lutdw[lut]['rgi'][b]((pressure, pid, raa, vza, sza, aots))
-                                        luta[pi, ri, vi, si, wi, :] = np.interp(rpath_bins, ret, aots)
-                                        ii+=1
-                            print('{} {:.1f}%'.format(b, (ii/ni)*100), end='\r')
-                    print('\nResampling {} took {:.1f}s'.format(slut, time.time()-t0))
-
-                    ## write this sensor band lut
-                    if os.path.exists(lutnc): os.remove(lutnc)
-                    nc = Dataset(lutnc, 'w')
-                    ## set attributes
-                    setattr(nc, 'base', slut)
-                    setattr(nc, 'aermod', lut[-1])
-                    setattr(nc, 'aots', aots)
-                    setattr(nc, 'lut_dimensions', lut_dimensions)
-                    for di, dn in enumerate(lut_dimensions):
-                        ## set attribute
-                        setattr(nc, dn, dim[di])
-                        ## create dimensions
-                        nc.createDimension(dn, len(dim[di]))
-                    ## write lut
-                    var = nc.createVariable('lut',np.float32,lut_dimensions)
-                    var[:] = luta.astype(np.float32)
-                    nc.close()
+                    missing.append((b, slut, lutnc))
+
+        if len(missing) > 0:
+            print('Creating reverse LUTs for {}'.format(sensor))
+            if lutdw is None:
+                print('Importing source LUTs')
+                lutdw = atmos.aerlut.import_luts(sensor=sensor, base_luts = base_luts,
+                                                 lut_par = [par], par = par, return_lut_array=True,
+                                                 pressures = pressures, get_remote = get_remote,
+                                                 add_rsky = par == 'romix+rsky_t', rsky_lut_name= rsky_lut)
+            pid = lutdw[lut]['ipd'][par]
+
+            if workers > 1 and len(missing) > 1:
+                with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+                    futures = [pool.submit(_make_reverse_lut, lutdw[lut], pid, b, slut, lut, lutnc, pct, nbins) for b, slut, lutnc in missing]
+                    for future in futures:
+                        future.result()
+            else:
+                for b, slut, lutnc in missing:
+                    _make_reverse_lut(lutdw[lut], pid, b, slut, lut, lutnc, pct, nbins)
+
+        for b in bands:
+            slut = '{}-reverse-{}-{}-{}'.format(lut, sensor, par, b)
+            lutnc = '{}/{}.nc'.format(lutdir, slut)
 
             ## read LUT and make rgi
             if os.path.exists(lutnc):
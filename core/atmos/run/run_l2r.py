@@ -127,15 +127,16 @@ def apply_l2r(l1r:dict, global_attrs:dict):
     Logger.get_logger().log('info', f'Loading LUTs {user_settings["luts"]}')
 
     ## load reverse lut romix -> aot
+    ## luts are shared by all rasters in the process through the lut cache
     rev_lut_table = None
     if use_rev_lut:
-        rev_lut_table = atmos.aerlut.reverse_lut(global_attrs['sensor'], par=ro_type, rsky_lut=user_settings['dsf_interface_lut'], base_luts=user_settings['luts'])
+        rev_lut_table = atmos.aerlut.cached_reverse_lut(global_attrs['sensor'], par=ro_type, rsky_lut=user_settings['dsf_interface_lut'], base_luts=user_settings['luts'])
 
     ## load aot -> atmospheric parameters lut
     ## QV 2022-04-04 interface reflectance is always loaded since we include wind in the interpolation below
     ## not necessary for runs with par == romix, to be fixed
     ### romix = mixed rho, rsky = sky rho, rsurf = surface rho
-    lut_table = atmos.aerlut.import_luts(add_rsky=True, par=(ro_type if ro_type == 'romix+rsurf' else 'romix+rsky_t'), sensor=None if is_hyper else global_attrs['sensor'], rsky_lut_name=user_settings['dsf_interface_lut'],
+    lut_table = atmos.aerlut.cached_import_luts(add_rsky=True, par=(ro_type if ro_type == 'romix+rsurf' else 'romix+rsky_t'), sensor=None if is_hyper else global_attrs['sensor'], rsky_lut_name=user_settings['dsf_interface_lut'],
                                          base_luts=user_settings['luts'], pressures=user_settings['luts_pressures'], reduce_dimensions=user_settings['luts_reduce_dimensions'])
     lut_mod_names = list(lut_table.keys())
     Logger.get_logger().log('info', f'Loaded LUTs {user_settings["luts"]} in {(time.time() - t0):.1f} s')
@@ -1,4 +1,4 @@
-from core.util import tiles_interp, grid_extend, projection_geo
+from core.util import tiles_interp, grid_extend_batch, projection_geo
 from core.util.gdal import warp_to
 from core.util.logger import Logger
 import numpy as np
@@ -36,8 +36,8 @@ def init_l1r(width:int, height:int, geo_info:dict,
             if dev_value == 0:
                 continue
 
-            ave_vza = None
-            ave_vaa = None
+            band_vza = []
+            band_vaa = []
 
             for band_id in bands:
                 if band_id not in granule_meta['VIEW_DET']:
@@ -45,21 +45,15 @@ def init_l1r(width:int, height:int, geo_info:dict,
                 if f'{dev_value}' not in granule_meta['VIEW_DET'][band_id]:
                     continue
 
-                bza = granule_meta['VIEW_DET'][band_id][f'{dev_value}']['Zenith']
-                baa = granule_meta['VIEW_DET'][band_id][f'{dev_value}']['Azimuth']
-                bza = grid_extend(bza, iterations=1, crop=False)
-                baa = grid_extend(baa, iterations=1, crop=False)
-                if ave_vaa is None:
-                    ave_vza = bza
-                    ave_vaa = baa
-                else:
-                    ave_vza = np.dstack((ave_vza, bza))
-                    ave_vaa = np.dstack((ave_vaa, baa))
+                band_vza.append(granule_meta['VIEW_DET'][band_id][f'{dev_value}']['Zenith'])
+                band_vaa.append(granule_meta['VIEW_DET'][band_id][f'{dev_value}']['Azimuth'])
             # if verbosity > 1: print('Computing band average per detector geometry')
 
-            if ave_vza is not None:
-                ave_vza = np.nanmean(ave_vza, axis=2)
-                ave_vaa = np.nanmean(ave_vaa, axis=2)
+            if len(band_vza) > 0:
+                ## extend zenith and azimuth grids of all bands at once
+                ext_grids = grid_extend_batch(np.stack(band_vza + band_vaa), iterations=1, crop=False)
+                ave_vza = np.nanmean(ext_grids[:len(band_vza)], axis=0)
+                ave_vaa = np.nanmean(ext_grids[len(band_vza):], axis=0)
                 ## end compute detector average geometry
                 ## interpolate grids to current detector
                 det_mask = det_band == dev_value
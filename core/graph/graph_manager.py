@@ -3,7 +3,7 @@ from dataclasses import dataclass
 
 from core.util.logger import Logger
 from core.config import parse_config
-from core.graph import PINIT, PEND, PR, LINK, build_graph_func, get_procs, get_ops_args_from_graph, get_successors_by_relation
+from core.graph import PINIT, PEND, PR, LINK, build_graph_func, get_procs, get_ops_args_from_graph, get_successors_by_relation, get_predecessors_by_relation
 
 if TYPE_CHECKING:
     from networkx import DiGraph
@@ -85,12 +85,18 @@ class GraphManager:
             proc_op_map[proc]["op_args"] = {op: args for op, args in zip(p_ops[0], p_ops[1])}
         return proc_op_map
 
+    def get_proc_ops(self, proc:str) -> list[str]:
+        return self._proc_op_map[proc]['ops_order']
+
     def get_op_args(self, proc:str, op:str) -> dict:
         return self._proc_op_map[proc]['op_args'][op]
 
     def get_next_procs(self, proc:str) -> list[str]:
         return get_successors_by_relation(self._graph, proc, LINK)
 
+    def get_prev_procs(self, proc:str) -> list[str]:
+        return get_predecessors_by_relation(self._graph, proc, LINK)
+
     def is_init(self, proc:str) -> bool:
         return self._graph.nodes[proc][PINIT]
 
@@ -1,8 +1,9 @@
 FILE_PROCESSOR = 'file_processor'
 LINK_PROCESSOR = 'link_processor'
 
-#todo: going to be added soon
 MULTI_PROCESSOR = 'multi_processor'
+
+#todo: going to be added soon
 SUB_PROCESSOR = 'sub_processor'
 
 from .context import *
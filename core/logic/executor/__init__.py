@@ -1 +1,4 @@
-from .processing_executor import *
\ No newline at end of file
+from .result_cache import *
+from .processing_executor import *
+from .graph_scheduler import *
+from .memory_budget import *
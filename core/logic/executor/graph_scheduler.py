@@ -0,0 +1,144 @@
+import os, queue, threading
+from typing import TYPE_CHECKING, Iterator, Iterable, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+
+from core.logic import ContextManager
+from core.util.logger import Logger
+
+if TYPE_CHECKING:
+    from core.logic import Context
+    from core.logic.processor import Processor
+
+_END = object()
+
+class _Failure:
+    def __init__(self, error:BaseException):
+        self.error = error
+
+class Branch:
+    # items put by producer threads into a bounded queue, the producers stop at their next item when the branch is closed
+    def __init__(self, queue_size:int, producer_count:int=1):
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self.producer_count:int = producer_count
+
+    def put(self, x) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(x, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while self.producer_count > 0:
+            x = self._queue.get()
+            if x is _END:
+                self.producer_count -= 1
+            elif isinstance(x, _Failure):
+                self.close()
+                raise x.error
+            else:
+                return x
+        raise StopIteration
+
+    def close(self):
+        self._stop.set()
+
+class GraphScheduler(ContextManager):
+    """
+    Runs the independent branches of the processor graph on a bounded thread pool.
+
+    The upstream processors of a processor linked after several processors, and the end points, are pulled by
+    pool threads into bounded queues, so a producer runs at most queue_size items ahead of its consumer.
+    GDAL and NumPy release the GIL while they work, so the branches overlap. A branch which finds no free thread
+    is pulled by its consumer as before, so a full pool never blocks the graph.
+    """
+
+    def __init__(self, context:"Context", processor_map:dict[str, "Processor"], end_points:list["Processor"],
+                 workers:Optional[int]=None, queue_size:int=2):
+        super().__init__(context)
+        self._logger = Logger.get_logger()
+        self._end_points:list["Processor"] = end_points
+        self._fan_in_procs:list[str] = [proc for proc in self._graph_manager.procs if len(self._graph_manager.get_prev_procs(proc)) > 1]
+
+        # a thread for every branch of a fan-in processor and for every end point
+        task_count = sum([len(self._graph_manager.get_prev_procs(proc)) for proc in self._fan_in_procs])
+        task_count += len(end_points) if len(end_points) > 1 else 0
+
+        self.workers:int = workers if workers is not None else min(task_count, os.cpu_count() or 1)
+        self.queue_size:int = queue_size
+
+        assert self.workers >= 0, 'workers should not be negative'
+        assert self.queue_size > 0, 'queue_size should be greater than 0'
+
+        self._slots = threading.BoundedSemaphore(max(self.workers, 1))
+        self._pool:Optional[ThreadPoolExecutor] = None
+
+        for proc in self._fan_in_procs:
+            processor_map[proc].set_scheduler(self)
+
+        self._logger.log('info', f'GraphScheduler : {self.workers} workers for {task_count} branches, queue size {self.queue_size}, '
+                                 f'fan-in processors : {self._fan_in_procs}')
+
+    def __enter__(self):
+        if self.workers > 0:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='branch')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _produce(self, gen:Iterator, branch:Branch):
+        try:
+            for x in gen:
+                if not branch.put(x):
+                    break
+            else:
+                branch.put(_END)
+        except BaseException as e:
+            branch.put(_Failure(e))
+        finally:
+            gen.close()
+            self._slots.release()
+
+    def _submit(self, gen:Iterator, branch:Branch) -> bool:
+        if self._pool is None or not self._slots.acquire(blocking=False):
+            return False
+        self._pool.submit(self._produce, gen, branch)
+        return True
+
+    def prefetch(self, gen:Iterator) -> Iterator[Any]:
+        # the generator runs in a pool thread when one is free, otherwise it is returned to run in the caller
+        branch = Branch(self.queue_size)
+        if not self._submit(gen, branch):
+            return gen
+        return branch
+
+    def run(self, end_points:Optional[Iterable["Processor"]]=None) -> Iterator[Any]:
+        # results of the end points are yielded in the order they are produced
+        if end_points is None:
+            end_points = self._end_points
+        end_points = list(end_points)
+
+        branch = Branch(self.queue_size * max(len(end_points), 1), producer_count=0)
+        inline_gens = []
+        for end_point in end_points:
+            gen = end_point.execute()
+            if len(end_points) > 1 and self._submit(gen, branch):
+                branch.producer_count += 1
+            else:
+                inline_gens.append(gen)
+
+        try:
+            for gen in inline_gens:
+                yield from gen
+            yield from branch
+        finally:
+            branch.close()
@@ -0,0 +1,78 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from core.logic import ContextManager
+from core.logic.planner.shape_rules import apply_shape_rule, read_input_shape, shapes_nbytes
+from core.util.logger import Logger
+from core.util.op import READ_OP, WRITE_OP, MULTI_WRITE_OP
+
+if TYPE_CHECKING:
+    from core.logic import Context
+
+class MemoryBudget(ContextManager):
+    """
+    Global memory budget of the scenes running at the same time.
+
+    The working set of a scene is estimated from the size, bands and dtype of its file passed through the op chain
+    of its processor, an op holding its input and its result together. The estimate of a processor is scaled by the
+    largest ratio of the measured working set of its finished scenes to their estimate, so the budget follows the
+    bytes really held by cached bands and MEM datasets. A processor with no scene in flight always admits one, even
+    over the budget, so the graph never stops.
+    """
+
+    def __init__(self, context:"Context", max_bytes:int):
+        super().__init__(context)
+        assert max_bytes > 0, 'max_bytes of the memory budget should be greater than 0'
+
+        self.max_bytes:int = max_bytes
+        self.in_use:int = 0
+        self._scales:dict[str, float] = {}
+        self._measured:dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._logger = Logger.get_logger()
+
+    def _chain_peak(self, proc_name:str, path:str) -> Optional[int]:
+        shapes = read_input_shape(path)
+        if shapes is None:
+            return None
+
+        peak = 0
+        for op_name in self._graph_manager.get_proc_ops(proc_name):
+            if op_name == 'input':
+                continue
+            out_shapes = apply_shape_rule(op_name, shapes, self._graph_manager.get_op_args(proc_name, op_name))
+            in_bytes = 0 if op_name == READ_OP else shapes_nbytes(shapes)
+            out_bytes = 0 if op_name in [WRITE_OP, MULTI_WRITE_OP] else shapes_nbytes(out_shapes)
+            peak = max(peak, in_bytes + out_bytes)
+            shapes = out_shapes
+        return peak
+
+    def estimate(self, proc_name:str, path:str) -> int:
+        peak = self._chain_peak(proc_name, path)
+        if peak is None:
+            # files without a readable header are taken as large as the last scene measured, or the whole budget
+            return self._measured.get(proc_name, self.max_bytes)
+        return int(peak * self._scales.get(proc_name, 1.))
+
+    def try_acquire(self, nbytes:int, force:bool=False) -> Optional[int]:
+        # returns the bytes granted, a scene larger than the budget is granted the whole budget
+        nbytes = min(nbytes, self.max_bytes)
+        with self._lock:
+            if not force and self.in_use + nbytes > self.max_bytes:
+                return None
+            self.in_use += nbytes
+            return nbytes
+
+    def release(self, nbytes:int):
+        with self._lock:
+            self.in_use = max(0, self.in_use - nbytes)
+
+    def observe(self, proc_name:str, path:str, measured:int):
+        peak = self._chain_peak(proc_name, path)
+        with self._lock:
+            # file backed rasters hold no pixels, they do not lower the estimate
+            if measured > 0:
+                self._measured[proc_name] = measured
+            if peak and measured > 0:
+                self._scales[proc_name] = max(self._scales.get(proc_name, 0.), measured / peak)
+        self._logger.log('debug', f'(MemoryBudget) {proc_name} : {path} held {measured} bytes, estimated {peak} bytes')
@@ -1,15 +1,25 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Any
 
 from core.logic import ContextManager
+from core.logic.executor.result_cache import ResultCache, input_key, op_fingerprint, op_key, is_cached_op
+from core.raster import Raster, ModuleType
+from core.util.op import WRITE_OP, MULTI_WRITE_OP
 
 if TYPE_CHECKING:
     from core.logic import Context
     from core.logic.processor import Processor
+    from core.operations.parent import Op
 
 class ProcessingExecutor(ContextManager):
-    def __init__(self, context:"Context"):
+    def __init__(self, context:"Context", result_cache:Optional[ResultCache]=None):
         super().__init__(context)
         self.execution_count = 0
+        self.result_cache:Optional[ResultCache] = result_cache
+        self._fingerprints:dict[int, str] = {}
+
+    def set_result_cache(self, result_cache:Optional[ResultCache]):
+        self.result_cache = result_cache
+        self._fingerprints.clear()
 
     def execute(self, processor:"Processor"):
         for i, data in enumerate(processor.preprocess()):
@@ -25,16 +35,65 @@ class ProcessingExecutor(ContextManager):
                 #     copied = copy_raster(self.context.cache[processor_id])
                 #     yield copied
                 # else:
-                x = processor.process(data, self.context)
+                x = self.process(processor, data)
                 x = processor.postprocess(x)
                 # self.context._cache[processor_id] = x
                 yield x
 
             else:
-                x = processor.process(data, self.context)
+                x = self.process(processor, data)
                 x = processor.postprocess(x)
                 yield x
 
+    def process(self, processor:"Processor", data:Any):
+        # inputs without a key, like the results of the workers of MultiProcessor, are processed without the cache
+        if self.result_cache is None:
+            return processor.process(data, self.context)
+
+        prev_key = input_key(data)
+        if prev_key is None:
+            return processor.process(data, self.context)
+
+        return self._process_with_cache(processor.ops, data, prev_key)
+
+    def _fingerprint(self, op:"Op") -> str:
+        if id(op) not in self._fingerprints:
+            self._fingerprints[id(op)] = op_fingerprint(op)
+        return self._fingerprints[id(op)]
+
+    def _process_with_cache(self, ops:list["Op"], data:Any, prev_key:str):
+        keys = []
+        for op in ops:
+            prev_key = op_key(prev_key, self._fingerprint(op))
+            keys.append(prev_key)
+
+        # the latest result in the cache is restored and the ops before it are skipped, but never a write
+        start, x = 0, data
+        for i in range(len(ops) - 1, -1, -1):
+            if ops[i].op_name in [WRITE_OP, MULTI_WRITE_OP]:
+                break
+            if is_cached_op(ops[i]) and self.result_cache.contains(keys[i]):
+                start, x = i + 1, self.result_cache.load(keys[i])
+                break
+
+        # lazy snap products are computed when they are written, so only the last of them is stored
+        cached_indices = [i for i, op in enumerate(ops) if is_cached_op(op)]
+        last_cached = cached_indices[-1] if len(cached_indices) > 0 else -1
+
+        for i in range(start, len(ops)):
+            x = ops[i](x, self.context)
+            if not isinstance(x, Raster):
+                continue
+
+            x.cache_key = keys[i]
+            if not is_cached_op(ops[i]) or not self.result_cache.can_store(x) or self.result_cache.contains(keys[i]):
+                continue
+            if x.module_type == ModuleType.SNAP and i != last_cached:
+                continue
+            self.result_cache.store(keys[i], x, ops[i].op_name)
+
+        return x
+
     def reset_cache(self):
         self.context._cache.clear()
-        self.execution_count = 0
\ No newline at end of file
+        self.execution_count = 0
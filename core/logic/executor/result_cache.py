@@ -0,0 +1,210 @@
+import os, json, time, shutil, hashlib, threading
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Any
+
+import numpy as np
+
+from core.util import read_pickle
+from core.util.meta import write_metadata
+from core.util.op import READ_OP, WRITE_OP, MULTI_WRITE_OP
+from core.util.logger import Logger
+from core.raster import Raster, ModuleType, ProductType
+from core.raster.funcs.meta import MetaBandsManager
+from core.raster.funcs.reader import ReaderFactory
+from core.raster.funcs.writer import get_writer
+
+if TYPE_CHECKING:
+    from core.operations.parent import Op
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_MAX_SIZE = 50 * 1024 ** 3
+
+# reading again is as cheap as restoring, and writes have side effects which must happen on every run
+NOT_CACHED_OPS = [READ_OP, WRITE_OP, MULTI_WRITE_OP]
+# geotiff for gdal, snap rasters keep the metadata the next snap operators need only in BEAM-DIMAP
+CACHED_MODULE_EXT = {ModuleType.GDAL: 'tif', ModuleType.SNAP: 'dim'}
+
+# state of the op changed while it runs, not a parameter of the result
+MAX_PARAM_DEPTH = 8
+OP_RUNTIME_ATTRS = ['_listeners', '_counter', '_logger', '_pro_name', '_avail_types', '_must_after', '_init_flag', '_end_flag']
+
+def normalize_param(value:Any, depth:int=0) -> Any:
+    # json-able form of an op parameter, the same parameters always give the same form
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Enum):
+        return str(value.value)
+    if isinstance(value, Path):
+        return str(value)
+    if depth > MAX_PARAM_DEPTH:
+        return type(value).__qualname__
+    if isinstance(value, (list, tuple)):
+        return [normalize_param(v, depth + 1) for v in value]
+    if isinstance(value, dict):
+        return {str(k): normalize_param(v, depth + 1) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, np.ndarray):
+        return {'ndarray': hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(), 'dtype': str(value.dtype), 'shape': list(value.shape)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if callable(value):
+        return f'{getattr(value, "__module__", "")}.{getattr(value, "__qualname__", type(value).__name__)}'
+    if hasattr(value, '__dict__'):
+        return {'class': type(value).__qualname__, 'attrs': normalize_param(vars(value), depth + 1)}
+    return repr(value)
+
+def hash_params(params:Any) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def input_key(data:Any) -> Optional[str]:
+    # files are identified by path, size and modification time, results of linked processors by their keys
+    if isinstance(data, str) and os.path.exists(data):
+        stat = os.stat(data)
+        return hash_params(['file', os.path.abspath(data), stat.st_size, stat.st_mtime_ns])
+    if isinstance(data, Raster):
+        return data.cache_key
+    if isinstance(data, list) and len(data) > 0:
+        keys = [input_key(elem) for elem in data]
+        if any([key is None for key in keys]):
+            return None
+        return hash_params(['list', keys])
+    return None
+
+def op_fingerprint(op:"Op") -> str:
+    params = {k: v for k, v in vars(op).items() if k not in OP_RUNTIME_ATTRS}
+    return hash_params([f'{type(op).__module__}.{type(op).__qualname__}', normalize_param(params)])
+
+def op_key(prev_key:str, fingerprint:str) -> str:
+    return hash_params([CACHE_VERSION, prev_key, fingerprint])
+
+def is_cached_op(op:"Op") -> bool:
+    # a chained op before the end of its chain keeps pending parameters in the context, its result can not be restored alone
+    if op.op_name in NOT_CACHED_OPS:
+        return False
+    return getattr(op, 'end_flag', True)
+
+class ResultCache:
+    """
+    Content addressed cache of op results on disk.
+
+    The key of an op result is the hash of the input file identity, the class and parameters of the op and the
+    keys of the ops before it, so keys are known before anything is computed. Gdal results are stored as compressed
+    tiled GeoTIFF and snap results as BEAM-DIMAP, with the meta dict next to them. The least recently used entries
+    are removed when the cache grows over max_size bytes.
+    """
+
+    def __init__(self, cache_dir:str, max_size:int=DEFAULT_CACHE_MAX_SIZE):
+        assert max_size > 0, 'max_size of the cache should be greater than 0'
+
+        self.cache_dir:Path = Path(cache_dir)
+        self.max_size:int = max_size
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._logger = Logger.get_logger()
+        self.hits = 0
+        self.stores = 0
+
+    def _entry_path(self, key:str) -> Path:
+        return self.cache_dir / f'{key}.json'
+
+    def _files(self, key:str) -> list[Path]:
+        # the meta dict is written by write_metadata as {stem}.pkl next to the raster, BEAM-DIMAP has its .data directory
+        return [self._entry_path(key), self.cache_dir / f'{key}.pkl', self.cache_dir / f'{key}.data'] + \
+            [self.cache_dir / f'{key}.{ext}' for ext in CACHED_MODULE_EXT.values()]
+
+    def _remove(self, key:str):
+        for path in self._files(key):
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+    def contains(self, key:str) -> bool:
+        return self._entry_path(key).exists()
+
+    def can_store(self, x:Any) -> bool:
+        return isinstance(x, Raster) and x.module_type in CACHED_MODULE_EXT
+
+    def store(self, key:str, raster:Raster, op_name:str=''):
+        # gdal rasters are written with the default options of Write, tiled and compressed
+        raster_path = self.cache_dir / f'{key}.{CACHED_MODULE_EXT[raster.module_type]}'
+        get_writer(raster).write(str(raster_path))
+        if raster.meta_dict:
+            write_metadata(raster.meta_dict, str(raster_path))
+
+        size = 0
+        for path in self._files(key)[1:]:
+            if path.is_dir():
+                size += sum([sub_path.stat().st_size for sub_path in path.rglob('*') if sub_path.is_file()])
+            elif path.exists():
+                size += path.stat().st_size
+
+        entry = {
+            'key': key, 'version': CACHE_VERSION, 'op': op_name, 'path': raster.path, 'size': size, 'file': raster_path.name,
+            'module_type': str(raster.module_type), 'product_type': str(raster.product_type.value),
+            'band_names': raster.get_band_names(), 'op_history': list(raster.op_history), 'created': time.time()
+        }
+
+        # the entry is written last, a tif without its entry is not a hit
+        tmp_path = self._entry_path(key).with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self._entry_path(key))
+
+        self.stores += 1
+        self._logger.log('debug', f'(ResultCache) {op_name} result is stored as {key} ({size} bytes)')
+        self.evict()
+
+    def load(self, key:str) -> Raster:
+        with open(self._entry_path(key)) as f:
+            entry = json.load(f)
+
+        raster_path = str(self.cache_dir / entry['file'])
+        module_type = ModuleType.from_str(entry['module_type'])
+        raster = ReaderFactory.get_reader(raster_path, module_type).read(raster_path)
+
+        raster.path = entry['path']
+        raster.product_type = ProductType(entry['product_type'])
+        meta_path = self.cache_dir / f'{key}.pkl'
+        if meta_path.exists():
+            raster.meta_dict = read_pickle(meta_path)
+        MetaBandsManager(raster).update_band_mapping(entry['band_names'])
+        for history in entry['op_history']:
+            raster.add_history(history)
+        raster.cache_key = key
+
+        # the modification time of the entry is the last use of the lru eviction
+        os.utime(self._entry_path(key))
+        self.hits += 1
+        self._logger.log('debug', f'(ResultCache) {entry["op"]} result is restored from {key}')
+        return raster
+
+    def size(self) -> int:
+        return sum([entry['size'] for _, entry in self._entries()])
+
+    def _entries(self) -> list[tuple[float, dict]]:
+        entries = []
+        for entry_path in self.cache_dir.glob('*.json'):
+            try:
+                with open(entry_path) as f:
+                    entries.append((entry_path.stat().st_mtime, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda x: x[0])
+            total = sum([entry['size'] for _, entry in entries])
+
+            # the entry used last is kept even when it is larger than max_size alone
+            while total > self.max_size and len(entries) > 1:
+                _, entry = entries.pop(0)
+                self._remove(entry['key'])
+                total -= entry['size']
+                self._logger.log('debug', f'(ResultCache) {entry["key"]} is evicted, cache size {total} bytes')
+
+    def clear(self):
+        with self._lock:
+            for _, entry in self._entries():
+                self._remove(entry['key'])
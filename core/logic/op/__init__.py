@@ -1 +1,3 @@
-from .op_manager import *
\ No newline at end of file
+from .op_manager import *
+from .window_pushdown import *
+from .band_pushdown import *
@@ -0,0 +1,91 @@
+from typing import TYPE_CHECKING, Optional, Union
+
+from core.util.op import WRITE_OP, SELECT_OP, SPLIT_OP, STACK_OP, BAND_MATH_OP, CLIP_OP, RESAMPLE_OP, MINMAX_CLIP_OP, \
+    ZONAL_STATS_OP
+
+if TYPE_CHECKING:
+    from core.graph import GraphManager
+    from core.logic.processor import Processor
+    from core.operations.parent import Op
+
+# ops computing every band of their result from the band of the same name in their input
+BAND_PRESERVING_OPS = [CLIP_OP, RESAMPLE_OP, MINMAX_CLIP_OP]
+
+def _band_names(bands:Optional[list[Union[str, int]]]) -> Optional[list[str]]:
+    # only bands selected by name are followed, indices are shifted by the bands dropped before them
+    if not bands or not all([isinstance(b, str) for b in bands]):
+        return None
+    return list(bands)
+
+def _union(*band_lists:Optional[list[str]]) -> Optional[list[str]]:
+    union = []
+    for bands in band_lists:
+        if bands is None:
+            return None
+        union += [b for b in bands if b not in union]
+    return union
+
+def op_needed_bands(op:"Op", live:Optional[list[str]]) -> Optional[list[str]]:
+    # bands of the input of the op needed for the live bands of its result, None is all of them
+    if op.op_name in [WRITE_OP, ZONAL_STATS_OP]:
+        return _band_names(op.selected_names_or_indices)
+    elif op.op_name == SELECT_OP:
+        return _band_names(op.selected_bands)
+    elif op.op_name == SPLIT_OP:
+        if not op.bands:
+            return None
+        return _union(*[_band_names(bands) for bands in op.bands])
+    elif op.op_name == BAND_MATH_OP:
+        targets = _band_names(op.selected_names_or_indices)
+        if live is None or targets is None:
+            return None
+        out_band_name = op.lambda_name if op.out_band_name is None else op.out_band_name
+        return _union([b for b in live if b != out_band_name], targets)
+    elif op.op_name in BAND_PRESERVING_OPS:
+        return live
+    return None
+
+def ops_needed_bands(ops:list["Op"], live:Optional[list[str]]=None) -> Optional[list[str]]:
+    # walks the chain backward from the bands needed after its last op
+    for op in reversed(ops):
+        live = op_needed_bands(op, live)
+    return live
+
+def push_down_bands(graph_manager:"GraphManager", processor_map:dict[str, "Processor"]) -> dict[str, Optional[list[str]]]:
+    # bands needed at the input of every processor, the reads of the init processors load only those
+    needs:dict[str, Optional[list[str]]] = {}
+
+    def needed_from(consumer_name:str, proc_name:str) -> Optional[list[str]]:
+        consumer = processor_map[consumer_name]
+        if len(consumer.ops) > 0 and consumer.ops[0].op_name == STACK_OP:
+            bands_list = consumer.ops[0].bands_list
+            if not bands_list:
+                return None
+            # rasters are stacked in the order of the links of the config, or of the linked processors
+            links = graph_manager.var_link_map.get(consumer_name) if graph_manager.var_link_map else None
+            order = links if links else [proc.proc_name for proc in consumer.proc_list]
+            return _union(*[_band_names(bands_list[i]) for i, name in enumerate(order) if name == proc_name])
+        if len(graph_manager.get_prev_procs(consumer_name)) > 1:
+            return None
+        return input_needs(consumer_name)
+
+    def input_needs(proc_name:str) -> Optional[list[str]]:
+        if proc_name not in needs:
+            next_procs = graph_manager.get_next_procs(proc_name)
+            if graph_manager.is_end(proc_name) or len(next_procs) == 0:
+                live = None
+            else:
+                live = _union(*[needed_from(next_proc, proc_name) for next_proc in next_procs])
+            ops = processor_map[proc_name].ops
+            if graph_manager.is_init(proc_name):
+                # the read is kept, the bands it loads are the ones needed by the ops after it
+                needs[proc_name] = ops_needed_bands(ops[1:], live)
+                ops[0].set_needed_bands(needs[proc_name])
+            else:
+                needs[proc_name] = ops_needed_bands(ops, live)
+        return needs[proc_name]
+
+    for proc_name in processor_map:
+        input_needs(proc_name)
+
+    return needs
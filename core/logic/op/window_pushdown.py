@@ -0,0 +1,31 @@
+from typing import TYPE_CHECKING, Optional
+
+from core.operations.parent import WarpOp
+from core.util.op import OP_Module_Type, READ_OP, CLIP_OP, SELECT_OP, MINMAX_CLIP_OP, BAND_MATH_OP
+
+if TYPE_CHECKING:
+    from core.operations.parent import Op
+
+# ops between read and clip which keep the pixel grid and compute every pixel from the same pixel of their input
+WINDOW_PRESERVING_OPS = [SELECT_OP, MINMAX_CLIP_OP, BAND_MATH_OP]
+
+def find_read_window(ops:list["Op"]) -> Optional[tuple["Op", "Op"]]:
+    # (read, clip) when the clip of a gdal chain can be done by reading only its window
+    if len(ops) < 2 or ops[0].op_name != READ_OP or ops[0].module_type != OP_Module_Type.GDAL:
+        return None
+
+    for i, op in enumerate(ops[1:], start=1):
+        if op.op_name in WINDOW_PRESERVING_OPS:
+            continue
+        if op.op_name != CLIP_OP or not hasattr(op, 'bounds'):
+            return None
+
+        # a reprojection warped with the clip covers more than the bounds in the source crs
+        for chained_op in ops[i + 1:]:
+            if not isinstance(chained_op, WarpOp) or chained_op.init_flag:
+                break
+            if getattr(chained_op, 'epsg', None) is not None:
+                return None
+        return ops[0], op
+
+    return None
@@ -0,0 +1,2 @@
+from .shape_rules import *
+from .planner import *
@@ -0,0 +1,149 @@
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from core.logic import ContextManager
+from core.logic.processor import FileProcessor
+from core.logic.planner.shape_rules import PlanShapes, apply_shape_rule, read_input_shape, shapes_nbytes
+from core.util.logger import Logger
+from core.util.op import READ_OP, WRITE_OP, MULTI_WRITE_OP, SELECT_OP, STACK_OP, MOSAIC_OP, CLIP_OP, SPLIT_OP, RESAMPLE_OP, \
+    GCP_REPROJECT_OP, PROJECTION_OP, ATMOSCORR_OP, SPECKLE_FILTER_OP, CACHED_SPECKLE_FILTER_OP, NL_DENOISING_OP, TERR_CORR_OP, CALIBRATE_OP
+
+if TYPE_CHECKING:
+    from core.logic import Context
+
+# passes over the data of an op relative to one elementwise numpy pass, a rough order of magnitude measured on s1/s2 scenes
+COST_PASSES = {
+    READ_OP: 2., WRITE_OP: 3., MULTI_WRITE_OP: 3., SELECT_OP: 0.5, STACK_OP: 1., MOSAIC_OP: 2., CLIP_OP: 1., SPLIT_OP: 0.5,
+    RESAMPLE_OP: 4., PROJECTION_OP: 6., GCP_REPROJECT_OP: 8., CALIBRATE_OP: 4., TERR_CORR_OP: 30., SPECKLE_FILTER_OP: 25.,
+    CACHED_SPECKLE_FILTER_OP: 25., NL_DENOISING_OP: 40., ATMOSCORR_OP: 60.
+}
+DEFAULT_COST_PASSES = 2.
+
+# arguments of the input of an init processor used to list its files
+FILE_INPUT_ARGS = ['path', 'pattern', 'sort']
+
+def calibrate_sec_per_byte(size:int=1 << 22, repeat:int=3) -> float:
+    # seconds per byte of one elementwise pass on float32, the best of repeat runs
+    x = np.random.random(size).astype(np.float32)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = x * 1.5 + 0.5
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return max(best, 1e-9) / x.nbytes
+
+def format_bytes(size:float) -> str:
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            return f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}TiB'
+
+def _shapes_str(shapes:PlanShapes) -> str:
+    if shapes is None:
+        return '?'
+    if isinstance(shapes, list):
+        return '[' + ', '.join([str(shape) for shape in shapes]) + ']'
+    return str(shapes)
+
+@dataclass
+class OpPlan:
+    proc_name:str
+    op_name:str
+    item_count:int
+    in_shapes:PlanShapes
+    out_shapes:PlanShapes
+    peak_bytes:int
+    seconds:float
+
+    def to_dict(self) -> dict:
+        return {
+            'proc_name': self.proc_name, 'op_name': self.op_name, 'item_count': self.item_count,
+            'in_shape': _shapes_str(self.in_shapes), 'out_shape': _shapes_str(self.out_shapes),
+            'peak_bytes': self.peak_bytes, 'seconds': self.seconds
+        }
+
+class Planner(ContextManager):
+    """
+    Dry run of the processor graph, nothing is computed and no op is built.
+
+    The first file of every init processor is opened for its size, bands and dtype only, and the shape is passed
+    through the rules of the ops. The peak of an op is the bytes of its input and its output held together, and the
+    time is the number of passes of the op over those bytes, timed by a small numpy benchmark on this machine.
+    """
+
+    def __init__(self, context:"Context", sec_per_byte:Optional[float]=None):
+        super().__init__(context)
+        self._logger = Logger.get_logger()
+        self.sec_per_byte:float = sec_per_byte if sec_per_byte is not None else calibrate_sec_per_byte()
+        self._proc_results:dict[str, tuple[PlanShapes, int]] = {}
+        self.op_plans:list[OpPlan] = []
+
+    def _input_of(self, proc:str) -> tuple[PlanShapes, int]:
+        if self._graph_manager.is_init(proc):
+            input_args = self._graph_manager.get_op_args(proc, 'input')
+            file_processor = FileProcessor(proc_name=proc, **{k: v for k, v in input_args.items() if k in FILE_INPUT_ARGS})
+            paths = list(file_processor.preprocess())
+            if len(paths) == 0:
+                return None, 0
+            return read_input_shape(paths[0]), len(paths)
+
+        # linked processors zip their upstream results, a single upstream is passed as it is
+        prev_results = [self._plan_proc(prev_proc) for prev_proc in self._graph_manager.get_prev_procs(proc)]
+        item_count = min([count for _, count in prev_results])
+        if len(prev_results) == 1:
+            return prev_results[0][0], item_count
+
+        shapes = [shape for shape, _ in prev_results]
+        if any([shape is None for shape in shapes]):
+            return None, item_count
+        return shapes, item_count
+
+    def _plan_proc(self, proc:str) -> tuple[PlanShapes, int]:
+        if proc in self._proc_results:
+            return self._proc_results[proc]
+
+        shapes, item_count = self._input_of(proc)
+        for op_name in self._graph_manager.get_proc_ops(proc):
+            if op_name == 'input':
+                continue
+
+            out_shapes = apply_shape_rule(op_name, shapes, self._graph_manager.get_op_args(proc, op_name))
+            in_bytes, out_bytes = shapes_nbytes(shapes), shapes_nbytes(out_shapes)
+            # read has no raster input and write keeps its input
+            if op_name == READ_OP:
+                in_bytes = 0
+            if op_name in [WRITE_OP, MULTI_WRITE_OP]:
+                out_bytes = 0
+
+            seconds = COST_PASSES.get(op_name, DEFAULT_COST_PASSES) * max(in_bytes, out_bytes) * self.sec_per_byte * item_count
+            self.op_plans.append(OpPlan(proc, op_name, item_count, shapes, out_shapes, in_bytes + out_bytes, seconds))
+            shapes = out_shapes
+
+        self._proc_results[proc] = (shapes, item_count)
+        return self._proc_results[proc]
+
+    def plan(self) -> list[OpPlan]:
+        self._proc_results.clear()
+        self.op_plans = []
+        for proc in self._graph_manager.procs:
+            self._plan_proc(proc)
+        return self.op_plans
+
+    def report(self) -> str:
+        header = f'{"processor":<20} {"op":<24} {"items":>6} {"input":<32} {"output":<32} {"peak":>10} {"time(s)":>10}'
+        lines = [header, '-' * len(header)]
+        for op_plan in self.op_plans:
+            lines.append(f'{op_plan.proc_name:<20} {op_plan.op_name:<24} {op_plan.item_count:>6} {_shapes_str(op_plan.in_shapes):<32} '
+                         f'{_shapes_str(op_plan.out_shapes):<32} {format_bytes(op_plan.peak_bytes):>10} {op_plan.seconds:>10.1f}')
+
+        peak = max([op_plan.peak_bytes for op_plan in self.op_plans], default=0)
+        total = sum([op_plan.seconds for op_plan in self.op_plans])
+        lines.append('-' * len(header))
+        lines.append(f'estimated peak per item : {format_bytes(peak)}, estimated time : {total:.1f}s '
+                     f'(calibrated at {1 / self.sec_per_byte / 1024 ** 3:.2f}GiB/s per pass)')
+        return '\n'.join(lines)
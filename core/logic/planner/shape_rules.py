@@ -0,0 +1,217 @@
+import math
+from pathlib import Path
+from dataclasses import dataclass, replace
+from typing import Callable, Optional, Union
+
+import numpy as np
+from osgeo import gdal, osr
+
+from core.util.op import READ_OP, WRITE_OP, SELECT_OP, STACK_OP, MOSAIC_OP, SPLIT_OP, CLIP_OP, \
+    RESAMPLE_OP, ATMOSCORR_OP, REV_REF_OP, CALIBRATE_OP, TERR_CORR_OP, BACK_COEF_OP, NORMALIZE_OP, ZSCORE_OP, BAND_MATH_OP
+
+@dataclass
+class PlanShape:
+    width:int
+    height:int
+    bands:int
+    dtype:str = 'float32'
+    transform:Optional[tuple] = None
+    proj_wkt:str = ''
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.height * self.bands * np.dtype(self.dtype).itemsize
+
+    def __str__(self):
+        return f'{self.bands}x{self.height}x{self.width} {self.dtype}'
+
+PlanShapes = Union[PlanShape, list[PlanShape], None]
+
+def shapes_nbytes(shapes:PlanShapes) -> int:
+    if shapes is None:
+        return 0
+    if isinstance(shapes, list):
+        return sum([shapes_nbytes(shape) for shape in shapes])
+    return shapes.nbytes
+
+def _open_metadata(path:str) -> tuple[Optional[gdal.Dataset], Optional[int]]:
+    # only the header is read, SAFE and BEAM-DIMAP products are opened through their manifest or their first image
+    target = Path(path)
+    if target.suffix.lower() == '.safe' and target.is_dir():
+        target = target / 'manifest.safe'
+    if target.suffix.lower() == '.dim':
+        images = sorted(target.with_suffix('.data').glob('*.img'))
+        if len(images) == 0:
+            return None, None
+        ds = gdal.Open(str(images[0]))
+        return ds, len(images)
+
+    ds = gdal.Open(str(target))
+    if ds is not None and ds.RasterCount == 0:
+        sub_datasets = ds.GetSubDatasets()
+        if len(sub_datasets) > 0:
+            ds = gdal.Open(sub_datasets[0][0])
+    return ds, None
+
+def read_input_shape(path:str) -> Optional[PlanShape]:
+    gdal.PushErrorHandler('CPLQuietErrorHandler')
+    try:
+        ds, band_count = _open_metadata(path)
+    except (RuntimeError, TypeError):
+        ds, band_count = None, None
+    finally:
+        gdal.PopErrorHandler()
+
+    if ds is None or ds.RasterCount == 0:
+        return None
+
+    dtype = gdal.GetDataTypeName(ds.GetRasterBand(1).DataType).lower()
+    return PlanShape(width=ds.RasterXSize, height=ds.RasterYSize, bands=band_count or ds.RasterCount,
+                     dtype=_numpy_dtype(dtype), transform=ds.GetGeoTransform(), proj_wkt=ds.GetProjection())
+
+def _numpy_dtype(gdal_type_name:str) -> str:
+    # complex types of SLC products are kept as complex
+    name_map = {'byte': 'uint8', 'cint16': 'complex64', 'cint32': 'complex64', 'cfloat32': 'complex64', 'cfloat64': 'complex128'}
+    name = name_map.get(gdal_type_name, gdal_type_name)
+    try:
+        return np.dtype(name).name
+    except TypeError:
+        return 'float32'
+
+def _transform_bounds(bounds:tuple, src_wkt:str, dst_wkt:str) -> Optional[tuple]:
+    # (min_x, min_y, max_x, max_y) of the corners of bounds in the dst crs
+    if not src_wkt or not dst_wkt:
+        return None
+    src_srs, dst_srs = osr.SpatialReference(), osr.SpatialReference()
+    src_srs.ImportFromWkt(src_wkt)
+    dst_srs.ImportFromWkt(dst_wkt)
+    src_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    dst_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+    ct = osr.CoordinateTransformation(src_srs, dst_srs)
+    min_x, min_y, max_x, max_y = bounds
+    corners = [ct.TransformPoint(x, y)[:2] for x, y in [(min_x, min_y), (min_x, max_y), (max_x, min_y), (max_x, max_y)]]
+    xs, ys = [c[0] for c in corners], [c[1] for c in corners]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def _extent(shape:PlanShape) -> Optional[tuple]:
+    if shape.transform is None:
+        return None
+    ulx, psx, _, uly, _, psy = shape.transform
+    lrx, lry = ulx + psx * shape.width, uly + psy * shape.height
+    return min(ulx, lrx), min(uly, lry), max(ulx, lrx), max(uly, lry)
+
+def _epsg_wkt(epsg:int) -> str:
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(int(epsg))
+    return srs.ExportToWkt()
+
+SHAPE_RULES:dict[str, Callable[[PlanShapes, dict], PlanShapes]] = {}
+
+def shape_rule(*op_names:str):
+    def decorator(func:Callable[[PlanShapes, dict], PlanShapes]):
+        for op_name in op_names:
+            SHAPE_RULES[op_name] = func
+        return func
+    return decorator
+
+def apply_shape_rule(op_name:str, shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    # ops without a rule keep the shape of their input
+    if shapes is None:
+        return None
+    if op_name in SHAPE_RULES:
+        return SHAPE_RULES[op_name](shapes, op_args)
+    return shapes
+
+def _first(shapes:PlanShapes) -> PlanShape:
+    return shapes[0] if isinstance(shapes, list) else shapes
+
+@shape_rule(READ_OP, SELECT_OP, WRITE_OP)
+def _select_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    bands = op_args.get('bands')
+    if not bands or isinstance(shapes, list):
+        return shapes
+    return replace(shapes, bands=len(bands))
+
+@shape_rule(ATMOSCORR_OP, REV_REF_OP, CALIBRATE_OP, TERR_CORR_OP, BACK_COEF_OP, NORMALIZE_OP, ZSCORE_OP)
+def _float_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    shapes = _select_shape(shapes, op_args)
+    if isinstance(shapes, list):
+        return [replace(shape, dtype='float32') for shape in shapes]
+    return replace(shapes, dtype='float32')
+
+@shape_rule(BAND_MATH_OP)
+def _band_math_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    shape = _first(shapes)
+    return replace(shape, bands=shape.bands + 1, dtype=np.result_type(shape.dtype, np.float32).name)
+
+@shape_rule(STACK_OP)
+def _stack_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    if not isinstance(shapes, list):
+        return shapes
+    bands_list = op_args.get('bands_list') or [None] * len(shapes)
+    bands = sum([len(b) if isinstance(b, list) else shape.bands for shape, b in zip(shapes, bands_list)])
+    dtype = np.result_type(*[shape.dtype for shape in shapes]).name
+    return replace(shapes[0], bands=bands, dtype=dtype)
+
+@shape_rule(MOSAIC_OP)
+def _mosaic_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    if not isinstance(shapes, list):
+        return shapes
+    master = shapes[0]
+    extents = [_extent(shape) for shape in shapes]
+    if any([extent is None for extent in extents]):
+        return replace(master, width=max([s.width for s in shapes]), height=max([s.height for s in shapes]))
+
+    min_x, min_y = min([e[0] for e in extents]), min([e[1] for e in extents])
+    max_x, max_y = max([e[2] for e in extents]), max([e[3] for e in extents])
+    psx, psy = abs(master.transform[1]), abs(master.transform[5])
+    bands = len(op_args['bands']) if op_args.get('bands') else master.bands
+    return replace(master, width=math.ceil((max_x - min_x) / psx), height=math.ceil((max_y - min_y) / psy), bands=bands,
+                   transform=(min_x, psx, 0, max_y, 0, -psy))
+
+@shape_rule(SPLIT_OP)
+def _split_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    shape = _first(shapes)
+    bands = op_args.get('bands')
+    if not bands:
+        return [replace(shape, bands=1) for _ in range(shape.bands)]
+    return [replace(shape, bands=len(b) if isinstance(b, list) else 1) for b in bands]
+
+@shape_rule(CLIP_OP)
+def _clip_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    # bounds are (min_x, max_y, max_x, min_y) in bounds_epsg
+    shape = _first(shapes)
+    src_extent = _extent(shape)
+    bounds = op_args.get('bounds')
+    if src_extent is None or not bounds or len(bounds) != 4:
+        return shape
+
+    clip_extent = _transform_bounds((bounds[0], bounds[3], bounds[2], bounds[1]), _epsg_wkt(op_args.get('bounds_epsg', 4326)), shape.proj_wkt)
+    if clip_extent is None:
+        return shape
+
+    psx, psy = abs(shape.transform[1]), abs(shape.transform[5])
+    min_x, min_y = max(src_extent[0], clip_extent[0]), max(src_extent[1], clip_extent[1])
+    max_x, max_y = min(src_extent[2], clip_extent[2]), min(src_extent[3], clip_extent[3])
+    width, height = max(0, math.ceil((max_x - min_x) / psx)), max(0, math.ceil((max_y - min_y) / psy))
+    return replace(shape, width=min(width, shape.width), height=min(height, shape.height), transform=(min_x, psx, 0, max_y, 0, -psy))
+
+@shape_rule(RESAMPLE_OP)
+def _resample_shape(shapes:PlanShapes, op_args:dict) -> PlanShapes:
+    shape = _first(shapes)
+    pixel_size, epsg = op_args.get('pixel_size'), op_args.get('epsg')
+    src_extent = _extent(shape)
+    if src_extent is None:
+        return shape
+
+    dst_wkt = _epsg_wkt(epsg) if epsg else shape.proj_wkt
+    dst_extent = _transform_bounds(src_extent, shape.proj_wkt, dst_wkt) if epsg else src_extent
+    if dst_extent is None:
+        return shape
+    if not pixel_size:
+        # the pixel count is kept when only the crs changes
+        pixel_size = max((dst_extent[2] - dst_extent[0]) / shape.width, (dst_extent[3] - dst_extent[1]) / shape.height)
+
+    return replace(shape, width=math.ceil((dst_extent[2] - dst_extent[0]) / pixel_size), height=math.ceil((dst_extent[3] - dst_extent[1]) / pixel_size),
+                   transform=(dst_extent[0], pixel_size, 0, dst_extent[3], 0, -pixel_size), proj_wkt=dst_wkt)
@@ -1,4 +1,6 @@
+from .result_tee import *
 from .processor_parent import *
 from .file_processor import *
 from .link_processor import *
+from .multi_processor import *
 from .processor_builder import *
\ No newline at end of file
@@ -1,22 +1,51 @@
-from typing import Callable, Union, TYPE_CHECKING, AnyStr, List
+from typing import Callable, Union, TYPE_CHECKING, AnyStr, List, Iterator
 from pathlib import Path
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
 
 from core.operations import READ_OP
 from core import PROCESSOR
 from core.util.logger import print_log_attrs
 from core.util.op import check_init_operation, OP_Module_Type
 from core.logic import FILE_PROCESSOR
+from core.logic.op import find_read_window
 from core.logic.processor import Processor, ProcessorType
 from core.raster import Raster
 
+if TYPE_CHECKING:
+    from core.logic.context import Context
+
+class PrefetchedRead:
+    # result of the read op of a file, read ahead on the prefetch thread
+    def __init__(self, path:str, future:Future):
+        self.path:str = path
+        self.future:Future = future
+
+    def result(self) -> Raster:
+        return self.future.result()
+
+    def discard(self):
+        # a result read ahead but never processed is closed
+        if self.future.cancel():
+            return
+        try:
+            x = self.future.result()
+        except (Exception, CancelledError):
+            return
+        if isinstance(x, Raster):
+            x.close()
+
 @PROCESSOR.reg(FILE_PROCESSOR)
 class FileProcessor(Processor):
 
-    def __init__(self, proc_name:str, path:List, pattern:str='*', sort:dict=None, splittable:bool=True):
+    def __init__(self, proc_name:str, path:List, pattern:str='*', sort:dict=None, splittable:bool=True, prefetch:int=0):
         super().__init__(proc_name=proc_name, proc_type=ProcessorType.FILE, splittable=splittable)
         self.roots:List = path
         self.search_pattern:str = pattern
         self.sort_func: Union[Callable, None] = None
+        self.prefetch:int = prefetch
+
+        assert self.prefetch >= 0, 'prefetch should not be negative'
 
         if sort is not None:
             self.sort_func:Callable = sort['func']
@@ -24,6 +53,42 @@ class FileProcessor(Processor):
         # print_log_attrs(self, 'debug')
 
     def preprocess(self):
+        if self.prefetch > 0 and self.executor is not None:
+            if self.executor.result_cache is None:
+                yield from self.read_ahead(self.file_paths())
+                return
+            self.log('prefetch is not used with the result cache, cached reads are skipped instead', 'debug')
+        yield from self.file_paths()
+
+    def read_ahead(self, paths:Iterator[str]) -> Iterator[PrefetchedRead]:
+        # the read op of the next prefetch files runs on one thread while the current file is processed,
+        # results are yielded in the order of the paths and at most prefetch of them wait to be processed
+        read_op, ctx = self._ops[0], self.executor.context
+        pending:deque[PrefetchedRead] = deque()
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'prefetch_{self.proc_name}') as pool:
+            try:
+                for path in paths:
+                    pending.append(PrefetchedRead(path, pool.submit(read_op, path, ctx)))
+                    if len(pending) > self.prefetch:
+                        yield pending.popleft()
+
+                while pending:
+                    yield pending.popleft()
+            finally:
+                while pending:
+                    pending.popleft().discard()
+
+    def process(self, in_data:Union[PrefetchedRead, AnyStr], ctx:"Context"):
+        if not isinstance(in_data, PrefetchedRead):
+            return super().process(in_data, ctx)
+
+        x = in_data.result()
+        for op in self._ops[1:]:
+            x = op(x, ctx)
+        return x
+
+    def file_paths(self):
         if len(self.roots) == 0:
             raise AssertionError('No root path provided')
 
@@ -68,6 +133,17 @@ class FileProcessor(Processor):
             x = super().postprocess(x)
         return x
 
+    def chaining(self, prev_op=None, prev_chain_key=None):
+        chained = super().chaining(prev_op, prev_chain_key)
+
+        # a clip after the read is pushed down, so only its window is read
+        read_window = find_read_window(self._ops)
+        if read_window is not None:
+            read_op, clip_op = read_window
+            read_op.set_window(clip_op.bounds)
+            self.log(f'window of {clip_op.name} is pushed down to {read_op.name}', 'debug')
+        return chained
+
     def get_first_op_type(self) -> OP_Module_Type:
         return self.ops[0].module_type
 
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Type, Union, AnyStr
+from typing import TYPE_CHECKING, Type, Union, AnyStr, Optional
 
 from core import PROCESSOR
 from core.util.op import OP_Module_Type
@@ -7,7 +7,7 @@ from core.logic.processor import Processor, ProcessorType
 from core.raster import Raster
 
 if TYPE_CHECKING:
-    from core.logic.executor import ProcessingExecutor
+    from core.logic.executor import ProcessingExecutor, GraphScheduler
     from core.util.op import CHAIN_KEY
 
 @PROCESSOR.reg(LINK_PROCESSOR)
@@ -18,6 +18,7 @@ class LinkProcessor(Processor):
             self.proc_list = []
         else:
             self.proc_list = processors
+        self.scheduler:Optional["GraphScheduler"] = None
 
     def __contains__(self, proc):
         return proc in self.proc_list
@@ -26,10 +27,17 @@ class LinkProcessor(Processor):
         self.proc_list.append(linked_proc)
         return self
 
+    def set_scheduler(self, scheduler:"GraphScheduler"):
+        self.scheduler = scheduler
+        return self
+
     def preprocess(self):
 
         if len(self.proc_list) == 1:
             gens = self.proc_list[0].execute()
+        elif self.scheduler is not None:
+            # linked processors run concurrently, each at most queue_size items ahead
+            gens = [self.scheduler.prefetch(single_executor.execute()) for single_executor in self.proc_list]
         else:
             gens = [single_executor.execute() for single_executor in self.proc_list]
 
@@ -39,24 +47,29 @@ class LinkProcessor(Processor):
             except StopIteration:
                 return None, True
 
-        while True:
-            try:
-                if len(self.proc_list) == 1:
-                    yield next(gens)
-                else:
-                    results = []
-                    any_stopped = False
-                    for proc_gen in gens:
-                        result, stopped = safe_next(proc_gen)
-                        any_stopped = any_stopped or stopped
-                        results.append(result)
-
-                    if any_stopped:
-                        break
-
-                    yield results
-            except StopIteration as e:
-                break
+        try:
+            while True:
+                try:
+                    if len(self.proc_list) == 1:
+                        yield next(gens)
+                    else:
+                        results = []
+                        any_stopped = False
+                        for proc_gen in gens:
+                            result, stopped = safe_next(proc_gen)
+                            any_stopped = any_stopped or stopped
+                            results.append(result)
+
+                        if any_stopped:
+                            break
+
+                        yield results
+                except StopIteration as e:
+                    break
+        finally:
+            if len(self.proc_list) > 1:
+                for proc_gen in gens:
+                    proc_gen.close()
 
     def postprocess(self, x:Union[Raster, AnyStr], result_clone:bool=False):
         if isinstance(x, Raster):
@@ -1,51 +1,130 @@
-# todo: should have process_file function and it should be executed by multiprocessing
-
-from typing import TYPE_CHECKING, Type, Union, AnyStr, List
-from multiprocessing import Pool, cpu_count
+from typing import TYPE_CHECKING, List, Optional, Iterator
+from collections import deque
+from multiprocessing import cpu_count, get_context, get_all_start_methods
 
 from core import PROCESSOR
 from core.logic import MULTI_PROCESSOR
-from core.logic.processor import Processor, ProcessorType
-from core.raster import Raster
+from core.logic.processor import Processor, FileProcessor
+from core.raster.funcs import pack_result, unpack_result
+from core.util import Profiler, MemoryAccount, working_set
+from core.util.gdal import WarpPlanCache
 
 if TYPE_CHECKING:
+    from multiprocessing.pool import AsyncResult
     from core.logic.context import Context
-    from core.logic.executor import ProcessingExecutor
+    from core.logic.executor import MemoryBudget
+
+_worker_processor:Optional["MultiProcessor"] = None
+
+def _pool_context():
+    # workers are started from a single threaded server process, a fork of this process could copy the locks held
+    # by the threads of other branches or of the write behind pool in the middle of a gdal call
+    return get_context('forkserver' if 'forkserver' in get_all_start_methods() else 'spawn')
+
+def _worker_state() -> dict:
+    # settings of the run which the workers do not inherit
+    return {'profile': Profiler.get_profiler().enabled, 'warp_plans': WarpPlanCache.get_warp_plan_cache().max_plans}
+
+def _init_worker(processor:"MultiProcessor", state:Optional[dict]=None):
+    global _worker_processor
+    _worker_processor = processor
+
+    # a worker sends back only the records and peaks of its own calls
+    profiler = Profiler.get_profiler()
+    profiler.clear()
+    MemoryAccount.get_account().clear()
+
+    if state is not None:
+        if state['profile']:
+            profiler.enable()
+        if state['warp_plans'] > 0:
+            WarpPlanCache.get_warp_plan_cache().enable(max_plans=state['warp_plans'])
+
+def _process_file(index:int, file_path:str):
+    from core.logic import Context
+
+    processor = _worker_processor
+    processor.set_op_counters(index)
+
+    ctx = Context(None)
+    account = MemoryAccount.get_account()
+    with account.track() as calls:
+        x = Processor.process(processor, file_path, ctx)
+
+    # op calls profiled in the worker are sent back with the result, and the bytes its ops held
+    return pack_result(x), ctx.cache, Profiler.get_profiler().pop_records(), (working_set(calls), account.peaks)
 
 @PROCESSOR.reg(MULTI_PROCESSOR)
-class MultiProcessor(Processor):
-    def __init__(self, proc_name:str='', batch_size:int=4, num_workers:int=None, splittable:bool=True):
-        super().__init__(proc_name=proc_name, proc_type=ProcessorType.SUB, splittable=splittable)
-        self.batch_size = batch_size
-        self.num_workers = num_workers if num_workers is not None else max(1, cpu_count() - 1)
-        self.file_paths = []
-        
-    def preprocess(self):        
-        for file_path in self.collect_file_paths():
-            self.file_paths.append(file_path)
-            
-        batches = [self.file_paths[i:i + self.batch_size] 
-                  for i in range(0, len(self.file_paths), self.batch_size)]
-        
-        for batch in batches:
-            with Pool(processes=self.num_workers) as pool:
-                results = pool.map(self.process_file, batch)
-            
-            for result in results:
-                yield result
-    
-    def collect_file_paths(self):            
-        pass
-    
-    def process_file(self, file_path:str) -> Raster:        
-        from core.logic import Context
-        ctx = Context(None) 
-        
-        raster = Raster(file_path)
-        
-        return self.process(raster, ctx)
-        
-    def postprocess(self, x:Union[Raster, AnyStr]):
-        if isinstance(x, Raster):
-            x = super().postprocess(x)
-        return x
\ No newline at end of file
+class MultiProcessor(FileProcessor):
+    def __init__(self, proc_name:str, path:List, pattern:str='*', sort:dict=None,
+                 workers:int=None, max_pending:int=None, splittable:bool=True):
+        super().__init__(proc_name=proc_name, path=path, pattern=pattern, sort=sort, splittable=splittable)
+        self.num_workers = workers if workers is not None else max(1, cpu_count() - 1)
+        self.max_pending = max_pending if max_pending is not None else self.num_workers * 2
+
+        assert self.num_workers > 0, 'workers should be greater than 0'
+        assert self.max_pending >= self.num_workers, 'max_pending should not be less than workers'
+        self.memory_budget:Optional["MemoryBudget"] = None
+
+    def __getstate__(self):
+        # the workers only run the ops, the budget, the executor and the file listing are kept by the main process
+        state = self.__dict__.copy()
+        for key in ['memory_budget', 'executor', '_result_tee', 'sort_func']:
+            state[key] = None
+        return state
+
+    def set_memory_budget(self, memory_budget:Optional["MemoryBudget"]):
+        self.memory_budget = memory_budget
+        return self
+
+    def collect_file_paths(self):
+        yield from self.file_paths()
+
+    def _admit(self, file_path:str, pending:deque) -> Iterator[tuple]:
+        # pending files are handed to the consumer, which releases their bytes, until the file fits in the budget
+        nbytes = self.memory_budget.estimate(self.proc_name, file_path)
+        while True:
+            granted = self.memory_budget.try_acquire(nbytes, force=len(pending) == 0)
+            if granted is not None:
+                return granted
+            yield pending.popleft()
+
+    def preprocess(self):
+        # each file runs the whole op chain in a worker, at most max_pending files are in flight
+        # and the results are yielded in the order of the file paths
+        pending:deque[tuple[int, "AsyncResult", str, int]] = deque()
+
+        with _pool_context().Pool(processes=self.num_workers, initializer=_init_worker, initargs=(self, _worker_state())) as pool:
+            for index, file_path in enumerate(self.collect_file_paths()):
+                granted = 0
+                if self.memory_budget is not None:
+                    granted = yield from self._admit(file_path, pending)
+
+                pending.append((index, pool.apply_async(_process_file, (index, file_path)), file_path, granted))
+                if len(pending) >= self.max_pending:
+                    yield pending.popleft()
+
+            while pending:
+                yield pending.popleft()
+
+    def process(self, in_data:tuple[int, "AsyncResult", str, int], ctx:"Context"):
+        index, async_result, file_path, granted = in_data
+        try:
+            packed, worker_cache, profile_records, (measured, peaks) = async_result.get()
+        finally:
+            if self.memory_budget is not None:
+                self.memory_budget.release(granted)
+
+        for key, value in worker_cache.items():
+            ctx.set(key, value)
+        Profiler.get_profiler().extend(profile_records)
+        MemoryAccount.get_account().merge(peaks)
+        if self.memory_budget is not None:
+            self.memory_budget.observe(self.proc_name, file_path, measured)
+
+        self.set_op_counters(index + 1)
+        return unpack_result(packed)
+
+    def set_op_counters(self, count:int):
+        for op in self._ops:
+            op.counter = count
@@ -1,21 +1,23 @@
-from typing import TYPE_CHECKING, Type, List
+from typing import TYPE_CHECKING, Type, List, Optional
 
 from core.util.logger import Logger, print_log_attrs
 from core import PROCESSOR, OPERATIONS
-from core.logic import FILE_PROCESSOR, LINK_PROCESSOR, Context, ContextManager
-from core.logic.executor import ProcessingExecutor
+from core.logic import FILE_PROCESSOR, LINK_PROCESSOR, MULTI_PROCESSOR, Context, ContextManager
+from core.logic.executor import ProcessingExecutor, GraphScheduler, ResultCache, MemoryBudget
 from core.logic.processor import ProcessorType
+from core.logic.op import push_down_bands
 
 if TYPE_CHECKING:
     from core.logic.processor import Processor
 
 class ProcessorBuilder(ContextManager):
-    def __init__(self, context:Context):
+    def __init__(self, context:Context, result_cache:Optional[ResultCache]=None, memory_budget:Optional[MemoryBudget]=None):
         super().__init__(context)
         self._logger = Logger.get_logger()
         self._processor_map:dict[str, Type["Processor"]] = {}
         self._end_points:List[Type["Processor"]] = []
-        self._executor:"ProcessingExecutor" = ProcessingExecutor(context)
+        self._executor:"ProcessingExecutor" = ProcessingExecutor(context, result_cache=result_cache)
+        self._memory_budget:Optional[MemoryBudget] = memory_budget
 
     @property
     def end_point(self) -> list[Type["Processor"]]:
@@ -43,13 +45,23 @@ class ProcessorBuilder(ContextManager):
             return self._processor_map[proc_name]
 
         if self._graph_manager.is_init(proc_name):
-            constructor = PROCESSOR.__get_attr__(FILE_PROCESSOR, 'constructor')
-            input_args = self._context._graph_manager.get_op_args(proc_name, 'input')
+            input_args = dict(self._context._graph_manager.get_op_args(proc_name, 'input'))
+            if input_args.get('workers', 1) > 1:
+                # workers run the whole op chain of a file, reading ahead is only done by a single file processor
+                constructor = PROCESSOR.__get_attr__(MULTI_PROCESSOR, 'constructor')
+                input_args.pop('prefetch', None)
+            else:
+                constructor = PROCESSOR.__get_attr__(FILE_PROCESSOR, 'constructor')
+                input_args.pop('workers', None)
+                input_args.pop('max_pending', None)
         else:
             constructor = PROCESSOR.__get_attr__(LINK_PROCESSOR, 'constructor')
             input_args = {}
 
         self._processor_map[proc_name] = constructor(proc_name=proc_name, **input_args)
+        if self._memory_budget is not None and hasattr(self._processor_map[proc_name], 'set_memory_budget'):
+            # files are admitted by the budget where several scenes run at the same time
+            self._processor_map[proc_name].set_memory_budget(self._memory_budget)
 
         if self._graph_manager.is_end(proc_name):
             self._end_points.append(self._processor_map[proc_name])
@@ -64,12 +76,26 @@ class ProcessorBuilder(ContextManager):
                 else:
                     raise ValueError(f'Processor {after_proc} should be of type LINK_PROCESSOR')
 
+            # processors linked after the same processor share its results instead of running it again
+            self._processor_map[graph_elem.name].share_results(len(graph_elem.links))
+
+    def push_down_bands(self):
+        # reads load only the bands needed by the ops after them, in their processor and in the linked ones
+        needs = push_down_bands(self._graph_manager, self._processor_map)
+        for proc_name, bands in needs.items():
+            if bands is not None:
+                self._logger.log('debug', f'{proc_name} needs the bands {bands}')
+
     def build_executor(self):
         for end_point in self._end_points:
             end_point.set_all_op_types()
             end_point.chaining()
             end_point.set_executor(self._executor)
 
+    def build_scheduler(self, workers:Optional[int]=None, queue_size:int=2) -> GraphScheduler:
+        assert len(self._end_points) > 0, 'processors should be built before building the scheduler.'
+        return GraphScheduler(self._context, self._processor_map, self._end_points, workers=workers, queue_size=queue_size)
+
     def build(self) -> list[Type["Processor"]]:
         self._logger.log('info', '------------------------------------------------------ start to build processor')
         tmp_proc_list = []
@@ -79,6 +105,7 @@ class ProcessorBuilder(ContextManager):
             # print_log_attrs(tmp_processor, 'debug')
 
         self.connect_link() # set op type based on read module
+        self.push_down_bands()
 
         for proc in tmp_proc_list:
             print_log_attrs(proc, 'debug')
@@ -1,9 +1,10 @@
 from abc import abstractmethod
-from typing import TYPE_CHECKING, AnyStr, Union
+from typing import TYPE_CHECKING, AnyStr, Union, Optional
 from enum import Enum
 
 from core.util.logger import Logger
 from core.logic.op import OperationManager
+from core.logic.processor.result_tee import ResultTee
 
 if TYPE_CHECKING:
     from core.raster import Raster
@@ -38,6 +39,7 @@ class Processor(OperationManager):
         self._proc_type: ProcessorType = proc_type
         self._splittable:bool = splittable
         self.executor:"ProcessingExecutor" = None
+        self._result_tee:Optional[ResultTee] = None
         self._logger = Logger.get_logger()
 
 
@@ -83,12 +85,19 @@ class Processor(OperationManager):
     def set_executor(self, executor:"ProcessingExecutor"):
         self.executor = executor
 
+    def share_results(self, consumer_count:int):
+        # the processor linked to several processors runs once per item and its results are handed to all of them
+        self._result_tee = ResultTee(self, consumer_count) if consumer_count > 1 else None
+        return self
+
     def execute(self):
-        if self.executor:
-            return self.executor.execute(self)
-        else:
+        if not self.executor:
             raise ValueError('Executor is not set')
 
+        if self._result_tee is not None:
+            return self._result_tee.consumer()
+        return self.executor.execute(self)
+
     def log(self, msg:str, level='info'):
         self._logger.log(level, f'({self.__class__.__name__}) {msg}')
 
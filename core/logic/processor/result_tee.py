@@ -0,0 +1,106 @@
+import threading
+from typing import TYPE_CHECKING, Iterator, Optional, Any
+from collections import deque
+
+from core.raster.funcs import copy_result
+
+if TYPE_CHECKING:
+    from core.logic.processor import Processor
+
+class ResultTee:
+    """
+    Runs a processor once per item and hands every result to all processors linked after it.
+
+    Each result is kept with the number of consumers which have not taken it yet. The consumers before the last one
+    get a copy, because ops change the raster in place, and the last one gets the result itself, so the tee does not
+    keep any reference to a result all consumers have taken.
+    """
+
+    def __init__(self, processor:"Processor", consumer_count:int):
+        assert consumer_count > 1, 'results are shared only when more than one processor is linked'
+
+        self._processor:"Processor" = processor
+        self._consumer_count:int = consumer_count
+        self._source:Optional[Iterator] = None
+        self._buffers:list[Optional[deque]] = []
+        self._backlog:deque = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def consumer_count(self) -> int:
+        return self._consumer_count
+
+    def __getstate__(self):
+        # processors are sent to the workers of MultiProcessor, which only run the ops
+        state = self.__dict__.copy()
+        state.update(_source=None, _buffers=[], _backlog=deque(), _lock=None)
+        return state
+
+    def __setstate__(self, state:dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _reset(self):
+        if self._source is not None:
+            self._source.close()
+        self._source = None
+        self._buffers = []
+        self._backlog.clear()
+
+    def consumer(self) -> Iterator[Any]:
+        # the consumers of a run are the first consumer_count calls, the next call starts a new run
+        with self._lock:
+            if len(self._buffers) == self._consumer_count:
+                self._reset()
+
+            if self._source is None:
+                self._source = self._processor.executor.execute(self._processor)
+
+            # a consumer created after others started gets the results they have already pulled
+            buffer = deque(self._backlog)
+            self._buffers.append(buffer)
+            if len(self._buffers) == self._consumer_count:
+                self._backlog.clear()
+            return self._iter(self._buffers, len(self._buffers) - 1, buffer)
+
+    def _pull(self) -> bool:
+        try:
+            x = next(self._source)
+        except StopIteration:
+            return False
+
+        # consumers stopped early do not take the result, consumers not created yet do
+        live_count = sum([buffer is not None for buffer in self._buffers]) + self._consumer_count - len(self._buffers)
+        entry = [x, live_count]
+        for buffer in self._buffers:
+            if buffer is not None:
+                buffer.append(entry)
+        if len(self._buffers) < self._consumer_count:
+            self._backlog.append(entry)
+        return True
+
+    def _take(self, entry:list):
+        entry[1] -= 1
+        if entry[1] == 0:
+            x, entry[0] = entry[0], None
+            return x
+        return copy_result(entry[0])
+
+    def _iter(self, buffers:list[Optional[deque]], index:int, buffer:deque) -> Iterator[Any]:
+        # consumers can run in different threads, the upstream is pulled and the results are copied by one at a time
+        try:
+            while True:
+                with self._lock:
+                    if len(buffer) == 0 and not self._pull():
+                        return
+                    x = self._take(buffer.popleft())
+                yield x
+        finally:
+            # a consumer stopped early does not hold results back from the others
+            with self._lock:
+                buffers[index] = None
+                while buffer:
+                    entry = buffer.popleft()
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        entry[0] = None
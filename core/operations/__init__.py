@@ -17,6 +17,7 @@ from .mosaic_op import *
 from .reprojection_gcp_op import *
 from .minmax_op import *
 from .projection_op import *
+from .zonal_stats_op import *
 #
 from .s1 import *
 from .cached import *
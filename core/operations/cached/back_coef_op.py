@@ -4,7 +4,7 @@ from core.operations.parent import CachedOp
 
 from core.registry import OPERATIONS
 
-from core.util import calculate_back_coef
+from core.util import calculate_back_coef, calculate_positive_min
 from core.util.op import op_constraint, OP_Module_Type, BACK_COEF_OP
 from core.raster import Raster
 from core.raster.funcs import check_bname_index_valid
@@ -15,8 +15,8 @@ if TYPE_CHECKING:
 @OPERATIONS.reg(name=BACK_COEF_OP, conf_no_arg_allowed=True)
 @op_constraint(avail_module_types=[OP_Module_Type.GDAL, OP_Module_Type.SNAP])
 class BackCoef(CachedOp):
-    def __init__(self, bands:List[Union[AnyStr, int]]=None, drop_other_bands:bool=False):
-        super().__init__(BACK_COEF_OP)
+    def __init__(self, bands:List[Union[AnyStr, int]]=None, drop_other_bands:bool=False, window_size:Union[int, AnyStr]=None):
+        super().__init__(BACK_COEF_OP, window_size=window_size)
         self.selected_names_or_indices = bands
         self.drop_other_bands = drop_other_bands
 
@@ -28,8 +28,17 @@ class BackCoef(CachedOp):
             selected_name_or_id = raster.get_band_names()
         self.log(f"All bands are: {raster.get_band_names()}")
         self.log(f"Calculating backscattering coefficient for bands: {selected_name_or_id}")
-        raster = self.pre_process(raster, bands_to_load=selected_name_or_id, context=context)
-        raster.bands = calculate_back_coef(raster.bands)
+
+        if self.use_window(raster):
+            # minimum positive values should be found from the whole bands before replacing non-positive values
+            min_values = {}
+            for bands, _, _ in self.iter_window_bands(raster, selected_name_or_id):
+                min_values = calculate_positive_min(bands, min_values)
+            raster = self.process_by_window(raster, selected_name_or_id, lambda bands: calculate_back_coef(bands, min_values),
+                                            clear=self.drop_other_bands)
+        else:
+            raster = self.pre_process(raster, bands_to_load=selected_name_or_id, context=context)
+            raster.bands = calculate_back_coef(raster.bands)
 
         raster = self.post_process(raster, context, clear=self.drop_other_bands)
 
@@ -14,14 +14,16 @@ if TYPE_CHECKING:
 @OPERATIONS.reg(name=BAND_MATH_OP)
 @op_constraint(avail_module_types=[OP_Module_Type.SNAP, OP_Module_Type.GDAL])
 class BandMath(CachedOp):
-    def __init__(self, func_name:str, func_target_bands:List[Union[str, int]], out_band_name:Optional[str]=None, normalize:bool=False):
-        super().__init__(BAND_MATH_OP)
+    def __init__(self, func_name:str, func_target_bands:List[Union[str, int]], out_band_name:Optional[str]=None, normalize:bool=False,
+                 window_size:Optional[Union[int, str]]=None):
+        super().__init__(BAND_MATH_OP, window_size=window_size)
         self.lambda_name = func_name
         self.selected_names_or_indices = func_target_bands
         self.out_band_name = out_band_name
         self.normalize = normalize
 
         assert func_name in LAMBDA, f"Lambda name {func_name} is not valid"
+        assert not (normalize and window_size is not None), "normalize needs percentiles of the whole band, so it can not be used with window_size"
 
     def __call__(self, raster:"Raster", context:"Context", *args, **kwargs) -> "Raster":
         if check_bname_index_valid(raster, self.selected_names_or_indices):
@@ -31,15 +33,24 @@ class BandMath(CachedOp):
         
         self.log(f"BandMath operation started: {self.lambda_name}")
         self.log(f"Selected bands are: {band_name}")
-        raster = self.pre_process(raster, bands_to_load=band_name, context=context)
-        
+
         # get lambda function
         lambda_func:Callable = LAMBDA.__get_attr__(name=self.lambda_name, attr_name='constructor')
 
         # check if number of selected bands is equal to number of bands in lambda function
         assert len(band_name) == get_callable_arg_count(lambda_func), f"Number of selected bands ({len(band_name)}) is not equal to number of bands in lambda function ({lambda_func.func_code.co_argcount})"
 
-        args = [raster.bands[bname]['value'] for bname in band_name]
+        if self.use_window(raster):
+            raster = self.process_by_window(raster, band_name, lambda bands: self._apply_func(bands, band_name, lambda_func))
+        else:
+            raster = self.pre_process(raster, bands_to_load=band_name, context=context)
+            raster.bands = self._apply_func(raster.bands, band_name, lambda_func)
+
+        raster = self.post_process(raster, context, clear=False)
+        return raster
+
+    def _apply_func(self, bands:dict, band_name:List[str], lambda_func:Callable) -> dict:
+        args = [bands[bname]['value'] for bname in band_name]
         out_band_value = lambda_func(*args)
 
         if self.normalize:
@@ -51,11 +62,9 @@ class BandMath(CachedOp):
             out_band_name = self.out_band_name
 
         # add new band to last position of raster
-        raster.bands[out_band_name] = {
+        bands[out_band_name] = {
             'value': out_band_value,
-            'no_data': raster.bands[band_name[0]]['no_data']
+            'no_data': bands[band_name[0]]['no_data']
         }
 
-        raster = self.post_process(raster, context, clear=False)
-        return raster
-
+        return bands
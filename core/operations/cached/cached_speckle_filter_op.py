@@ -4,7 +4,7 @@ from core.operations.parent import CachedOp
 
 from core.registry import OPERATIONS
 
-from core.util import apply_lee_filter
+from core.util import apply_lee_filter, accumulate_moments, variance_from_moments
 from core.util.op import op_constraint, OP_Module_Type, CACHED_SPECKLE_FILTER_OP
 from core.raster import Raster
 from core.raster.funcs import check_bname_index_valid
@@ -15,8 +15,9 @@ if TYPE_CHECKING:
 @OPERATIONS.reg(name=CACHED_SPECKLE_FILTER_OP, conf_no_arg_allowed=True)
 @op_constraint(avail_module_types=[OP_Module_Type.GDAL, OP_Module_Type.SNAP])
 class CachedSpeckleFilter(CachedOp):
-    def __init__(self, bands:List[Union[AnyStr, int]]=None, drop_other_bands:bool=False):
-        super().__init__(CACHED_SPECKLE_FILTER_OP)
+    def __init__(self, bands:List[Union[AnyStr, int]]=None, drop_other_bands:bool=False, window_size:Union[int, AnyStr]=None):
+        super().__init__(CACHED_SPECKLE_FILTER_OP, window_size=window_size)
+        self.filter_size = 5
         self.selected_names_or_indices = bands
         self.drop_other_bands = drop_other_bands
 
@@ -28,8 +29,18 @@ class CachedSpeckleFilter(CachedOp):
         self.log(f"All bands are: {raster.get_band_names()}")
         self.log(f"Applying speckle filter to: {selected_name_or_id}")
 
-        raster = self.pre_process(raster, bands_to_load=selected_name_or_id, context=context)
-        raster.bands = apply_lee_filter(raster.bands, 5)
+        if self.use_window(raster):
+            # the variance of the whole band is used as noise variance, windows are read with halo for the filter kernel
+            moments = {}
+            for bands, _, _ in self.iter_window_bands(raster, selected_name_or_id):
+                moments = accumulate_moments(bands, moments)
+            overall_variances = variance_from_moments(moments)
+            raster = self.process_by_window(raster, selected_name_or_id,
+                                            lambda bands: apply_lee_filter(bands, self.filter_size, overall_variances),
+                                            clear=self.drop_other_bands, halo=self.filter_size // 2)
+        else:
+            raster = self.pre_process(raster, bands_to_load=selected_name_or_id, context=context)
+            raster.bands = apply_lee_filter(raster.bands, self.filter_size)
         raster = self.post_process(raster, context, clear=self.drop_other_bands)
 
         return raster
@@ -1,3 +1,4 @@
+from typing import Union, AnyStr
 import numpy as np
 
 from core import OPERATIONS
@@ -11,8 +12,8 @@ from core.operations.parent import CachedOp, SelectOp
 @OPERATIONS.reg(name=REV_REF_OP, conf_no_arg_allowed=True)
 @op_constraint(avail_module_types=[OP_Module_Type.SNAP, OP_Module_Type.GDAL])
 class RevRef(CachedOp):
-    def __init__(self):
-        super().__init__(REV_REF_OP)
+    def __init__(self, window_size:Union[int, AnyStr]=None):
+        super().__init__(REV_REF_OP, window_size=window_size)
 
     @call_constraint(product_types=[ProductType.S2])
     def __call__(self, raster:Raster, context:Context, *args, **kwargs):
@@ -21,17 +22,25 @@ class RevRef(CachedOp):
 
         all_bands = raster.get_band_names()
         self.log(f'target band to recover dn number from reflectance : {all_bands}')
-        cached_raster = self.pre_process(raster, context, bands_to_load=all_bands)
+        atmos_band_meta = raster.meta_dict['atmos_band_meta']
 
+        if self.use_window(raster):
+            cached_raster = self.process_by_window(raster, all_bands, lambda bands: self._to_dn(bands, atmos_band_meta), clear=True)
+        else:
+            cached_raster = self.pre_process(raster, context, bands_to_load=all_bands)
+            cached_raster.bands = self._to_dn(cached_raster.bands, atmos_band_meta)
+
+        self.post_process(cached_raster, context, clear=True)
+
+        return raster
+
+    def _to_dn(self, bands:dict, atmos_band_meta:dict) -> dict:
         QUANTIFICATION_VALUE = 10000
-        for key, band in cached_raster.bands.items():
+        for key, band in bands.items():
             assert np.isnan(band['no_data']), 'no_data should be np.nan'
-            radio_offset = raster.meta_dict['atmos_band_meta'][key]['radio_offset']
+            radio_offset = atmos_band_meta[key]['radio_offset']
             band['value'] = (band['value'] * QUANTIFICATION_VALUE) + np.abs(radio_offset)
             band['value'][np.isnan(band['value'])] = 0
             band['value'] = band['value'].astype(np.uint16)
             band['no_data'] = 0
-
-        self.post_process(cached_raster, context, clear=True)
-
-        return raster
\ No newline at end of file
+        return bands
\ No newline at end of file
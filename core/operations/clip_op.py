@@ -40,6 +40,11 @@ class RasterClip(ParamOp, WarpOp):
             self._bounds_wkt = region_to_wkt(self._bounds)
         self.add_param(geoRegion=self._bounds_wkt)
 
+    @property
+    def bounds(self) -> list[float]:
+        # (min_x, max_y, max_x, min_y) in EPSG:4326
+        return self._bounds
+
     def __call__(self, raster:Raster, context:"Context", *args, **kwargs):
 
         if raster.module_type == ModuleType.SNAP:
@@ -63,8 +68,9 @@ class RasterClip(ParamOp, WarpOp):
         return raster
     
 class VectorClip(Op):
-    def __init__(self, bounds:list[float]):
+    def __init__(self, bounds:list[float], workers:int=1):
         super().__init__(CLIP_OP)
+        self.workers = workers
 
         if len(bounds) == 4:
             self.bounds = [bounds[0], bounds[1], bounds[2], bounds[1], bounds[2], bounds[3], bounds[0], bounds[3]] # ulx, uly, urx, ury, lrx, lry, llx, lly
@@ -76,6 +82,6 @@ class VectorClip(Op):
         assert len(bounds) >= 4, 'bounds should have at least 4(min_x, max_y, max_x, min_y) or 8(ulx, uly, urx, ury, lrx, lry, llx, lly) elements'
 
     def __call__(self, vector:"Vector", context:"Context", *args, **kwargs):
-        clipped_vector = VectorClipper.clip(vector, self.bounds_geom)
+        clipped_vector = VectorClipper.clip(vector, self.bounds_geom, workers=self.workers)
         clipped_vector = self.post_process(clipped_vector, context)
         return clipped_vector
@@ -1,10 +1,15 @@
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from core import OPERATIONS
 from core.util.op import op_constraint, OP_Module_Type
 from core.operations.parent import Op
 from core.operations import MULTI_WRITE_OP
 from core.operations import Write, Split
 from core.raster import ModuleType, Raster, EXT_MAP
+from core.raster.funcs import detach_raster
+from core.util import WriteBehind
 
 @OPERATIONS.reg(name=MULTI_WRITE_OP, conf_no_arg_allowed=False)
 @op_constraint(avail_module_types=[OP_Module_Type.GDAL, OP_Module_Type.SNAP], must_after=Split)
@@ -19,11 +24,19 @@ class MultiWrite(Op):
         assert len(rasters) > 0, 'No raster to write'
         assert all(rasters[0].module_type == r.module_type for r in rasters), 'All rasters must have the same module type'
 
-        out_paths = []
+        writes = []
         for i, raster in enumerate(rasters):
             bands_str = '_'.join([f'{b}'for b in raster.get_band_names()])
-            out_path = Write(out_dir=self._out_dir, out_stem=f'{self._out_stem}.{bands_str}.{i}', out_ext=self._out_ext)(raster)
-            out_paths.append(out_path)
+            writes.append((Write(out_dir=self._out_dir, out_stem=f'{self._out_stem}.{bands_str}.{i}', out_ext=self._out_ext), raster))
+
+        # outputs are independent, gdal rasters are detached from their shared source and written in parallel
+        # unless the write behind pool already does
+        if rasters[0].module_type != ModuleType.GDAL or WriteBehind.get_write_behind().active or len(writes) == 1:
+            out_paths = [write(raster) for write, raster in writes]
+        else:
+            writes = [(write, detach_raster(raster)) for write, raster in writes]
+            with ThreadPoolExecutor(max_workers=min(len(writes), os.cpu_count() or 1), thread_name_prefix='multi_write') as pool:
+                out_paths = list(pool.map(lambda item: item[0](item[1]), writes))
 
         rasters = None
         return out_paths
@@ -1,14 +1,18 @@
-from typing import TYPE_CHECKING, List, AnyStr
+from typing import TYPE_CHECKING, List, AnyStr, Union, Optional, Callable, Iterator
 from core.operations.parent import Op
-from core.raster.funcs import read_band_from_raw, update_raw_from_cache
+from core.raster import ModuleType
+from core.raster.funcs import read_band_from_raw, update_raw_from_cache, get_band_name_and_index
+from core.raster.funcs.meta import MetaBandsManager
+from core.util.gdal import read_gdal_bands_as_dict, create_scratch_ds, get_window_size, iter_windows, is_vrt_ds, materialize_ds
 
 if TYPE_CHECKING:
     from core.raster import Raster
     from core.logic import Context
 
 class CachedOp(Op):
-    def __init__(self, op_name):
+    def __init__(self, op_name, window_size:Optional[Union[int, AnyStr]]=None):
         super().__init__(op_name)
+        self.window_size = window_size
 
     def __call__(self, *args, **kwargs):
         pass
@@ -16,6 +20,9 @@ class CachedOp(Op):
     def pre_process(self, data: "Raster", context: "Context", *args, **kwargs):
 
         bands_to_load = kwargs['bands_to_load']
+        if data.module_type == ModuleType.GDAL and is_vrt_ds(data.raw):
+            # the lazy vrt graph is computed once here instead of for every band read from raw
+            data.raw = materialize_ds(data.raw)
         target_raster = read_band_from_raw(data, bands_to_load, add_to_cache=True)
         self._logger.log('DEBUG', f'({self.__class__.__name__})-->preprocess : {bands_to_load} bands are loaded from raw')
         return target_raster
@@ -24,4 +31,63 @@ class CachedOp(Op):
         raster = update_raw_from_cache(raster, clear=clear)
         raster = super().post_process(raster, context)
         self._logger.log('DEBUG', f'({self.__class__.__name__})-->postprocess : bands({raster.get_cached_band_names()}) are updated to raw')
-        return raster
\ No newline at end of file
+        return raster
+
+    def use_window(self, raster:"Raster") -> bool:
+        return self.window_size is not None and raster.module_type == ModuleType.GDAL
+
+    def iter_window_bands(self, raster:"Raster", bands_to_load:List[Union[AnyStr, int]], halo:int=0) -> Iterator[tuple[dict, tuple, tuple]]:
+        src_ds = raster.raw
+        all_bnames = raster.get_band_names()
+        _, load_index = get_band_name_and_index(raster, bands_to_load)
+        win_x, win_y = get_window_size(src_ds, self.window_size)
+
+        for read_window, write_window, inner in iter_windows(src_ds.RasterXSize, src_ds.RasterYSize, win_x, win_y, halo):
+            bands, _ = read_gdal_bands_as_dict(src_ds, all_band_names=all_bnames, selected_index=load_index, window=read_window)
+            yield bands, write_window, inner
+
+    def process_by_window(self, raster:"Raster", bands_to_load:List[Union[AnyStr, int]], band_func:Callable[[dict], dict],
+                          clear:bool=False, halo:int=0) -> "Raster":
+        # same result as pre_process -> band_func -> update_raw_from_cache, but only a window of the bands is in memory,
+        # the windows are written to a tiled scratch GTiff which is kept in /vsimem only when it is small
+        src_ds = raster.raw
+        all_bnames = raster.get_band_names()
+        out_ds, out_bnames, out_dtype = None, None, None
+
+        self._logger.log('DEBUG', f'({self.__class__.__name__})-->process_by_window : {bands_to_load} bands are processed by window({self.window_size})')
+
+        for bands, write_window, inner in self.iter_window_bands(raster, bands_to_load, halo):
+            x_off, y_off, x_size, y_size = write_window
+            bands = band_func(bands)
+            bands = {bname: {'value': band['value'][inner], 'no_data': band['no_data']} for bname, band in bands.items()}
+
+            if not clear:
+                not_cached_bnames = [bname for bname in all_bnames if bname not in bands]
+                if len(not_cached_bnames) > 0:
+                    not_cached_bands, _ = read_gdal_bands_as_dict(src_ds, all_band_names=all_bnames,
+                                                                  selected_index=[all_bnames.index(bname) + 1 for bname in not_cached_bnames],
+                                                                  window=write_window)
+                    bands.update(not_cached_bands)
+
+            if out_ds is None:
+                if clear:
+                    out_bnames = list(bands.keys())
+                else:
+                    out_bnames = all_bnames + [bname for bname in bands if bname not in all_bnames]
+                out_dtype = max([band['value'].dtype for band in bands.values()], key=lambda x: x.itemsize)
+                out_ds = create_scratch_ds(src_ds.RasterXSize, src_ds.RasterYSize, len(out_bnames), out_dtype.name,
+                                           proj_wkt=src_ds.GetProjection(), transform=src_ds.GetGeoTransform(), metadata=src_ds.GetMetadata())
+                for b_idx, bname in enumerate(out_bnames, start=1):
+                    no_data = bands[bname]['no_data']
+                    out_ds.GetRasterBand(b_idx).SetNoDataValue(no_data if no_data is not None else 0)
+
+            for b_idx, bname in enumerate(out_bnames, start=1):
+                out_ds.GetRasterBand(b_idx).WriteArray(bands[bname]['value'].astype(out_dtype, copy=False), x_off, y_off)
+
+        out_ds.FlushCache()
+        raster.raw = out_ds
+        btoi = {bname: b_idx for b_idx, bname in enumerate(out_bnames, start=1)}
+        if btoi != raster.band_to_index:
+            MetaBandsManager(raster).update_band_mapping(btoi)
+
+        return raster
@@ -5,11 +5,22 @@ from core.logic.event import EventEmitter
 from core.util.op import OP_Module_Type
 from core.util.errors import OPTypeNotAvailableError
 from core.util.logger import Logger, print_log_attrs
+from core.util.profiler import Profiler
+from core.util.memory_account import MemoryAccount
+from core.raster.funcs import result_nbytes
 
 if TYPE_CHECKING:
     from core.base import GeoData
     from core.logic import Context
 
+def result_shape(result) -> Union[tuple, list, None]:
+    # (bands, height, width) of the resulting rasters, recorded by the profiler
+    if isinstance(result, Raster):
+        return result.get_shape()
+    if isinstance(result, (list, tuple)):
+        return [r.get_shape() for r in result if isinstance(r, Raster)]
+    return None
+
 class LogCall(type):
     def __new__(mcs, name, bases, attrs):
         if '__call__' in attrs:
@@ -18,8 +29,20 @@ class LogCall(type):
             def wrapped_call(self, *args, **kwargs):
                 self.start_log()
                 print_log_attrs(self, 'debug')
+                result = None
+                profiler = Profiler.get_profiler()
                 try:
-                    result = original_call(self, *args, **kwargs)
+                    if not profiler.enabled:
+                        result = original_call(self, *args, **kwargs)
+                        MemoryAccount.get_account().record(self.proc_name, self.op_name, result_nbytes(result))
+                        return result
+
+                    with profiler.profile(self.proc_name, self.op_name) as record:
+                        result = original_call(self, *args, **kwargs)
+                        record['counter'] = self.counter
+                        record['shape'] = result_shape(result)
+                        record['raster_bytes'] = result_nbytes(result)
+                    MemoryAccount.get_account().record(self.proc_name, self.op_name, record['raster_bytes'])
                     return result
                 finally:
                     self.end_log(result)
@@ -90,6 +113,10 @@ class Op(EventEmitter, metaclass=LogCall):
     def counter(self):
         return self._counter
 
+    @counter.setter
+    def counter(self, count:int):
+        self._counter = count
+
     def reset_counter(self):
         self._counter = 0
 
@@ -5,7 +5,7 @@ from core import OPERATIONS
 from core.operations.parent import SelectOp
 
 
-from core.util import check_input_ext
+from core.util import check_input_ext, WriteBehind
 from core.util.op import op_constraint, OP_Module_Type, READ_OP
 from core.util.errors import ExtensionNotSupportedError
 from core.util import assert_bnames
@@ -13,6 +13,7 @@ from core.util import assert_bnames
 from core.raster import ModuleType, Raster, MODULE_EXT_MAP
 from core.raster.funcs import find_bands_contains_word
 from core.raster.funcs.reader import ReaderFactory, SafeGdalReader
+from core.util.gdal import bounds_window, window_vrt
 
 if TYPE_CHECKING:
     from core.logic.context import Context
@@ -31,14 +32,36 @@ class Read(SelectOp):
         self._sel_by_bword = kwargs.get('sel_by_bword', '*')
         self._stack_files = kwargs.get('stack_files', None)
         self._read_and_stack = kwargs.get('read_and_stack', False)        
+        self._window_bounds:Optional[list[float]] = None
 
         self.module_type = OP_Module_Type.from_str(module)
 
+    def set_window(self, bounds:Optional[list[float]]):
+        # bounds(min_x, max_y, max_x, min_y) in EPSG:4326 of a clip after the read, gdal rasters are read only around them
+        self._window_bounds = bounds
+        return self
+
+    def set_needed_bands(self, bands:Optional[list[str]]):
+        # names of the bands needed by the ops after the read, the other bands are dropped when the file is read
+        if not bands or self._bname_word_included or self._stack_files is not None:
+            return self
+
+        if not self._selected_bands_or_indices:
+            self._selected_bands_or_indices = list(bands)
+        elif all([isinstance(b, str) for b in self._selected_bands_or_indices]):
+            needed = [b for b in self._selected_bands_or_indices if b in bands]
+            if len(needed) > 0:
+                self._selected_bands_or_indices = needed
+        return self
+
     def __call__(self, path:str, context:"Context", *args, **kwargs) -> Raster:
 
         if self._selected_bands_or_indices:
             assert self._bname_word_included == False, "selected bands and bname_word_included cannot be used together"
 
+        # the file can be the output of a write still running in the background
+        WriteBehind.get_write_behind().wait(path)
+
         in_ext = check_input_ext(path)
         if in_ext not in MODULE_EXT_MAP[self._module.__str__()]:
             raise ExtensionNotSupportedError(self._module, MODULE_EXT_MAP[self._module.__str__()], in_ext)
@@ -52,6 +75,12 @@ class Read(SelectOp):
         else:
             raster = reader.read(file_path=path)
 
+        if self._window_bounds is not None and raster.module_type == ModuleType.GDAL:
+            window = bounds_window(raster.raw, self._window_bounds)
+            if window is not None:
+                self.log(f'Reading the window {window} of {raster.raw.RasterXSize} x {raster.raw.RasterYSize} pixels', 'debug')
+                raster.raw = window_vrt(raster.raw, window)
+
         if self._bname_word_included:
             assert self._sel_by_bword, 'bword should be provided for bname_word_included'
             # assert self._module == RasterType.SNAP, 'bname_word_included is only available for SNAP module'
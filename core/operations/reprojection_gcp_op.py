@@ -4,17 +4,21 @@ from core.operations import OPERATIONS, GCP_REPROJECT_OP
 from core.logic import Context
 from core.raster import Raster, ModuleType
 
-from core.util import str_to_hash
 from core.util.op import OP_Module_Type, op_constraint
-from core.util.gdal import is_epsg_code_valid, unit_from_epsg, read_gdal_bands, create_gcp, reproject_arr_using_gcp
+from core.util.gdal import is_epsg_code_valid, unit_from_epsg, read_gdal_bands, get_cached_gcp, \
+    reproject_arr_using_gcp, reproject_arr_using_geoloc
 
 GDAL_RESAMPLING_METHODS = ['nearest', 'bilinear', 'cubic', 'cubicspline', 'lanczos']
 
+# gcp fits a polynomial to gcps sampled from the lat/lng bands, geolocation locates every pixel by its lat/lng
+GCP_REPROJECT_METHODS = ['gcp', 'geolocation']
+
 @OPERATIONS.reg(name=GCP_REPROJECT_OP, no_arg_allowed=False)
 @op_constraint(avail_module_types=[OP_Module_Type.GDAL])
 class GCPReproject(SelectOp):
     def __init__(self, lat_band:str, lng_band:str, pixel_size:float, bands:List[Union[int,AnyStr]]=None,
-                 gcp_epsg:int=4326, no_data:Union[int,float]=-999., resampling_method:str='nearest'):
+                 gcp_epsg:int=4326, no_data:Union[int,float]=-999., resampling_method:str='nearest', method:str='gcp',
+                 gcp_grid_size:int=20):
         super().__init__(GCP_REPROJECT_OP)
 
         self._selected_bands_or_indices = bands
@@ -30,6 +34,12 @@ class GCPReproject(SelectOp):
         assert pixel_size > 0, 'pixel_size should be greater than 0'
         self._pixel_size = pixel_size
 
+        assert method in GCP_REPROJECT_METHODS, f'method should be one of {GCP_REPROJECT_METHODS}'
+        self._method = method
+
+        assert gcp_grid_size > 0, 'gcp_grid_size should be greater than 0'
+        self._gcp_grid_size = gcp_grid_size
+
     def __call__(self, raster:Raster, context:Context, *args):
 
         if not is_epsg_code_valid(self._gcp_epsg):
@@ -45,23 +55,21 @@ class GCPReproject(SelectOp):
         min_lng, max_lng = lng_band.min(), lng_band.max()
         min_lat, max_lat = lat_band.min(), lat_band.max()
 
-        gcp_key = str_to_hash(f'{min_lng}{max_lng}{min_lat}{max_lat}{self._gcp_epsg}')
-
-        try:
-            if gcp_key in context.cache:
-                 gcp_list = context.cache[f'gcp_{gcp_key}']
-            else:
-                gcp_list = create_gcp(lons=lng_band, lats=lat_band)
-                # todo: add to cache
-        except Exception as e:
-            gcp_list = create_gcp(lons=lng_band, lats=lat_band)
-
-        resampling_method = self._resampling_method
         arr = raster.raw.ReadAsArray()
-        reprojected_ds = reproject_arr_using_gcp(arr, gcp_list,
-                                                 min_x=min_lng, max_x=max_lng, min_y=min_lat, max_y=max_lat,
-                                                 res=self._pixel_size, resampling_method=self._resampling_method,
-                                                 in_epsg=self._gcp_epsg, no_data=self._no_data)
+        if self._method == 'geolocation':
+            reprojected_ds = reproject_arr_using_geoloc(arr, lng_band, lat_band,
+                                                        min_x=min_lng, max_x=max_lng, min_y=min_lat, max_y=max_lat,
+                                                        res=self._pixel_size, resampling_method=self._resampling_method,
+                                                        in_epsg=self._gcp_epsg, no_data=self._no_data)
+        else:
+            # gcps are built once in each process for the rasters sharing the same lat/lng bands, they are not kept in
+            # the context which is sent back from the workers of MultiProcessor
+            gcp_list = get_cached_gcp(lons=lng_band, lats=lat_band, grid_size=self._gcp_grid_size)
+
+            reprojected_ds = reproject_arr_using_gcp(arr, gcp_list,
+                                                     min_x=min_lng, max_x=max_lng, min_y=min_lat, max_y=max_lat,
+                                                     res=self._pixel_size, resampling_method=self._resampling_method,
+                                                     in_epsg=self._gcp_epsg, no_data=self._no_data)
         raster.raw = reprojected_ds
 
         raster = self.pre_process(raster, selected_bands_or_indices=self._selected_bands_or_indices,
@@ -22,6 +22,10 @@ class Select(SelectOp):
         if band_labels is None:
             assert bands is not None, 'bands or band_labels should be provided'
 
+    @property
+    def selected_bands(self) -> Optional[List[Union[int, AnyStr]]]:
+        return self._selected_bands
+
     def __call__(self, raster:"Raster", context:"Context", *args):
 
         if self._selected_bands:
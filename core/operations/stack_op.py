@@ -26,6 +26,10 @@ class Stack(SelectOp):
         self._geo_err = geo_err
         self.module_type = OP_Module_Type.from_str(master_module)
 
+    @property
+    def bands_list(self) -> List[List[Union[str, int]]]:
+        return self._selected_bands_list
+
     def copy_meta(self, raster:"Raster", selected_meta:dict):
 
         if selected_meta is not None:
@@ -3,14 +3,16 @@ from pathlib import Path
 
 from core import OPERATIONS
 
-from core.util import expand_var
+from core.util import expand_var, WriteBehind
 from core.util.errors import ExtensionNotSupportedError, ExtensionMatchingError, NotHaveSameBandShapeError
 from core.util.op import OP_Module_Type, op_constraint, WRITE_OP
 from core.operations import SelectOp
 
 from core.raster import ModuleType, Raster, EXT_MAP
-from core.raster.funcs import has_same_band_shape, check_bname_index_valid
+from core.raster.funcs import has_same_band_shape, check_bname_index_valid, detach_raster
 from core.raster.funcs.writer import get_writer
+from core.util.gdal import DEFAULT_BLOCK_SIZE, DEFAULT_NUM_THREADS, GTIFF_PROFILE, WRITE_PROFILES
+
 DEFAULT_OUT_EXT = {
     ModuleType.GDAL : 'tif',
     ModuleType.SNAP : 'dim'
@@ -21,12 +23,15 @@ DEFAULT_OUT_EXT = {
 class Write(SelectOp):
     def __init__(self, out_path: Optional[str]=None, out_dir: str = None, out_stem: str = 'out', out_ext: str = '',
                  bands: List[Union[int, AnyStr]] = None,
-                 prefix: str = '', suffix: str = '', compress=False):
+                 prefix: str = '', suffix: str = '', compress:Union[bool, str, None]=None, compress_level:int=None,
+                 predictor:int=None, max_z_error:float=None, tiled:bool=True, block_size:int=DEFAULT_BLOCK_SIZE,
+                 num_threads:Union[int, str]=DEFAULT_NUM_THREADS, overviews:Union[bool, List[int]]=False, profile:str=GTIFF_PROFILE):
 
         super().__init__(WRITE_OP)
 
         if out_path is None:
             assert out_dir is not None, 'out_dir should be provided when out_path is None'
+        assert profile in WRITE_PROFILES, f'profile should be one of {WRITE_PROFILES}'
 
         self.selected_names_or_indices = bands
         self._setup_path_info(out_path, out_dir, out_stem, out_ext)
@@ -34,6 +39,12 @@ class Write(SelectOp):
         self._suffix = suffix
         self._compress = compress
 
+        # creation options of the gdal tif writer, unspecified options are picked from the dtype of the raster
+        self._write_options = {
+            'compress': compress, 'compress_level': compress_level, 'predictor': predictor, 'max_z_error': max_z_error,
+            'tiled': tiled, 'block_size': block_size, 'num_threads': num_threads, 'overviews': overviews, 'profile': profile
+        }
+
     def _setup_path_info(self, out_path: Optional[str], out_dir: str, out_stem: str, out_ext: str) -> None:
         if out_path is not None:
             self._out_path = out_path
@@ -58,14 +69,21 @@ class Write(SelectOp):
         
         self._validate_tif_format_for_snap(result)
         
-        writer = get_writer(result)
-        writer.write(output_path)
+        write_behind = WriteBehind.get_write_behind()
+        if write_behind.active and result.module_type == ModuleType.GDAL:
+            # the pixels are detached from shared sources here and compressed and written in the background
+            write_behind.submit(output_path, self._write, get_writer(detach_raster(result)), output_path)
+        else:
+            self._write(get_writer(result), output_path)
 
         self.post_process(result, None)
-        self.log(f'Result is written to "{output_path}"')
         raster = None
 
         return output_path
+
+    def _write(self, writer, output_path:str):
+        writer.write(output_path, **self._write_options)
+        self.log(f'Result is written to "{output_path}"')
     
     
     def _validate_extension(self, module_type: ModuleType) -> None:
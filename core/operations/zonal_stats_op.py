@@ -0,0 +1,111 @@
+from typing import TYPE_CHECKING, List, Union, AnyStr, Optional, Iterator
+from pathlib import Path
+
+from core import OPERATIONS
+from core.operations.parent import Op
+from core.raster import ModuleType
+from core.raster.funcs import check_bname_index_valid, get_band_name_and_index
+from core.util import expand_var
+from core.util.op import OP_Module_Type, op_constraint, ZONAL_STATS_OP
+from core.util.gdal import read_vector_ds, get_window_size, iter_windows, read_gdal_bands_as_dict, \
+    ZONAL_STATS, ZONAL_PERCENTILE_BINS, ZONAL_TABLE_DRIVERS, ZonalAccumulator, ZonalHistogram, zone_layer_ds, rasterize_zones, \
+    write_zonal_table
+
+if TYPE_CHECKING:
+    from core.raster import Raster
+    from core.logic import Context
+
+ZONAL_WINDOW_SIZE = 1024
+
+@OPERATIONS.reg(name=ZONAL_STATS_OP, no_arg_allowed=False)
+@op_constraint(avail_module_types=[OP_Module_Type.GDAL])
+class ZonalStats(Op):
+    def __init__(self, vector_path:str, out_path:Optional[str]=None, out_dir:str=None, out_stem:str='zonal_stats', out_ext:str='gpkg',
+                 bands:List[Union[int, AnyStr]]=None, stats:List[str]=None, percentiles:List[float]=None,
+                 percentile_bins:int=ZONAL_PERCENTILE_BINS, window_size:Union[int, str]=ZONAL_WINDOW_SIZE):
+        super().__init__(ZONAL_STATS_OP)
+
+        if out_path is None:
+            assert out_dir is not None, 'out_dir should be provided when out_path is None'
+            assert out_ext in ZONAL_TABLE_DRIVERS, f'out_ext should be one of {list(ZONAL_TABLE_DRIVERS.keys())}'
+
+        self.vector_path = vector_path
+        self.selected_names_or_indices = bands
+        self.stats = ZONAL_STATS if stats is None else stats
+        self.percentiles = percentiles if percentiles else []
+        self.percentile_bins = percentile_bins
+        self.window_size = window_size
+
+        self._out_path = out_path
+        self._out_dir = out_dir
+        self._out_stem = out_stem
+        self._out_ext = out_ext
+
+        assert all([stat in ZONAL_STATS for stat in self.stats]), f'stats should be in {ZONAL_STATS}'
+        assert all([0 <= q <= 100 for q in self.percentiles]), 'percentiles should be between 0 and 100'
+        assert percentile_bins > 0, 'percentile_bins should be greater than 0'
+
+    def _build_output_path(self) -> str:
+        if self._out_path is not None:
+            out_path = expand_var(self._out_path)
+        else:
+            out_path = f"{expand_var(self._out_dir)}/{self._out_stem}.{self.counter}.{self._out_ext}"
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        return out_path
+
+    def _iter_zone_windows(self, raster:"Raster", zone_layer, band_index:list[int]) -> Iterator[tuple]:
+        # zone ids and bands of the windows covered by a zone
+        src_ds = raster.raw
+        win_x, win_y = get_window_size(src_ds, self.window_size)
+        for window, _, _ in iter_windows(src_ds.RasterXSize, src_ds.RasterYSize, win_x, win_y):
+            zones = rasterize_zones(zone_layer, src_ds, window)
+            if not zones.any():
+                continue
+            bands, _ = read_gdal_bands_as_dict(src_ds, all_band_names=raster.get_band_names(), selected_index=band_index, window=window)
+            yield zones, bands
+
+    def __call__(self, raster:"Raster", context:"Context", *args, **kwargs) -> str:
+        assert raster.module_type == ModuleType.GDAL, 'Zonal statistics are only available for GDAL module'
+
+        if check_bname_index_valid(raster, self.selected_names_or_indices):
+            band_names, band_index = get_band_name_and_index(raster, self.selected_names_or_indices)
+        else:
+            band_names = raster.get_band_names()
+            band_index = list(range(1, len(band_names) + 1))
+
+        vector_path = expand_var(self.vector_path)
+        vector_ds = read_vector_ds(vector_path)
+        assert vector_ds is not None, f'vector of the zones can not be opened from {vector_path}'
+        layer = vector_ds.GetLayer()
+
+        # the zones are rasterised once for every window, the statistics of all bands are accumulated from it
+        src_ds = raster.raw
+        zone_ds = zone_layer_ds(layer, src_ds.GetProjection())
+        zone_layer = zone_ds.GetLayer()
+        n_zones = zone_layer.GetFeatureCount()
+
+        accumulators = {bname: ZonalAccumulator(n_zones) for bname in band_names}
+        for zones, bands in self._iter_zone_windows(raster, zone_layer, band_index):
+            for bname in band_names:
+                accumulators[bname].add(zones, bands[bname]['value'], bands[bname]['no_data'])
+
+        zone_stats = {}
+        for bname, accumulator in accumulators.items():
+            for stat, values in accumulator.result(self.stats).items():
+                zone_stats[f'{bname}_{stat}'] = values
+
+        if self.percentiles:
+            # a second pass fills histograms between the min and max of every zone, instead of keeping its pixels
+            histograms = {bname: ZonalHistogram(acc.min, acc.max, self.percentile_bins) for bname, acc in accumulators.items()}
+            for zones, bands in self._iter_zone_windows(raster, zone_layer, band_index):
+                for bname in band_names:
+                    histograms[bname].add(zones, bands[bname]['value'], bands[bname]['no_data'])
+            for bname, histogram in histograms.items():
+                for stat, values in histogram.percentiles(self.percentiles).items():
+                    zone_stats[f'{bname}_{stat}'] = values
+
+        output_path = write_zonal_table(layer, zone_stats, self._build_output_path())
+        self.log(f'Zonal statistics of {len(band_names)} bands over {n_zones} zones are written to "{output_path}"')
+
+        self.post_process(raster, context)
+        return output_path
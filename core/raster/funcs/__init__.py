@@ -16,3 +16,6 @@ from .check_multi_size import *
 from .select_bands import *
 from .split_raster import *
 from .atmos_raster import *
+from .raster_payload import *
+from .copy_raster import *
+from .raster_bytes import *
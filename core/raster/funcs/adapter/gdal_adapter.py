@@ -1,7 +1,7 @@
 from typing import List, TYPE_CHECKING, Tuple
 from pathlib import Path
 
-from core.util.gdal import mosaic_by_file_paths, load_raster_gdal, merge, copy_ds
+from core.util.gdal import mosaic_by_file_paths, load_raster_gdal, stack_vrt, copy_ds, build_overviews, COG_PROFILE, GTIFF_PROFILE
 
 from core.raster.funcs.adapter.base_raster_adapter import BaseRasterAdapter
 
@@ -18,13 +18,20 @@ class GdalRasterAdapter(BaseRasterAdapter):
         else:
             if stack:
                 self.update_meta_bounds = False
-                return merge(load_raster_gdal(img_paths))
+                return stack_vrt(load_raster_gdal(img_paths))
             else:
                 self.update_meta_bounds = True
                 return mosaic_by_file_paths(img_paths)
     
-    def write_data(self, ds: "Dataset", out_path:str, is_bigtiff:bool, compress:bool, *args, **kwargs):
+    def write_data(self, ds: "Dataset", out_path:str, is_bigtiff:bool, compress:bool, options:List[str]=None,
+                   profile:str=GTIFF_PROFILE, overview_levels:List[int]=None, *args, **kwargs):
         
         assert Path(out_path).suffix.lower() in ALLOWED_EXTENSIONS
 
-        return copy_ds(ds, 'GTiff', is_bigtiff=is_bigtiff, compress=compress,out_path=out_path)
\ No newline at end of file
+        if profile == COG_PROFILE:
+            return copy_ds(ds, 'COG', out_path=out_path, options=options)
+
+        out_ds = copy_ds(ds, 'GTiff', is_bigtiff=is_bigtiff, compress=compress, out_path=out_path, options=options)
+        if overview_levels is not None:
+            out_ds = build_overviews(out_ds, levels=overview_levels if len(overview_levels) > 0 else None)
+        return out_ds
\ No newline at end of file
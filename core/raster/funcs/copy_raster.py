@@ -0,0 +1,51 @@
+import copy
+from typing import Union, AnyStr
+
+from core.util import ModuleType
+from core.util.gdal import copy_ds, wrap_vrt
+from core.util.snap import copy_product
+from core.util.nc import copy_nc_ds
+from core.raster import Raster
+
+def copy_raw(raster:Raster):
+    if raster.raw is None:
+        return None
+
+    if raster.module_type == ModuleType.GDAL:
+        # in-memory pixels are copied, file and vrt datasets are only read, so a vrt over them is enough
+        if raster.raw.GetDriver().ShortName == 'MEM':
+            return copy_ds(raster.raw, 'MEM')
+        return wrap_vrt(raster.raw)
+    elif raster.module_type == ModuleType.SNAP:
+        return copy_product(raster.raw)
+    elif raster.module_type == ModuleType.NETCDF:
+        return copy_nc_ds(raster.raw, close_src=False)
+    else:
+        raise NotImplementedError(f'Raster type {raster.module_type.__str__()} is not implemented')
+
+def copy_raster(raster:Raster) -> Raster:
+    # ops change the raster in place, so the copy shares neither the raw, the cached bands nor the meta with the source
+    new_raster = copy.copy(raster)
+    new_raster.raw = copy_raw(raster)
+    new_raster.bands = raster.bands.copy() if raster.bands is not None else None
+    new_raster._op_history = list(raster.op_history)
+    new_raster.meta_dict = copy.deepcopy(raster.meta_dict)
+    new_raster.index_to_band = raster.index_to_band
+    new_raster.band_to_index = raster.band_to_index
+
+    return new_raster
+
+def detach_raster(raster:Raster) -> Raster:
+    # pixels of the result can be read by another thread, gdal datasets other than MEM can share their sources with other rasters
+    detached = copy.copy(raster)
+    if raster.module_type == ModuleType.GDAL and raster.raw is not None and raster.raw.GetDriver().ShortName != 'MEM':
+        detached.raw = copy_ds(raster.raw, 'MEM')
+    return detached
+
+def copy_result(x:Union[Raster, AnyStr, list]) -> Union[Raster, AnyStr, list]:
+    if isinstance(x, Raster):
+        return copy_raster(x)
+    elif isinstance(x, list):
+        return [copy_result(elem) for elem in x]
+    else:
+        return x
@@ -3,7 +3,7 @@ from typing import Union
 from core.raster import Raster, ModuleType
 from core.util import assert_bnames, ProductType
 from core.util.snap import merge as merge_gpf
-from core.util.gdal import merge as merge_gdal
+from core.util.gdal import stack_vrt
 from core.raster.funcs.meta import MetaBandsManager
 def merge_product_types(rasters:list[Raster]):
     product_types = [r.product_type for r in rasters]
@@ -17,7 +17,7 @@ def merge_raster_func(rasters:list[Raster], module_type:ModuleType, geo_err:floa
 
     band_name_list = []
     if module_type == ModuleType.GDAL:
-        merged = merge_gdal(raw_list)
+        merged = stack_vrt(raw_list)
         for i, r in enumerate(rasters):
             if i == 0:
                 ds_name = 'masterDs'
@@ -0,0 +1,45 @@
+from typing import Any
+
+import numpy as np
+
+from core.util import ModuleType
+from core.raster import Raster
+
+def _root_array(arr:np.ndarray) -> np.ndarray:
+    # bands of a BandCache are views of one buffer, the memory is held by the array owning the data
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr
+
+def cached_bands_nbytes(raster:Raster) -> int:
+    if not raster.bands:
+        return 0
+
+    roots = {}
+    for band in raster.bands.values():
+        value = band.get('value') if isinstance(band, dict) else band
+        if isinstance(value, np.ndarray):
+            root = _root_array(value)
+            roots[id(root)] = root.nbytes
+    return sum(roots.values())
+
+def mem_dataset_nbytes(raster:Raster) -> int:
+    # pixels of gdal datasets are held in memory only by the MEM driver, file and vrt datasets are read on demand
+    if raster.module_type != ModuleType.GDAL or raster.raw is None or raster.raw.GetDriver().ShortName != 'MEM':
+        return 0
+
+    from osgeo import gdal
+    ds = raster.raw
+    if ds.RasterCount == 0:
+        return 0
+    return ds.RasterXSize * ds.RasterYSize * sum([gdal.GetDataTypeSize(ds.GetRasterBand(i + 1).DataType) // 8 for i in range(ds.RasterCount)])
+
+def raster_nbytes(raster:Raster) -> int:
+    return cached_bands_nbytes(raster) + mem_dataset_nbytes(raster)
+
+def result_nbytes(result:Any) -> int:
+    if isinstance(result, Raster):
+        return raster_nbytes(result)
+    if isinstance(result, (list, tuple)):
+        return sum([result_nbytes(elem) for elem in result])
+    return 0
@@ -0,0 +1,36 @@
+from typing import Union, AnyStr, Any
+
+from core.util.gdal import ds_to_buffer, ds_from_buffer
+from core.raster import Raster, ModuleType
+
+def pack_raster(raster:Raster) -> tuple[Raster, bytes]:
+    # raw objects can not be pickled, so the gdal dataset is moved as an in-memory GTiff buffer
+    if raster.module_type != ModuleType.GDAL:
+        raise NotImplementedError(f'Raster of {raster.module_type} can not be sent between processes. '
+                                  f'End the processor with a write operation or read the raster with gdal module.')
+
+    buffer = ds_to_buffer(raster.raw)
+    raster.raw = None
+
+    return raster, buffer
+
+def unpack_raster(raster:Raster, buffer:bytes) -> Raster:
+    raster.raw = ds_from_buffer(buffer)
+    return raster
+
+def pack_result(x:Union[Raster, AnyStr, list]) -> Any:
+    if isinstance(x, Raster):
+        return 'raster', pack_raster(x)
+    elif isinstance(x, list):
+        return 'list', [pack_result(elem) for elem in x]
+    else:
+        return 'value', x
+
+def unpack_result(packed:Any) -> Union[Raster, AnyStr, list]:
+    kind, x = packed
+    if kind == 'raster':
+        return unpack_raster(*x)
+    elif kind == 'list':
+        return [unpack_result(elem) for elem in x]
+    else:
+        return x
@@ -3,7 +3,7 @@ from core.util import assert_bnames, glob_match, ModuleType
 from core.raster import Raster
 
 from core.util.snap import copy_product
-from core.util.gdal import copy_ds
+from core.util.gdal import select_bands_vrt
 from core.util.nc import copy_nc_ds
 from core.raster.funcs.meta import MetaBandsManager
 from core.raster.funcs import get_band_name_and_index
@@ -25,7 +25,7 @@ def select_band_raster(raster:Raster, selected_bands_or_indices:List[Union[int,s
 
     if raster.module_type == ModuleType.GDAL:
         assert all([b > 0 for b in selected_index]), f'selected_bands for module "{ModuleType.GDAL.__str__()}" should be > 0'
-        raw = copy_ds(raster.raw, 'MEM', selected_index=selected_index)
+        raw = select_bands_vrt(raster.raw, selected_index)
     elif raster.module_type == ModuleType.SNAP:
         raw = copy_product(raster.raw, selected_bands=selected_band_name, copy_tie_point=False)
     elif raster.module_type == ModuleType.NETCDF:
@@ -1,5 +1,5 @@
-from core.util import assert_bnames, remove_list_elements, deprecated
-from core.util.gdal import read_gdal_bands_as_dict, create_ds_with_dict
+from core.util import assert_bnames, remove_list_elements, deprecated, BandCache
+from core.util.gdal import read_gdal_bands_as_dict, create_ds_with_dict, create_ds_with_buffer, is_datapointer_dtype
 from core.util.snap import copy_cached_to_raw_gpf, read_gpf_bands_as_dict, del_bands_from_product
 from core.raster import Raster, ModuleType
 from core.raster.funcs import read_band_from_raw
@@ -72,7 +72,17 @@ def update_raw_from_cache(raster:Raster, clear=False):
             gt = raster.raw.GetGeoTransform()
             metadata = raster.raw.GetMetadata()
             raster.raw = None
-            raster.raw, btoi = create_ds_with_dict(raster.bands, 'MEM', proj_wkt=proj, transform=gt, metadata=metadata, out_path='')
+
+            bnames = list(raster.bands.keys())
+            if isinstance(raster.bands, BandCache) and is_datapointer_dtype(raster.bands[bnames[0]]['value'].dtype):
+                # cached bands are packed into one buffer which is shared with the MEM dataset
+                arr = raster.bands.to_array(bnames)
+                no_data_vals = [raster.bands[bname]['no_data'] for bname in bnames]
+                raster.raw = create_ds_with_buffer(arr, proj_wkt=proj, transform=gt, metadata=metadata, no_data_vals=no_data_vals)
+                btoi = {bname: b_idx for b_idx, bname in enumerate(bnames, start=1)}
+            else:
+                raster.raw, btoi = create_ds_with_dict(raster.bands, 'MEM', proj_wkt=proj, transform=gt, metadata=metadata, out_path='')
+
             if btoi != raster.band_to_index:
                 MetaBandsManager(raster).update_band_mapping(btoi)
         else:
@@ -31,10 +31,10 @@ class BaseRasterWriter(ABC):
         else:
             raise ValueError(f"Unsupported file extension: {ext}")
     
-    def write(self, path: str) -> None:
+    def write(self, path: str, **write_options) -> None:
         ext = Path(path).suffix.lower()
         if ext in self._format_strategies:
-            self._format_strategies[ext].write(self, self.raster, path)
+            self._format_strategies[ext].write(self, self.raster, path, **write_options)
         else:
             raise ValueError(f"Unsupported file extension: {ext}")
 
@@ -1,8 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union, List
 
 from core.raster import Raster
-from core.util.gdal import is_bigtiff_gdal
+from core.util.gdal import is_bigtiff_gdal, build_tiff_options, GTIFF_PROFILE
 from core.util.snap import is_bigtiff_gpf
 from core.util import set_btoi_to_tif, set_btoi_to_tif_meta
 from core.util.meta import write_metadata
@@ -12,7 +12,7 @@ if TYPE_CHECKING:
 
 class FormatStrategy(ABC):
     @abstractmethod
-    def write(self, writer, raster: Raster, path: str) -> None:
+    def write(self, writer, raster: Raster, path: str, **write_options) -> None:
         pass
     
     @abstractmethod
@@ -20,17 +20,26 @@ class FormatStrategy(ABC):
         pass
 
 class GdalTifStrategy(FormatStrategy):
-    def write(self, writer: "GdalRasterAdapter", raster: Raster, path: str) -> None:
+    def write(self, writer: "GdalRasterAdapter", raster: Raster, path: str, profile:str=GTIFF_PROFILE,
+              overviews:Union[bool, List[int]]=False, **write_options) -> None:
         is_bigtiff = is_bigtiff_gdal(raster.raw)
-        compress = is_bigtiff
-        writer.write_data(raster.raw, path, is_bigtiff=is_bigtiff, compress=compress)
+        data_type = raster.raw.GetRasterBand(1).DataType
+        options = build_tiff_options(data_type, is_bigtiff=is_bigtiff, profile=profile, overviews=bool(overviews), **write_options)
+
+        # overviews of GTiff are built after copying, an empty list means levels are picked from the size
+        overview_levels = None
+        if overviews:
+            overview_levels = overviews if isinstance(overviews, list) else []
+
+        writer.write_data(raster.raw, path, is_bigtiff=is_bigtiff, compress=is_bigtiff, options=options,
+                          profile=profile, overview_levels=overview_levels)
     
     def write_meta(self, writer, raster: Raster, path: str) -> None:
         write_metadata(raster.meta_dict, path)
         set_btoi_to_tif_meta(raster.raw, raster.band_to_index)
 
 class SnapTifStrategy(FormatStrategy):
-    def write(self, writer: "SnapRasterAdapter", raster: Raster, path: str) -> None:
+    def write(self, writer: "SnapRasterAdapter", raster: Raster, path: str, **write_options) -> None:
         is_bigtiff = is_bigtiff_gpf(raster.raw)
         format_type = 'GeoTIFF-BigTIFF' if is_bigtiff else 'GeoTIFF'
         writer.write_data(raster.raw, path, format_type)
@@ -40,7 +49,7 @@ class SnapTifStrategy(FormatStrategy):
         set_btoi_to_tif(path, raster.band_to_index)
 
 class SnapDimStrategy(FormatStrategy):
-    def write(self, writer: "SnapRasterAdapter", raster: Raster, path: str) -> None:
+    def write(self, writer: "SnapRasterAdapter", raster: Raster, path: str, **write_options) -> None:
         writer.write_data(raster.raw, path, 'BEAM-DIMAP')
     
     def write_meta(self, writer, raster: Raster, path: str) -> None:
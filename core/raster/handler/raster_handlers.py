@@ -37,6 +37,9 @@ class RasterHandler(ABC):
     def get_envelope_geom(self, raw) -> "Geometry":
         pass
 
+    def get_shape(self, raw) -> Optional[tuple[int, int, int]]:
+        return None
+
     def get_band_names_from_meta_dict(self, meta_dict:dict) -> list[str]:
         band_indices = list(range(1, len(meta_dict['index_to_band'])+1))
         return [meta_dict['index_to_band'][index] for index in band_indices]
@@ -54,6 +57,9 @@ class GdalRasterHandler(RasterHandler):
     def get_band_size(self, raw: "Dataset") -> int:
         return raw.RasterCount
 
+    def get_shape(self, raw: "Dataset") -> tuple[int, int, int]:
+        return raw.RasterCount, raw.RasterYSize, raw.RasterXSize
+
     def get_band_names_from_raw(self, raw:"Dataset") -> list[str]:
         band_indices = list(range(1, raw.RasterCount+1))        
         return [f'band_{index}' for index in band_indices]
@@ -90,6 +96,9 @@ class SnapRasterHandler(RasterHandler):
     def get_band_size(self, raw:"Product") -> int:
         return raw.getNumBands()
 
+    def get_shape(self, raw:"Product") -> tuple[int, int, int]:
+        return raw.getNumBands(), raw.getSceneRasterHeight(), raw.getSceneRasterWidth()
+
     def get_band_names_from_raw(self, raw:"Product") -> list[str]:
         return list(raw.getBandNames())
     
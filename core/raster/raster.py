@@ -3,7 +3,7 @@ import warnings
 from pathlib import Path
 
 from core.base import GeoData
-from core.util import ProductType, ModuleType
+from core.util import ProductType, ModuleType, BandCache
 from core.raster import RasterMeta
 from core.raster.handler import GdalRasterHandler, SnapRasterHandler, NCRasterHandler
 from core.raster.bname_strategy import BandNameStrategyFactory
@@ -38,6 +38,7 @@ class Raster(GeoData, RasterMeta):
         self._product_type:ProductType = ProductType.UNKNOWN
         self._is_band_cached:bool = False
         self._raster_from:str = ''
+        self._cache_key:Optional[str] = None
 
         if not Path(path).exists():
             raise FileNotFoundError(f'{path} does not exist')
@@ -83,6 +84,8 @@ class Raster(GeoData, RasterMeta):
 
     @bands.setter
     def bands(self, bands):
+        if bands is not None and not isinstance(bands, BandCache):
+            bands = BandCache(bands)
         self._bands_data = bands
     
     @property
@@ -112,6 +115,15 @@ class Raster(GeoData, RasterMeta):
     def raster_from(self, from_proc):
         self._raster_from = from_proc
 
+    @property
+    def cache_key(self) -> Optional[str]:
+        # key of the op result cache, derived from the input file and the ops applied so far
+        return self._cache_key
+
+    @cache_key.setter
+    def cache_key(self, cache_key:Optional[str]):
+        self._cache_key = cache_key
+
     @property
     def pixel_size(self):
         return self.handler.get_pixel_size(self.raw)
@@ -131,6 +143,9 @@ class Raster(GeoData, RasterMeta):
     def get_bands_size(self) -> int:
         return self.handler.get_band_size(self.raw)
 
+    def get_shape(self) -> Optional[tuple[int, int, int]]:
+        return self.handler.get_shape(self.raw)
+
     def get_band_names(self, b_type:str= 'default') -> list[str]:
         strategy = BandNameStrategyFactory.get_band_name_strategy(b_type)
         return strategy.get_band_names(self)
@@ -164,7 +179,7 @@ class Raster(GeoData, RasterMeta):
     def reorder_bands(self, band_names:list[str], sort:bool=True) -> None:
         if sort:
             band_names.sort()
-        self.bands = {band_name: self.bands[band_name] for band_name in band_names}
+        self.bands = self.bands.reorder(band_names)
     
     def proj(self) -> str:
         assert self.raw is not None, 'For getting projection, raster object must have raw data.'
@@ -5,6 +5,9 @@ from .back_coef import *
 from .band_nodata import *
 from .read_json import *
 from .time_check import *
+from .profiler import *
+from .memory_account import *
+from .write_behind import *
 from .import_lazy_funcs import *
 from .module_type import *
 from .raw_type_check import *
@@ -26,6 +29,7 @@ from .fillnan import *
 from .projection_geo import *
 from .tiles_interp import *
 from .grid_extend import *
+from .band_cache import *
 from .region_to_wkt import *
 from .atts_func import *
 from .read_band import *
@@ -1,10 +1,29 @@
 import numpy as np
 
-def calculate_back_coef(bands:dict):
+def calculate_back_coef(bands:dict, min_values:dict=None):
 
     for key, value in bands.items():
         band = value['value']
-        band[band <= 0] = np.min(band[band > 0])
+        if min_values is None:
+            positive = band[band > 0]
+            min_value = np.min(positive) if positive.size > 0 else None
+        else:
+            min_value = min_values.get(key)
+        if min_value is None:
+            raise ValueError(f'backscattering coefficient of band {key} can not be calculated, it has no positive value')
+        band[band <= 0] = min_value
         value['value'] = 10 * np.log10(band)
 
-    return bands
\ No newline at end of file
+    return bands
+
+def calculate_positive_min(bands:dict, min_values:dict=None) -> dict:
+    # accumulates the minimum positive value of each band over windows
+    if min_values is None:
+        min_values = {}
+
+    for key, value in bands.items():
+        positive = value['value'][value['value'] > 0]
+        if positive.size > 0:
+            min_values[key] = min(min_values.get(key, np.inf), np.min(positive))
+
+    return min_values
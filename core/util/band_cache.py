@@ -0,0 +1,155 @@
+from typing import Optional, Iterable
+import numpy as np
+
+class BandCache(dict):
+    """
+    Band cache of {band_name: {'value': ndarray, 'no_data': ...}} whose values are views into
+    one contiguous (bands, rows, cols) buffer.
+
+    Entries can still be replaced like a plain dict, the replaced values are copied back into
+    the buffer when to_array is called, so the buffer can be handed to GDAL without another copy.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buffer:Optional[np.ndarray] = None
+        self._slots:dict[str, int] = {}
+
+    @classmethod
+    def from_array(cls, arr:np.ndarray, band_names:list[str], no_data_vals:list) -> "BandCache":
+        if arr.ndim == 2:
+            arr = arr[np.newaxis]
+
+        cache = cls()
+        cache._buffer = arr
+        for slot, (band_name, no_data) in enumerate(zip(band_names, no_data_vals)):
+            dict.__setitem__(cache, band_name, {'value': arr[slot], 'no_data': no_data})
+            cache._slots[band_name] = slot
+
+        return cache
+
+    @property
+    def buffer(self) -> Optional[np.ndarray]:
+        return self._buffer
+
+    def _is_slot_view(self, band_name:str, slot:Optional[int]=None) -> bool:
+        if self._buffer is None or band_name not in self._slots:
+            return False
+        if slot is not None and self._slots[band_name] != slot:
+            return False
+
+        value = self[band_name]['value']
+        slot_arr = self._buffer[self._slots[band_name]]
+
+        return isinstance(value, np.ndarray) and value.dtype == slot_arr.dtype and value.shape == slot_arr.shape \
+            and value.strides == slot_arr.strides \
+            and value.__array_interface__['data'][0] == slot_arr.__array_interface__['data'][0]
+
+    def _used_slots(self) -> set[int]:
+        return {self._slots[band_name] for band_name in self if self._is_slot_view(band_name)}
+
+    def _grow(self, capacity:int):
+        new_buffer = np.empty((capacity,) + self._buffer.shape[1:], dtype=self._buffer.dtype)
+        new_buffer[:self._buffer.shape[0]] = self._buffer
+        for band_name in self:
+            if self._is_slot_view(band_name):
+                self[band_name]['value'] = new_buffer[self._slots[band_name]]
+        self._buffer = new_buffer
+
+    def append(self, band_name:str, value:np.ndarray, no_data=None):
+        # the buffer grows geometrically, so appending bands one by one does not reallocate every time
+        if self._buffer is None or self._buffer.shape[1:] != value.shape or self._buffer.dtype != value.dtype:
+            self[band_name] = {'value': value, 'no_data': no_data}
+            return self
+
+        free_slots = sorted(set(range(self._buffer.shape[0])) - self._used_slots())
+        if len(free_slots) == 0:
+            free_slots = [self._buffer.shape[0]]
+            self._grow(self._buffer.shape[0] * 2)
+
+        slot = free_slots[0]
+        np.copyto(self._buffer[slot], value)
+        self[band_name] = {'value': self._buffer[slot], 'no_data': no_data}
+        self._slots[band_name] = slot
+        return self
+
+    def drop(self, band_name:str):
+        # the slot of the dropped band is reused by the next append or to_array
+        del self[band_name]
+        return self
+
+    def __delitem__(self, band_name:str):
+        self._slots.pop(band_name, None)
+        super().__delitem__(band_name)
+
+    def pop(self, band_name:str, *args):
+        self._slots.pop(band_name, None)
+        return super().pop(band_name, *args)
+
+    def clear(self):
+        self._slots.clear()
+        self._buffer = None
+        super().clear()
+
+    def copy(self) -> "BandCache":
+        # values are copied, bands viewing the buffer view the copied buffer
+        cache = BandCache()
+        if self._buffer is not None:
+            cache._buffer = self._buffer.copy()
+
+        for band_name, band in self.items():
+            band = dict(band)
+            if self._is_slot_view(band_name):
+                band['value'] = cache._buffer[self._slots[band_name]]
+                cache._slots[band_name] = self._slots[band_name]
+            elif isinstance(band['value'], np.ndarray):
+                band['value'] = band['value'].copy()
+            dict.__setitem__(cache, band_name, band)
+
+        return cache
+
+    def reorder(self, band_names:Iterable[str]) -> "BandCache":
+        cache = BandCache({band_name: self[band_name] for band_name in band_names})
+        cache._buffer = self._buffer
+        cache._slots = {band_name: self._slots[band_name] for band_name in cache if band_name in self._slots}
+        return cache
+
+    def to_array(self, band_names:Optional[list[str]]=None, dtype=None) -> np.ndarray:
+        # returns a contiguous (bands, rows, cols) array of the bands in the given order, the buffer is reused when it fits
+        if band_names is None:
+            band_names = list(self.keys())
+        if dtype is None:
+            dtype = max([self[band_name]['value'].dtype for band_name in band_names], key=lambda x: x.itemsize)
+        dtype = np.dtype(dtype)
+
+        band_num = len(band_names)
+        shape = self[band_names[0]]['value'].shape
+
+        if self._buffer is None or self._buffer.dtype != dtype or self._buffer.shape[1:] != shape or self._buffer.shape[0] < band_num:
+            new_buffer = np.empty((band_num,) + shape, dtype=dtype)
+            for slot, band_name in enumerate(band_names):
+                np.copyto(new_buffer[slot], self[band_name]['value'], casting='unsafe')
+            self._buffer = new_buffer
+        else:
+            # values sharing memory with slots to be overwritten are copied out before packing
+            for band_name in self:
+                target = band_names.index(band_name) if band_name in band_names else None
+                if target is not None and self._is_slot_view(band_name, target):
+                    continue
+                if np.may_share_memory(self[band_name]['value'], self._buffer[:band_num]):
+                    self[band_name]['value'] = self[band_name]['value'].copy()
+
+            for slot, band_name in enumerate(band_names):
+                if not self._is_slot_view(band_name, slot):
+                    np.copyto(self._buffer[slot], self[band_name]['value'], casting='unsafe')
+
+        if self._buffer.shape[0] > band_num:
+            # a view of the packed bands would keep the slots of the dropped ones alive
+            self._buffer = self._buffer[:band_num].copy()
+
+        self._slots = {}
+        for slot, band_name in enumerate(band_names):
+            self[band_name]['value'] = self._buffer[slot]
+            self._slots[band_name] = slot
+
+        return self._buffer
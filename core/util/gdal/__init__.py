@@ -31,8 +31,13 @@ from .warp_to import *
 from .op_funcs import *
 from .gdal_funcs import *
 from .gdal_read import *
+from .gdal_window import *
 from .gdal_ds import *
+from .gdal_vrt import *
+from .gdal_write_options import *
 from .gdal_reproj import *
 from .gdal_merge import *
 from .projection_read import *
+from .warp_plan import *
 from .gdal_warp import *
+from .gdal_zonal import *
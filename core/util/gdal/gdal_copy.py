@@ -2,20 +2,14 @@ from tqdm import tqdm
 from osgeo import ogr
 from typing import TYPE_CHECKING
 
+from core.util.gdal.gdal_vector import iter_features, write_features, WRITE_BATCH_SIZE
+
 if TYPE_CHECKING:
     from osgeo.ogr import Feature, Layer, DataSource
 
-def copy_features(layer: "Layer", from_layer: "Layer"):
-    layer_defn = from_layer.GetLayerDefn()
-
-    for feature in tqdm(from_layer, desc="Copying features"):
-        new_feature = ogr.Feature(layer_defn)
-        for i in range(feature.GetFieldCount()):
-            new_feature.SetField(i, feature.GetField(i))
-        new_feature.SetGeometry(feature.GetGeometryRef().Clone())
-        layer.CreateFeature(new_feature)
-        new_feature = None
-
+def copy_features(layer: "Layer", from_layer: "Layer", batch_size: int = WRITE_BATCH_SIZE):
+    # features are streamed page by page and committed in batches
+    write_features(layer, iter_features(from_layer), batch_size)
     return layer
 
 def copy_layer(data_source: "DataSource", from_data_source: "DataSource"):
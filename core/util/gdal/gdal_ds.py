@@ -1,3 +1,7 @@
+import os
+import uuid
+import weakref
+import tempfile
 from typing import Union, Tuple, List, TYPE_CHECKING, Optional
 import numpy as np
 from osgeo import gdal, ogr, osr
@@ -8,6 +12,10 @@ if TYPE_CHECKING:
 
 from core.util.gdal import GDAL_DTYPE_MAP, read_gdal_bands
 
+# scratch datasets up to this size are kept in /vsimem, larger ones are written to a temporary file
+SCRATCH_VSIMEM_BYTES = 256 * 1024 ** 2
+SCRATCH_BLOCK_SIZE = 256
+
 def create_datasource(path: str, ogr_format: str = 'ESRI Shapefile'):
     driver = ogr.GetDriverByName(ogr_format)    
     if driver.Open(path):
@@ -17,26 +25,27 @@ def create_datasource(path: str, ogr_format: str = 'ESRI Shapefile'):
 def create_ds(gdal_format=None, width=None, height=None, band_num=None, dtype=None, 
               proj_wkt:str=None, transform:tuple=None, metadata=None,
               out_path='', is_bigtiff=False, compress=False, no_data=np.nan, 
-              is_vector=False, geom_type=None, field_defs=None):
+              is_vector=False, geom_type=None, field_defs=None, options:list[str]=None):
     if is_vector:
         return create_vector_ds(gdal_format, proj_wkt, out_path, geom_type, field_defs, metadata)
     else:
         return create_raster_ds(gdal_format, width, height, band_num, dtype, proj_wkt, 
-                                transform, metadata, out_path, is_bigtiff, compress, no_data)
+                                transform, metadata, out_path, is_bigtiff, compress, no_data, options)
 
 def create_raster_ds(gdal_format, width, height, band_num, dtype, proj_wkt:str=None, 
                     transform:tuple=None, metadata=None, out_path='', 
-                    is_bigtiff=False, compress=False, no_data=np.nan):    
+                    is_bigtiff=False, compress=False, no_data=np.nan, options:list[str]=None):    
     if isinstance(dtype, str):
         gdal_dtype = GDAL_DTYPE_MAP[dtype]
     else:
         gdal_dtype = dtype
 
-    options = []
-    if is_bigtiff:
-        options.append('BigTIFF=YES')
-    if compress:
-        options.append('COMPRESS=LZW')
+    if options is None:
+        options = []
+        if is_bigtiff:
+            options.append('BigTIFF=YES')
+        if compress:
+            options.append('COMPRESS=LZW')
 
     driver = gdal.GetDriverByName(gdal_format)
     if len(options) > 0:
@@ -64,7 +73,7 @@ def create_vector_ds(gdal_format: str = 'Memory', proj_wkt: Optional[str] = None
     
     if not gdal_format:
         gdal_format = 'Memory'
-    if not geom_type:
+    if geom_type is None:
         geom_type = ogr.wkbPolygon
     if not field_defs:
         field_defs = []
@@ -157,7 +166,9 @@ def create_ds_with_dict(raster_bands:dict[str], gdal_format,
     mem_ds.FlushCache()
     return mem_ds, btoi_for_ds
 
-def copy_ds(src_ds, target_ds_type, selected_index:list[int]=None, out_path:str=None, is_bigtiff=False, compress=False) -> 'Dataset':
+def copy_ds(src_ds, target_ds_type, selected_index:list[int]=None, out_path:str=None, is_bigtiff=False, compress=False,
+            options:list[str]=None) -> 'Dataset':
+    # options are the creation options of the driver, is_bigtiff and compress are ignored when they are given
     if not out_path:
         out_path = ''
 
@@ -170,7 +181,7 @@ def copy_ds(src_ds, target_ds_type, selected_index:list[int]=None, out_path:str=
             target_ds_type, src_ds.RasterXSize, src_ds.RasterYSize,
             len(selected_index), src_ds.GetRasterBand(1).DataType,
             src_ds.GetProjection(), src_ds.GetGeoTransform(), src_ds.GetMetadata(),
-            out_path, is_bigtiff, compress
+            out_path, is_bigtiff, compress, options=options
         )
 
         if bands.ndim == 2:
@@ -181,7 +192,10 @@ def copy_ds(src_ds, target_ds_type, selected_index:list[int]=None, out_path:str=
             tar_ds.GetRasterBand(i+1).SetNoDataValue(no_data if no_data is not None else 0)
             tar_ds.GetRasterBand(i+1).WriteArray(bands[i])
     else:
-        tar_ds = driver.CreateCopy(out_path, src_ds)
+        if options is None:
+            tar_ds = driver.CreateCopy(out_path, src_ds)
+        else:
+            tar_ds = driver.CreateCopy(out_path, src_ds, options=options)
 
     tar_ds.FlushCache()
 
@@ -190,3 +204,103 @@ def copy_ds(src_ds, target_ds_type, selected_index:list[int]=None, out_path:str=
 def read_vector_ds(path: str):
     return gdal.OpenEx(path, gdal.OF_VECTOR)
 
+
+def ds_to_buffer(src_ds:"Dataset") -> bytes:
+    vsi_path = f'/vsimem/{uuid.uuid4().hex}.tif'
+    tmp_ds = gdal.GetDriverByName('GTiff').CreateCopy(vsi_path, src_ds)
+    tmp_ds.FlushCache()
+    tmp_ds = None
+
+    vsi_file = gdal.VSIFOpenL(vsi_path, 'rb')
+    gdal.VSIFSeekL(vsi_file, 0, 2)
+    size = gdal.VSIFTellL(vsi_file)
+    gdal.VSIFSeekL(vsi_file, 0, 0)
+    buffer = gdal.VSIFReadL(1, size, vsi_file)
+    gdal.VSIFCloseL(vsi_file)
+    gdal.Unlink(vsi_path)
+
+    return buffer
+
+def ds_from_buffer(buffer:bytes) -> "Dataset":
+    vsi_path = f'/vsimem/{uuid.uuid4().hex}.tif'
+    gdal.FileFromMemBuffer(vsi_path, buffer)
+    tmp_ds = gdal.Open(vsi_path)
+    mem_ds = gdal.GetDriverByName('MEM').CreateCopy('', tmp_ds)
+    tmp_ds = None
+    gdal.Unlink(vsi_path)
+
+    return mem_ds
+
+_ds_buffers = {}
+
+def _release_ds_buffer(key:int):
+    _ds_buffers.pop(key, None)
+
+def create_ds_with_buffer(arr:np.ndarray, proj_wkt:str=None, transform:tuple=None, metadata:dict=None,
+                          no_data_vals:list=None) -> 'Dataset':
+    # MEM dataset whose bands point to arr with DATAPOINTER, so the array is not copied.
+    # arr is kept alive until the returned dataset object is garbage collected.
+    if arr.ndim == 2:
+        arr = np.expand_dims(arr, axis=0)
+
+    assert arr.flags['C_CONTIGUOUS'], 'array for DATAPOINTER should be C contiguous'
+
+    band_num, height, width = arr.shape
+    gdal_dtype = GDAL_DTYPE_MAP[arr.dtype.name]
+
+    mem_ds = gdal.GetDriverByName('MEM').Create('', width, height, 0, gdal_dtype)
+    for i in range(band_num):
+        pointer = arr[i].__array_interface__['data'][0]
+        mem_ds.AddBand(gdal_dtype, options=[f'DATAPOINTER={pointer}',
+                                            f'PIXELOFFSET={arr.strides[2]}',
+                                            f'LINEOFFSET={arr.strides[1]}'])
+
+    if proj_wkt is not None:
+        mem_ds.SetProjection(proj_wkt)
+    if transform is not None:
+        mem_ds.SetGeoTransform(transform)
+    if metadata is not None:
+        mem_ds.SetMetadata(metadata)
+
+    if no_data_vals is not None:
+        for i, no_data in enumerate(no_data_vals):
+            mem_ds.GetRasterBand(i+1).SetNoDataValue(no_data if no_data is not None else 0)
+
+    key = id(mem_ds)
+    _ds_buffers[key] = arr
+    weakref.finalize(mem_ds, _release_ds_buffer, key)
+
+    return mem_ds
+
+def is_datapointer_dtype(dtype) -> bool:
+    # gdal types of these numpy types have the same memory layout
+    return np.dtype(dtype).name in ['uint8', 'uint16', 'int16', 'uint32', 'int32', 'uint64', 'int64', 'float32', 'float64']
+
+def _remove_scratch(path:str):
+    if path.startswith('/vsimem/'):
+        gdal.Unlink(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def create_scratch_ds(width:int, height:int, band_num:int, dtype:str, proj_wkt:str=None, transform:tuple=None,
+                      metadata:dict=None) -> "Dataset":
+    # tiled GTiff filled block by block, only the blocks in the gdal block cache are in memory
+    # the file is removed when the returned dataset object is garbage collected
+    nbytes = width * height * band_num * np.dtype(dtype).itemsize
+    if nbytes <= SCRATCH_VSIMEM_BYTES:
+        path = f'/vsimem/scratch_{uuid.uuid4().hex}.tif'
+    else:
+        path = os.path.join(tempfile.gettempdir(), f'scratch_{uuid.uuid4().hex}.tif')
+
+    options = ['TILED=YES', f'BLOCKXSIZE={SCRATCH_BLOCK_SIZE}', f'BLOCKYSIZE={SCRATCH_BLOCK_SIZE}', 'INTERLEAVE=BAND',
+               'BIGTIFF=IF_SAFER', 'SPARSE_OK=TRUE']
+    scratch_ds = gdal.GetDriverByName('GTiff').Create(path, width, height, band_num, GDAL_DTYPE_MAP[dtype], options=options)
+    if proj_wkt is not None:
+        scratch_ds.SetProjection(proj_wkt)
+    if transform is not None:
+        scratch_ds.SetGeoTransform(transform)
+    if metadata is not None:
+        scratch_ds.SetMetadata(metadata)
+
+    weakref.finalize(scratch_ds, _remove_scratch, path)
+    return scratch_ds
@@ -7,7 +7,7 @@ from osgeo_utils.gdal_merge import names_to_fileinfos
 from osgeo import gdal
 
 from core.util import assert_ds_equal
-from core.util.gdal import read_gdal_bands, create_ds_with_arr, file_info
+from core.util.gdal import read_gdal_bands, create_ds_with_arr, file_info, mosaic_vrt
 
 if TYPE_CHECKING:
     from osgeo.gdal import Dataset
@@ -79,11 +79,15 @@ def ds_to_fileinfos(datasets:list["Dataset"]) -> list[file_info]:
 #
 #     return fi
 
-def mosaic_by_file_paths(tile_paths:list[str]) -> "Dataset":
+def mosaic_by_file_paths(tile_paths:list[str], lazy:bool=True) -> "Dataset":
+    if lazy:
+        return mosaic_vrt(tile_paths)
     file_infos = names_to_fileinfos(tile_paths)
     return mosaic_tiles(file_infos)
 
-def mosaic_by_ds(datasets:list["Dataset"]) -> "Dataset":
+def mosaic_by_ds(datasets:list["Dataset"], lazy:bool=True) -> "Dataset":
+    if lazy:
+        return mosaic_vrt(datasets)
     file_infos = ds_to_fileinfos(datasets)
     return mosaic_tiles(file_infos)
 
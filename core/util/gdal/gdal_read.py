@@ -4,6 +4,8 @@ from typing import Tuple
 from pathlib import Path
 from osgeo import gdal
 
+from core.util.band_cache import BandCache
+
 def read_single(path):
 
     ext = Path(path).suffix.lower()
@@ -12,31 +14,33 @@ def read_single(path):
     ds = gdal.Open(path)
     return ds
 
-def read_gdal_bands(ds, selected_bands:list[int]=None) -> tuple[list, np.ndarray]:
+def read_gdal_bands(ds, selected_bands:list[int]=None, window:tuple[int, int, int, int]=None) -> tuple[list, np.ndarray]:
 
     if not selected_bands:
         selected_bands = list(range(1, ds.RasterCount + 1))
 
     assert all([b_idx > 0 for b_idx in selected_bands]), 'selected_bands for gdal should be a list of integer and > 0'
 
-    arr = ds.ReadAsArray(band_list=selected_bands)
+    if window is None:
+        arr = ds.ReadAsArray(band_list=selected_bands)
+    else:
+        x_off, y_off, x_size, y_size = window
+        arr = ds.ReadAsArray(x_off, y_off, x_size, y_size, band_list=selected_bands)
     nodata_vals = [ds.GetRasterBand(i).GetNoDataValue() for i in selected_bands]
     nodata_vals = [0 if val is None else val for val in nodata_vals]
     return nodata_vals, arr
 
-def read_gdal_bands_as_dict(ds, all_band_names:list[str], selected_index:list[int]=None) -> Tuple[dict, list[str]]:
+def read_gdal_bands_as_dict(ds, all_band_names:list[str], selected_index:list[int]=None, window:tuple[int, int, int, int]=None) -> Tuple[dict, list[str]]:
 
-    nodata_vals, arr = read_gdal_bands(ds, selected_index)
+    nodata_vals, arr = read_gdal_bands(ds, selected_index, window)
 
     if selected_index is None:
         selected_index = list(range(1, ds.RasterCount + 1))
 
     selected_band_names = [all_band_names[band_index - 1] for band_index in selected_index]
 
-    if arr.ndim == 2:
-        arr_dict = { bname : { 'value': arr, 'no_data': no_data } for bname, no_data in zip(selected_band_names, nodata_vals) }
-    else:
-        arr_dict = { bname : { 'value': arr[i], 'no_data': no_data } for i, (bname, no_data) in enumerate(zip(selected_band_names, nodata_vals)) }
+    # bands are views into the array read from gdal
+    arr_dict = BandCache.from_array(arr, selected_band_names, nodata_vals)
 
     return arr_dict, selected_band_names
 
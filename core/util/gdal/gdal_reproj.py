@@ -1,5 +1,7 @@
+import uuid, hashlib, threading
 import numpy as np
 
+from collections import OrderedDict
 from typing import TYPE_CHECKING, List
 from core.util import load_gdal, load_osr, time_benchmark
 from core.util.gdal import create_ds, create_ds_with_arr, RESAMPLING_METHODS
@@ -7,19 +9,50 @@ from core.util.gdal import create_ds, create_ds_with_arr, RESAMPLING_METHODS
 if TYPE_CHECKING:
     from osgeo.gdal import GCP, Dataset
 
-@time_benchmark
+GCP_CACHE_SIZE = 8
+
+# gcps are swig objects which can not be sent between processes, every process keeps the ones of its last swaths
+_gcp_cache = OrderedDict()
+_gcp_lock = threading.Lock()
+
+def geolocation_hash(lons:np.ndarray, lats:np.ndarray, *args) -> str:
+    # rasters sharing the geolocation arrays of a swath share their gcps
+    hasher = hashlib.sha256()
+    for arr in [lons, lats]:
+        arr = np.ascontiguousarray(arr)
+        hasher.update(f'{arr.dtype}{arr.shape}'.encode('utf-8'))
+        hasher.update(arr.tobytes())
+    hasher.update(repr(args).encode('utf-8'))
+    return hasher.hexdigest()
+
 def create_gcp(lons:np.ndarray, lats:np.ndarray, grid_size:int=20) -> List["GCP"]:
 
     gdal = load_gdal()
 
-    gcps = []
-    rows, cols = lons.shape
-    for row in range(0, rows, grid_size):
-        for col in range(0, cols, grid_size):
-            x = float(lons[row, col])
-            y = float(lats[row, col])
-            gcp = gdal.GCP(x, y, 0, col, row)
-            gcps.append(gcp)
+    lons, lats = np.asarray(lons), np.asarray(lats)
+    lons, lats = lons.reshape(lons.shape[-2:]), lats.reshape(lats.shape[-2:])
+
+    # lon/lat of every grid_size pixels, gcps without a valid location are dropped
+    rows, cols = np.meshgrid(np.arange(0, lons.shape[0], grid_size), np.arange(0, lons.shape[1], grid_size), indexing='ij')
+    xs, ys = lons[rows, cols], lats[rows, cols]
+    valid = np.isfinite(xs) & np.isfinite(ys)
+
+    return [gdal.GCP(x, y, 0., col, row) for x, y, col, row in
+            zip(xs[valid].tolist(), ys[valid].tolist(), cols[valid].tolist(), rows[valid].tolist())]
+
+def get_cached_gcp(lons:np.ndarray, lats:np.ndarray, grid_size:int=20) -> List["GCP"]:
+    # gcps of the swath built once in this process, rasters sharing the lat/lng bands reuse them
+    key = geolocation_hash(lons, lats, grid_size)
+    with _gcp_lock:
+        if key in _gcp_cache:
+            _gcp_cache.move_to_end(key)
+            return _gcp_cache[key]
+
+    gcps = create_gcp(lons, lats, grid_size=grid_size)
+    with _gcp_lock:
+        _gcp_cache[key] = gcps
+        while len(_gcp_cache) > GCP_CACHE_SIZE:
+            _gcp_cache.popitem(last=False)
     return gcps
 
 def reproject_ds_using_gcp(in_ds:"Dataset", gcps:List["GCP"],
@@ -65,4 +98,59 @@ def reproject_arr_using_gcp(in_arr:np.ndarray, gcps:List["GCP"],
     in_ds = create_ds_with_arr(in_arr, gdal_format='MEM', no_data=no_data)
     out_ds = reproject_ds_using_gcp(in_ds, gcps, min_x, max_x, min_y, max_y, res, resampling_method=resampling_method, in_epsg=in_epsg)
 
-    return out_ds
\ No newline at end of file
+    return out_ds
+
+def reproject_ds_using_geoloc(in_ds:"Dataset", lons:np.ndarray, lats:np.ndarray,
+                              min_x:float, max_x:float, min_y:float, max_y:float, res:float,
+                              resampling_method:str='cubic', in_epsg:int=4326, no_data:float=-999.) -> "Dataset":
+
+    # every pixel is located by its lon/lat with the geolocation arrays of gdal, instead of a polynomial fitted to gcps
+    gdal = load_gdal()
+    osr = load_osr()
+
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(in_epsg)
+
+    lons, lats = np.asarray(lons), np.asarray(lats)
+    lons, lats = lons.reshape(lons.shape[-2:]), lats.reshape(lats.shape[-2:])
+
+    geoloc_paths = [f'/vsimem/geoloc_{uuid.uuid4().hex}_{axis}.tif' for axis in ['x', 'y']]
+    try:
+        for path, arr in zip(geoloc_paths, [lons, lats]):
+            geoloc_ds = gdal.GetDriverByName('GTiff').Create(path, arr.shape[1], arr.shape[0], 1, gdal.GDT_Float64)
+            geoloc_ds.GetRasterBand(1).WriteArray(arr.astype(np.float64))
+            geoloc_ds = None
+
+        in_ds.SetMetadata({
+            'X_DATASET': geoloc_paths[0], 'X_BAND': '1',
+            'Y_DATASET': geoloc_paths[1], 'Y_BAND': '1',
+            'PIXEL_OFFSET': '0', 'LINE_OFFSET': '0', 'PIXEL_STEP': '1', 'LINE_STEP': '1',
+            'SRS': srs.ExportToWkt()
+        }, 'GEOLOCATION')
+
+        # same grid as reproject_ds_using_gcp
+        new_width = int((max_x - min_x) / res) + 1
+        new_height = int((max_y - min_y) / res) + 1
+        warp_options = gdal.WarpOptions(format='MEM', geoloc=True, dstSRS=srs.ExportToWkt(),
+                                        outputBounds=(min_x, max_y - new_height * res, min_x + new_width * res, max_y),
+                                        width=new_width, height=new_height, outputType=gdal.GDT_Float32,
+                                        resampleAlg=RESAMPLING_METHODS[resampling_method], srcNodata=no_data, dstNodata=no_data)
+        dst_ds = gdal.Warp('', in_ds, options=warp_options)
+    finally:
+        for path in geoloc_paths:
+            gdal.Unlink(path)
+
+    return dst_ds
+
+def reproject_arr_using_geoloc(in_arr:np.ndarray, lons:np.ndarray, lats:np.ndarray,
+                               min_x, max_x, min_y, max_y, res:float, resampling_method:str='cubic',
+                               in_epsg:int=4326, no_data:float=-999.) -> "Dataset":
+
+    if in_arr.ndim == 2:
+        in_arr = in_arr[np.newaxis, :, :]
+    elif in_arr.ndim != 3:
+        raise ValueError("Input array must be 2D or 3D")
+
+    in_ds = create_ds_with_arr(in_arr, gdal_format='MEM', no_data=no_data)
+    return reproject_ds_using_geoloc(in_ds, lons, lats, min_x, max_x, min_y, max_y, res, resampling_method=resampling_method,
+                                     in_epsg=in_epsg, no_data=no_data)
@@ -1,10 +1,15 @@
-from typing import TYPE_CHECKING
-from tqdm import tqdm
+import math
+from typing import TYPE_CHECKING, Iterator, Iterable, Optional
+from concurrent.futures import ThreadPoolExecutor
 from osgeo import ogr
 from osgeo import gdal
 from pathlib import Path
+
+from core.util.logger import Logger
+
 if TYPE_CHECKING:
-    from osgeo.ogr import Layer, FieldDefn
+    from osgeo.gdal import Dataset
+    from osgeo.ogr import Layer, FieldDefn, Feature
 
 def get_vector_envelope(vector_layer: "Layer") -> tuple[float, float, float, float, float, float, float, float]:
     minx, maxx, miny, maxy = vector_layer.GetExtent()
@@ -25,30 +30,141 @@ def create_envelope(ulx, uly, urx, ury, lrx, lry, llx, lly) -> ogr.Geometry:
 
     return env_geom
 
-def clip_vector(input_ds, clip_geom, out_ds):
+# features read from a layer at once, and written to a layer in one transaction
+FEATURE_PAGE_SIZE = 1000
+WRITE_BATCH_SIZE = 10000
 
-    file_stem = Path(input_ds.GetFileList()[0]).stem
-    
-    in_layer = input_ds.GetLayer()
-        
-    out_layer = out_ds.GetLayer()
-    out_defn = out_layer.GetLayerDefn()
-    
-    in_layer.ResetReading()
-    for in_feat in tqdm(in_layer, desc=f"Clipping features for '{file_stem}'"):
+def iter_feature_pages(layer:"Layer", page_size:int=FEATURE_PAGE_SIZE, attribute_filter:Optional[str]=None,
+                       spatial_filter:Optional[ogr.Geometry]=None) -> Iterator[list["Feature"]]:
+    # features of the layer in pages, the filters are evaluated by ogr and removed when the iteration ends
+    assert page_size > 0, 'page_size should be greater than 0'
+
+    layer.SetAttributeFilter(attribute_filter)
+    layer.SetSpatialFilter(spatial_filter)
+    layer.ResetReading()
+    try:
+        page = []
+        feat = layer.GetNextFeature()
+        while feat is not None:
+            page.append(feat)
+            if len(page) == page_size:
+                yield page
+                page = []
+            feat = layer.GetNextFeature()
+        if len(page) > 0:
+            yield page
+    finally:
+        layer.SetAttributeFilter(None)
+        layer.SetSpatialFilter(None)
+
+def iter_features(layer:"Layer", page_size:int=FEATURE_PAGE_SIZE, attribute_filter:Optional[str]=None,
+                  spatial_filter:Optional[ogr.Geometry]=None) -> Iterator["Feature"]:
+    for page in iter_feature_pages(layer, page_size, attribute_filter, spatial_filter):
+        yield from page
+
+def feature_record(feat:"Feature") -> dict:
+    # the geometry of the feature as wkb bytes with its fid and attributes
+    geom = feat.GetGeometryRef()
+    return {
+        'id': feat.GetFID(),
+        'wkb': None if geom is None else bytes(geom.ExportToWkb()),
+        'attributes': feat.items()
+    }
+
+def _is_rectangle(geom:ogr.Geometry) -> bool:
+    # an axis aligned box, like the envelopes of rasters used for clipping
+    if ogr.GT_Flatten(geom.GetGeometryType()) != ogr.wkbPolygon or geom.GetGeometryCount() != 1:
+        return False
+    min_x, max_x, min_y, max_y = geom.GetEnvelope()
+    return geom.GetGeometryRef(0).GetPointCount() <= 5 and math.isclose(geom.Area(), (max_x - min_x) * (max_y - min_y))
+
+def _envelope_inside(envelope:tuple, clip_envelope:tuple) -> bool:
+    min_x, max_x, min_y, max_y = envelope
+    clip_min_x, clip_max_x, clip_min_y, clip_max_y = clip_envelope
+    return clip_min_x <= min_x and max_x <= clip_max_x and clip_min_y <= min_y and max_y <= clip_max_y
+
+def iter_clipped_features(in_layer:"Layer", clip_geom:ogr.Geometry, x_range:Optional[tuple[float, float]]=None) -> Iterator["Feature"]:
+    # features of the layer with their geometry clipped, only the features around clip_geom are read through the
+    # spatial filter. x_range keeps the features whose envelope starts in [min_x, max_x), to split the layer in strips
+    clip_envelope = clip_geom.GetEnvelope()
+    clip_is_rect = _is_rectangle(clip_geom)
+
+    for in_feat in iter_features(in_layer, spatial_filter=clip_geom):
         geom = in_feat.GetGeometryRef()
+        if geom is None:
+            continue
+
+        envelope = geom.GetEnvelope()
+        if x_range is not None and not (x_range[0] <= envelope[0] < x_range[1]):
+            continue
+
+        # features inside of the clip polygon are copied unchanged
+        if _envelope_inside(envelope, clip_envelope) and (clip_is_rect or clip_geom.Contains(geom)):
+            yield in_feat
+            continue
+
         clipped_geom = geom.Intersection(clip_geom)
-        
         if clipped_geom and not clipped_geom.IsEmpty():
+            in_feat.SetGeometryDirectly(clipped_geom)
+            yield in_feat
+
+def write_features(out_layer:"Layer", features:Iterable["Feature"], batch_size:int=WRITE_BATCH_SIZE) -> int:
+    # fields are copied by name, and batch_size features are committed at once where the driver has transactions
+    out_defn = out_layer.GetLayerDefn()
+    use_transaction = bool(out_layer.TestCapability(ogr.OLCTransactions))
+
+    count = 0
+    if use_transaction:
+        out_layer.StartTransaction()
+    try:
+        for in_feat in features:
             out_feat = ogr.Feature(out_defn)
-            out_feat.SetGeometry(clipped_geom)
-            
-            for i in range(out_defn.GetFieldCount()):
-                out_feat.SetField(i, in_feat.GetField(i))
-            
+            out_feat.SetFrom(in_feat)
             out_layer.CreateFeature(out_feat)
             out_feat = None
 
+            count += 1
+            if use_transaction and count % batch_size == 0:
+                out_layer.CommitTransaction()
+                out_layer.StartTransaction()
+    except Exception:
+        if use_transaction:
+            out_layer.RollbackTransaction()
+            use_transaction = False
+        raise
+    finally:
+        if use_transaction:
+            out_layer.CommitTransaction()
+    return count
+
+def _clip_strip(path:str, clip_wkt:str, x_range:tuple[float, float]) -> list["Feature"]:
+    # every strip opens the source itself, ogr handles can not be shared between threads
+    input_ds = ogr.Open(path)
+    features = [feat.Clone() for feat in iter_clipped_features(input_ds.GetLayer(), ogr.CreateGeometryFromWkt(clip_wkt), x_range)]
+    input_ds = None
+    return features
+
+def clip_vector(input_ds, clip_geom, out_ds, batch_size:int=WRITE_BATCH_SIZE, workers:int=1):
+
+    file_stem = Path(input_ds.GetDescription()).stem
+    in_layer = input_ds.GetLayer()
+    out_layer = out_ds.GetLayer()
+
+    path = input_ds.GetDescription()
+    if workers > 1 and path and Path(path).exists():
+        # the clip envelope is split in vertical strips clipped at the same time, a feature belongs to the strip where
+        # its envelope starts
+        min_x, max_x, _, _ = clip_geom.GetEnvelope()
+        edges = [min_x + (max_x - min_x) * i / workers for i in range(workers + 1)]
+        edges[0], edges[-1] = -math.inf, math.inf
+        clip_wkt = clip_geom.ExportToWkt()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            strips = executor.map(lambda i: _clip_strip(path, clip_wkt, (edges[i], edges[i + 1])), range(workers))
+            count = write_features(out_layer, (feat for strip in strips for feat in strip), batch_size)
+    else:
+        count = write_features(out_layer, iter_clipped_features(in_layer, clip_geom), batch_size)
+
+    Logger.get_logger().log('debug', f"{count} features of '{file_stem}' are clipped")
     return out_ds
 
 def get_vector_fields(vector_layer: "Layer") -> list["FieldDefn"]:
@@ -57,4 +173,61 @@ def get_vector_fields(vector_layer: "Layer") -> list["FieldDefn"]:
     for i in range(layer_defn.GetFieldCount()):
         field_defn = layer_defn.GetFieldDefn(i)
         fields.append(field_defn)
-    return fields
\ No newline at end of file
+    return fields
+
+# a field of layers disagreeing on its type takes the later type of this order, other disagreements become strings
+FIELD_TYPE_ORDER = [ogr.OFTInteger, ogr.OFTInteger64, ogr.OFTReal, ogr.OFTString]
+
+def _unify_field(field_defn:"FieldDefn", other_defn:"FieldDefn") -> "FieldDefn":
+    field_type, other_type = field_defn.GetType(), other_defn.GetType()
+    if field_type == other_type and field_defn.GetWidth() >= other_defn.GetWidth():
+        return field_defn
+
+    if field_type != other_type:
+        if field_type in FIELD_TYPE_ORDER and other_type in FIELD_TYPE_ORDER:
+            field_type = max(field_type, other_type, key=FIELD_TYPE_ORDER.index)
+        else:
+            field_type = ogr.OFTString
+
+    unified_defn = ogr.FieldDefn(field_defn.GetName(), field_type)
+    if field_defn.GetType() == other_defn.GetType():
+        unified_defn.SetWidth(other_defn.GetWidth())
+        unified_defn.SetPrecision(max(field_defn.GetPrecision(), other_defn.GetPrecision()))
+    return unified_defn
+
+def unify_fields(layers:list["Layer"]) -> list["FieldDefn"]:
+    # union of the fields of the layers by name, in the order they first appear
+    fields = {}
+    for layer in layers:
+        for field_defn in get_vector_fields(layer):
+            name = field_defn.GetName()
+            fields[name] = _unify_field(fields[name], field_defn) if name in fields else field_defn
+    return list(fields.values())
+
+def unify_geom_type(layers:list["Layer"]) -> int:
+    geom_types = set([layer.GetGeomType() for layer in layers])
+    return geom_types.pop() if len(geom_types) == 1 else ogr.wkbUnknown
+
+def append_vector_ds(out_ds:"Dataset", datasets:list["Dataset"], batch_size:int=WRITE_BATCH_SIZE) -> int:
+    # the first layer of every dataset is appended by ogr2ogr to the first layer of out_ds, which already has the fields
+    # of all of them, fields are matched by name and batch_size features are written in one transaction
+    out_layer = out_ds.GetLayer()
+    out_srs = out_layer.GetSpatialRef()
+    count = out_layer.GetFeatureCount()
+
+    for ds in datasets:
+        in_layer = ds.GetLayer()
+        in_srs = in_layer.GetSpatialRef()
+        reproj_params = {}
+        if out_srs is not None and in_srs is not None and not in_srs.IsSame(out_srs):
+            reproj_params = {'dstSRS': out_srs.ExportToWkt(), 'reproject': True}
+
+        options = gdal.VectorTranslateOptions(options=['-gt', str(batch_size)], accessMode='append', layerName=out_layer.GetName(),
+                                              layers=[in_layer.GetName()], **reproj_params)
+        if not gdal.VectorTranslate(out_ds, ds, options=options):
+            raise RuntimeError(f"failed to append '{ds.GetDescription()}' to the merged vector")
+
+    out_layer = out_ds.GetLayer()
+    count = out_layer.GetFeatureCount() - count
+    Logger.get_logger().log('debug', f"{count} features of {len(datasets)} vectors are merged")
+    return count
\ No newline at end of file
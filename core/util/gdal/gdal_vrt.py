@@ -0,0 +1,87 @@
+import weakref
+from functools import reduce
+from typing import TYPE_CHECKING, Union
+from osgeo import gdal
+
+from core.util import assert_ds_equal
+
+if TYPE_CHECKING:
+    from osgeo.gdal import Dataset
+
+# vrt datasets only reference their sources, the sources are kept alive until the vrt dataset object is garbage collected
+_vrt_sources = {}
+
+def _release_vrt_sources(key:int):
+    _vrt_sources.pop(key, None)
+
+def keep_vrt_sources(vrt_ds:"Dataset", sources:list) -> "Dataset":
+    key = id(vrt_ds)
+    _vrt_sources[key] = sources
+    weakref.finalize(vrt_ds, _release_vrt_sources, key)
+    return vrt_ds
+
+def is_vrt_ds(ds:"Dataset") -> bool:
+    return ds is not None and ds.GetDriver().ShortName == 'VRT'
+
+def materialize_ds(ds:"Dataset") -> "Dataset":
+    # pixels of the vrt graph are computed once and copied into a MEM dataset
+    if not is_vrt_ds(ds):
+        return ds
+    return gdal.GetDriverByName('MEM').CreateCopy('', ds)
+
+def wrap_vrt(ds:"Dataset") -> "Dataset":
+    # a vrt reading the dataset as it is, band settings of the vrt can be changed without touching the dataset
+    return keep_vrt_sources(gdal.Translate('', ds, format='VRT'), [ds])
+
+def select_bands_vrt(ds:"Dataset", selected_index:list[int]) -> "Dataset":
+    vrt_ds = gdal.Translate('', ds, format='VRT', bandList=selected_index)
+    for i in range(vrt_ds.RasterCount):
+        band = vrt_ds.GetRasterBand(i+1)
+        if band.GetNoDataValue() is None:
+            band.SetNoDataValue(0)
+
+    return keep_vrt_sources(vrt_ds, [ds])
+
+def window_vrt(ds:"Dataset", window:tuple[int, int, int, int]) -> "Dataset":
+    # a vrt of the (x_off, y_off, x_size, y_size) window, only the window is read from the source
+    return keep_vrt_sources(gdal.Translate('', ds, format='VRT', srcWin=list(window)), [ds])
+
+def stack_vrt(datasets:list["Dataset"]) -> "Dataset":
+    # every band of every dataset becomes a band of the vrt, bands are promoted to a common type like np.concatenate
+    assert_ds_equal(datasets)
+
+    band_types = [ds.GetRasterBand(i+1).DataType for ds in datasets for i in range(ds.RasterCount)]
+    out_type = reduce(gdal.DataTypeUnion, band_types)
+
+    band_vrts = []
+    no_data_list = []
+    for ds in datasets:
+        for i in range(ds.RasterCount):
+            band_vrts.append(gdal.Translate('', ds, format='VRT', bandList=[i+1], outputType=out_type))
+            no_data_list.append(ds.GetRasterBand(i+1).GetNoDataValue())
+
+    vrt_ds = gdal.BuildVRT('', band_vrts, separate=True)
+    for i, no_data in enumerate(no_data_list):
+        if no_data is not None:
+            vrt_ds.GetRasterBand(i+1).SetNoDataValue(no_data)
+
+    src_metadata = datasets[0].GetMetadata()
+    if src_metadata:
+        vrt_ds.SetMetadata(src_metadata)
+
+    return keep_vrt_sources(vrt_ds, datasets + band_vrts)
+
+def mosaic_vrt(datasets:list[Union["Dataset", str]]) -> "Dataset":
+    # later tiles are painted over earlier ones and the pixel size of the first tile is used, same as mosaic_tiles
+    first_ds = gdal.Open(datasets[0]) if isinstance(datasets[0], str) else datasets[0]
+    _, psize_x, _, _, _, psize_y = first_ds.GetGeoTransform()
+
+    vrt_options = gdal.BuildVRTOptions(resolution='user', xRes=abs(psize_x), yRes=abs(psize_y),
+                                       srcNodata='None', VRTNodata='None')
+    vrt_ds = gdal.BuildVRT('', datasets, options=vrt_options)
+
+    return keep_vrt_sources(vrt_ds, [ds for ds in datasets if not isinstance(ds, str)])
+
+def warp_vrt(ds:"Dataset", warp_params:dict) -> "Dataset":
+    vrt_ds = gdal.Warp('', ds, options=gdal.WarpOptions(format='VRT', **warp_params))
+    return keep_vrt_sources(vrt_ds, [ds])
@@ -2,6 +2,8 @@ from typing import Union
 from osgeo import gdal
 from osgeo.gdal import WarpOptions, Dataset
 
+from core.util.gdal import warp_vrt, WarpPlanCache
+
 SNAP_TO_GDAL_RESAMPLING = {
     'nearest': 'near',
     'bicubic': 'cubic'
@@ -34,11 +36,21 @@ def snap_params_to_gdal_warp_options(snap_params: dict) -> dict:
         warp_option_dict['warpOptions'] = ['NUM_THREADS=ALL_CPUS']
     return warp_option_dict
 
-def warp_gdal(ds:Dataset, snap_params: dict) -> Dataset:
+def warp_gdal(ds:Dataset, snap_params: dict, lazy:bool=True) -> Dataset:
 
     warp_params = snap_params_to_gdal_warp_options(snap_params)
-    warp_options = WarpOptions(**warp_params)
-    output_ds = gdal.Warp('/vsimem/memory_warp', ds, options=warp_options)
+
+    # scenes on a grid already warped are remapped with its cached plan
+    warped_ds = WarpPlanCache.get_warp_plan_cache().warp(ds, warp_params)
+    if warped_ds is not None:
+        return warped_ds
+
+    if lazy:
+        # warped vrt, pixels are warped block by block when they are read
+        return warp_vrt(ds, warp_params)
+
+    warp_options = WarpOptions(format='MEM', **warp_params)
+    output_ds = gdal.Warp('', ds, options=warp_options)
 
     return output_ds
 
@@ -0,0 +1,78 @@
+import math
+from typing import Union, Iterator, Optional, TYPE_CHECKING
+
+import numpy as np
+from osgeo import osr
+
+if TYPE_CHECKING:
+    from osgeo.gdal import Dataset
+
+BLOCK_WINDOW = 'block'
+MIN_BLOCK_WINDOW_ROWS = 1024
+
+# pixels kept around a read window, so the kernels of the warp after it see the same neighbours
+READ_WINDOW_MARGIN = 8
+EDGE_POINTS = 21
+
+def get_window_size(ds:"Dataset", window_size:Union[int, str]) -> tuple[int, int]:
+    if window_size == BLOCK_WINDOW:
+        # strip or small tiled blocks are stacked along y to avoid reading too many tiny windows
+        block_x, block_y = ds.GetRasterBand(1).GetBlockSize()
+        block_y = block_y * max(1, math.ceil(MIN_BLOCK_WINDOW_ROWS / block_y))
+        return min(block_x, ds.RasterXSize), min(block_y, ds.RasterYSize)
+
+    assert isinstance(window_size, int) and window_size > 0, f'window_size should be a positive integer or "{BLOCK_WINDOW}"'
+    return min(window_size, ds.RasterXSize), min(window_size, ds.RasterYSize)
+
+def iter_windows(width:int, height:int, win_x:int, win_y:int, halo:int=0) -> Iterator[tuple[tuple, tuple, tuple]]:
+    # yields (read window, write window, slice of the write window inside the read window)
+    for y_off in range(0, height, win_y):
+        y_size = min(win_y, height - y_off)
+        read_y_off = max(0, y_off - halo)
+        read_y_end = min(height, y_off + y_size + halo)
+
+        for x_off in range(0, width, win_x):
+            x_size = min(win_x, width - x_off)
+            read_x_off = max(0, x_off - halo)
+            read_x_end = min(width, x_off + x_size + halo)
+
+            read_window = (read_x_off, read_y_off, read_x_end - read_x_off, read_y_end - read_y_off)
+            write_window = (x_off, y_off, x_size, y_size)
+            inner = (slice(y_off - read_y_off, y_off - read_y_off + y_size),
+                     slice(x_off - read_x_off, x_off - read_x_off + x_size))
+
+            yield read_window, write_window, inner
+
+def bounds_window(ds:"Dataset", bounds:list[float], bounds_epsg:int=4326, margin:int=READ_WINDOW_MARGIN) -> Optional[tuple[int, int, int, int]]:
+    # (x_off, y_off, x_size, y_size) of the pixels covering bounds(min_x, max_y, max_x, min_y), None when the dataset
+    # is not a north-up grid with square pixels, the bounds are outside, or the window is the whole dataset
+    gt = ds.GetGeoTransform(can_return_null=True)
+    wkt = ds.GetProjection()
+    if gt is None or not wkt or gt[2] != 0 or gt[4] != 0 or not math.isclose(abs(gt[1]), abs(gt[5])):
+        return None
+
+    src_srs, dst_srs = osr.SpatialReference(), osr.SpatialReference()
+    src_srs.ImportFromEPSG(bounds_epsg)
+    dst_srs.ImportFromWkt(wkt)
+    src_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    dst_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+    # the edges are densified, a box of lon/lat is curved in projected coordinates
+    min_x, max_y, max_x, min_y = bounds
+    t = np.linspace(0., 1., EDGE_POINTS)
+    xs = np.concatenate([min_x + (max_x - min_x) * t, np.full(EDGE_POINTS, max_x), max_x - (max_x - min_x) * t, np.full(EDGE_POINTS, min_x)])
+    ys = np.concatenate([np.full(EDGE_POINTS, max_y), max_y - (max_y - min_y) * t, np.full(EDGE_POINTS, min_y), min_y + (max_y - min_y) * t])
+    points = np.array(osr.CoordinateTransformation(src_srs, dst_srs).TransformPoints(list(zip(xs.tolist(), ys.tolist()))))[:, :2]
+    if not np.all(np.isfinite(points)):
+        return None
+
+    cols = (points[:, 0] - gt[0]) / gt[1]
+    rows = (points[:, 1] - gt[3]) / gt[5]
+    x_off, y_off = max(0, math.floor(cols.min()) - margin), max(0, math.floor(rows.min()) - margin)
+    x_end, y_end = min(ds.RasterXSize, math.ceil(cols.max()) + margin), min(ds.RasterYSize, math.ceil(rows.max()) + margin)
+
+    if x_end <= x_off or y_end <= y_off:
+        return None
+    if (x_off, y_off, x_end, y_end) == (0, 0, ds.RasterXSize, ds.RasterYSize):
+        return None
+    return x_off, y_off, x_end - x_off, y_end - y_off
@@ -0,0 +1,114 @@
+from typing import Union, Optional
+from osgeo import gdal
+
+GTIFF_PROFILE = 'gtiff'
+COG_PROFILE = 'cog'
+WRITE_PROFILES = [GTIFF_PROFILE, COG_PROFILE]
+
+TIFF_COMPRESS_METHODS = ['NONE', 'LZW', 'DEFLATE', 'ZSTD', 'LERC', 'LERC_DEFLATE', 'LERC_ZSTD']
+DEFAULT_BLOCK_SIZE = 512
+DEFAULT_NUM_THREADS = 'ALL_CPUS'
+OVERVIEW_RESAMPLING = 'AVERAGE'
+
+# level option of each compress method for the GTiff driver, the COG driver uses LEVEL for all of them
+_GTIFF_LEVEL_OPTIONS = {
+    'DEFLATE': 'ZLEVEL',
+    'LERC_DEFLATE': 'ZLEVEL',
+    'ZSTD': 'ZSTD_LEVEL',
+    'LERC_ZSTD': 'ZSTD_LEVEL'
+}
+
+_COG_PREDICTORS = {1: 'NO', 2: 'STANDARD', 3: 'FLOATING_POINT'}
+
+_FLOAT_TYPES = ['Float16', 'Float32', 'Float64']
+_COMPLEX_TYPES = ['CInt16', 'CInt32', 'CFloat16', 'CFloat32', 'CFloat64']
+
+def _compress_available(method:str) -> bool:
+    option_list = gdal.GetDriverByName('GTiff').GetMetadataItem('DMD_CREATIONOPTIONLIST')
+    return option_list is not None and method in option_list
+
+def default_compress() -> str:
+    return 'ZSTD' if _compress_available('ZSTD') else 'DEFLATE'
+
+def default_predictor(data_type:int, compress:str) -> Optional[int]:
+    # horizontal differencing for integers and floating point prediction for floats, lerc is lossy and does not use a predictor
+    if compress not in ['LZW', 'DEFLATE', 'ZSTD']:
+        return None
+
+    type_name = gdal.GetDataTypeName(data_type)
+    if type_name in _COMPLEX_TYPES:
+        return None
+    if type_name in _FLOAT_TYPES:
+        return 3
+    return 2
+
+def to_compress_method(compress:Union[bool, str, None]) -> str:
+    if compress is None or compress is True:
+        return default_compress()
+    if compress is False:
+        return 'NONE'
+
+    compress = compress.upper()
+    assert compress in TIFF_COMPRESS_METHODS, f'compress should be one of {TIFF_COMPRESS_METHODS}'
+    return compress
+
+def build_tiff_options(data_type:int, is_bigtiff:bool=False, profile:str=GTIFF_PROFILE, compress:Union[bool, str, None]=None,
+                       compress_level:int=None, predictor:int=None, max_z_error:float=None, tiled:bool=True,
+                       block_size:int=DEFAULT_BLOCK_SIZE, num_threads:Union[int, str]=DEFAULT_NUM_THREADS,
+                       overviews:bool=False) -> list[str]:
+
+    assert profile in WRITE_PROFILES, f'profile should be one of {WRITE_PROFILES}'
+
+    compress = to_compress_method(compress)
+    if predictor is None:
+        predictor = default_predictor(data_type, compress)
+
+    options = [f'COMPRESS={compress}', f'NUM_THREADS={num_threads}']
+    if is_bigtiff:
+        options.append('BIGTIFF=YES')
+    if max_z_error is not None:
+        options.append(f'MAX_Z_ERROR={max_z_error}')
+
+    if profile == COG_PROFILE:
+        # cog is always tiled, overviews are built by the driver
+        options.append(f'BLOCKSIZE={block_size}')
+        options.append(f'OVERVIEWS={"AUTO" if overviews else "NONE"}')
+        if compress_level is not None:
+            options.append(f'LEVEL={compress_level}')
+        if predictor is not None:
+            options.append(f'PREDICTOR={_COG_PREDICTORS[predictor]}')
+    else:
+        if tiled:
+            options += ['TILED=YES', f'BLOCKXSIZE={block_size}', f'BLOCKYSIZE={block_size}']
+        if compress_level is not None and compress in _GTIFF_LEVEL_OPTIONS:
+            options.append(f'{_GTIFF_LEVEL_OPTIONS[compress]}={compress_level}')
+        if predictor is not None:
+            options.append(f'PREDICTOR={predictor}')
+
+    return options
+
+def get_overview_levels(width:int, height:int, block_size:int=DEFAULT_BLOCK_SIZE) -> list[int]:
+    # halves the size until the smallest overview fits in one block
+    levels = []
+    factor = 2
+    while max(width, height) / (factor // 2) > block_size:
+        levels.append(factor)
+        factor *= 2
+    return levels
+
+def build_overviews(ds:"gdal.Dataset", levels:list[int]=None, resampling:str=OVERVIEW_RESAMPLING, compress:str=None):
+    if levels is None:
+        levels = get_overview_levels(ds.RasterXSize, ds.RasterYSize)
+    if len(levels) == 0:
+        return ds
+
+    # overviews are compressed like the dataset unless another method is given
+    if compress is None:
+        compress = ds.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE')
+
+    options = [f'NUM_THREADS={DEFAULT_NUM_THREADS}']
+    if compress is not None:
+        options.append(f'COMPRESS_OVERVIEW={compress}')
+
+    ds.BuildOverviews(resampling, levels, options=options)
+    return ds
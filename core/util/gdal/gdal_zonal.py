@@ -0,0 +1,203 @@
+from typing import TYPE_CHECKING, Optional, Iterator
+from pathlib import Path
+
+import numpy as np
+from osgeo import gdal, ogr, osr
+
+from core.util.gdal import create_ds, create_datasource, iter_features, write_features, get_vector_fields, WRITE_BATCH_SIZE
+
+if TYPE_CHECKING:
+    from osgeo.gdal import Dataset
+    from osgeo.ogr import Layer, Feature
+
+ZONE_FIELD = 'zone'
+ZONAL_STATS = ['count', 'mean', 'std', 'min', 'max']
+ZONAL_PERCENTILE_BINS = 256
+ZONAL_TABLE_DRIVERS = {
+    'gpkg': 'GPKG',
+    'shp': 'ESRI Shapefile',
+    'geojson': 'GeoJSON',
+    'csv': 'CSV'
+}
+
+def _traditional_srs(srs:osr.SpatialReference) -> osr.SpatialReference:
+    srs = srs.Clone()
+    srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return srs
+
+def zone_layer_ds(layer:"Layer", proj_wkt:str) -> "Dataset":
+    # geometries of the layer in the srs of the raster with the zone id of the feature, its position in the layer + 1
+    dst_srs = osr.SpatialReference()
+    dst_srs.ImportFromWkt(proj_wkt)
+    src_srs = layer.GetSpatialRef()
+    transform = None
+    if src_srs is not None and not src_srs.IsSame(dst_srs):
+        transform = osr.CoordinateTransformation(_traditional_srs(src_srs), _traditional_srs(dst_srs))
+
+    zone_ds = create_ds(gdal_format='Memory', is_vector=True, proj_wkt=proj_wkt, geom_type=ogr.wkbUnknown,
+                        field_defs=[ogr.FieldDefn(ZONE_FIELD, ogr.OFTInteger)])
+    zone_layer = zone_ds.GetLayer()
+    zone_defn = zone_layer.GetLayerDefn()
+
+    def zone_features() -> Iterator["Feature"]:
+        for zone_id, feat in enumerate(iter_features(layer), start=1):
+            zone_feat = ogr.Feature(zone_defn)
+            zone_feat.SetField(ZONE_FIELD, zone_id)
+            geom = feat.GetGeometryRef()
+            if geom is not None:
+                geom = geom.Clone()
+                if transform is not None:
+                    geom.Transform(transform)
+                zone_feat.SetGeometryDirectly(geom)
+            yield zone_feat
+
+    write_features(zone_layer, zone_features())
+    return zone_ds
+
+def rasterize_zones(zone_layer:"Layer", ref_ds:"Dataset", window:tuple[int, int, int, int]) -> np.ndarray:
+    # zone ids of the pixels of the window, 0 is outside of every zone and a pixel covered by several zones takes the last one
+    x_off, y_off, x_size, y_size = window
+    gt = ref_ds.GetGeoTransform()
+    win_gt = (gt[0] + x_off * gt[1] + y_off * gt[2], gt[1], gt[2], gt[3] + x_off * gt[4] + y_off * gt[5], gt[4], gt[5])
+
+    zone_ds = gdal.GetDriverByName('MEM').Create('', x_size, y_size, 1, gdal.GDT_Int32)
+    zone_ds.SetGeoTransform(win_gt)
+    zone_ds.SetProjection(ref_ds.GetProjection())
+
+    # only the zones over the window are burned
+    xs = [win_gt[0] + px * win_gt[1] + py * win_gt[2] for px, py in [(0, 0), (x_size, 0), (0, y_size), (x_size, y_size)]]
+    ys = [win_gt[3] + px * win_gt[4] + py * win_gt[5] for px, py in [(0, 0), (x_size, 0), (0, y_size), (x_size, y_size)]]
+    zone_layer.SetSpatialFilterRect(min(xs), min(ys), max(xs), max(ys))
+    try:
+        gdal.RasterizeLayer(zone_ds, [1], zone_layer, options=[f'ATTRIBUTE={ZONE_FIELD}'])
+    finally:
+        zone_layer.SetSpatialFilter(None)
+
+    return zone_ds.GetRasterBand(1).ReadAsArray()
+
+class ZonalAccumulator:
+    """
+    Statistics of the pixels of every zone of a band, accumulated window by window.
+
+    count, sum and sum of squares are added with np.bincount and min/max with np.minimum.at/np.maximum.at, so the
+    memory is bounded by the number of zones.
+    """
+
+    def __init__(self, n_zones:int):
+        # index 0 is the zone of the pixels outside of every zone
+        self.n_zones = n_zones
+        self.count = np.zeros(n_zones + 1, dtype=np.int64)
+        self.sum = np.zeros(n_zones + 1, dtype=np.float64)
+        self.sum_sq = np.zeros(n_zones + 1, dtype=np.float64)
+        self.min = np.full(n_zones + 1, np.inf)
+        self.max = np.full(n_zones + 1, -np.inf)
+
+    def add(self, zones:np.ndarray, values:np.ndarray, no_data:Optional[float]=None):
+        zones, values = _valid_pixels(zones, values, no_data)
+        size = self.n_zones + 1
+        self.count += np.bincount(zones, minlength=size)
+        self.sum += np.bincount(zones, weights=values, minlength=size)
+        self.sum_sq += np.bincount(zones, weights=values * values, minlength=size)
+        np.minimum.at(self.min, zones, values)
+        np.maximum.at(self.max, zones, values)
+
+    def result(self, stats:Optional[list[str]]=None) -> dict[str, np.ndarray]:
+        # statistics by zone id - 1, nan for zones without a valid pixel
+        stats = ZONAL_STATS if stats is None else stats
+        count = self.count[1:]
+        empty = count == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.sum[1:] / count
+            std = np.sqrt(np.maximum(self.sum_sq[1:] / count - mean * mean, 0.))
+
+        all_stats = {
+            'count': count,
+            'mean': mean,
+            'std': np.where(empty, np.nan, std),
+            'min': np.where(empty, np.nan, self.min[1:]),
+            'max': np.where(empty, np.nan, self.max[1:])
+        }
+        return {stat: all_stats[stat] for stat in stats}
+
+class ZonalHistogram:
+    """
+    Histograms of the pixels of every zone of a band between the min and max of the zone, for its percentiles.
+
+    The min and max come from a ZonalAccumulator of a first pass over the windows, so a percentile is off by at most
+    (max - min) / bins of its zone. The memory is bounded by the number of zones times bins, not by the raster.
+    """
+
+    def __init__(self, zone_min:np.ndarray, zone_max:np.ndarray, bins:int=ZONAL_PERCENTILE_BINS):
+        # min and max of the zones indexed by zone id, like the ones of ZonalAccumulator
+        assert bins > 0, 'bins of the zonal histogram should be greater than 0'
+        self.n_zones = len(zone_min) - 1
+        self.bins = bins
+        self.lower = np.where(np.isfinite(zone_min), zone_min, 0.)
+        self.width = np.where(np.isfinite(zone_max), zone_max, 0.) - self.lower
+        self.counts = np.zeros((self.n_zones + 1, bins), dtype=np.uint32)
+
+    def add(self, zones:np.ndarray, values:np.ndarray, no_data:Optional[float]=None):
+        zones, values = _valid_pixels(zones, values, no_data)
+        width = self.width[zones]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bin_idx = np.where(width > 0, (values - self.lower[zones]) / width * self.bins, 0.)
+        bin_idx = np.clip(bin_idx.astype(np.int64), 0, self.bins - 1)
+        np.add.at(self.counts, (zones, bin_idx), 1)
+
+    def percentiles(self, percentiles:list[float]) -> dict[str, np.ndarray]:
+        # ranks of np.percentile with linear interpolation, located in the histogram and interpolated inside their bin
+        counts = self.counts[1:].astype(np.int64)
+        cum = np.cumsum(counts, axis=1)
+        total = cum[:, -1]
+        lower, width = self.lower[1:], self.width[1:]
+        rows = np.arange(self.n_zones)
+
+        results = {}
+        for q in percentiles:
+            rank = (total - 1) * q / 100.
+            bin_idx = np.minimum((cum <= rank[:, None]).sum(axis=1), self.bins - 1)
+            in_bin = counts[rows, bin_idx]
+            before = cum[rows, bin_idx] - in_bin
+            with np.errstate(invalid='ignore', divide='ignore'):
+                fraction = np.clip((rank - before + 0.5) / in_bin, 0., 1.)
+            values = lower + width * (bin_idx + fraction) / self.bins
+            values[width == 0] = lower[width == 0]
+            values[total == 0] = np.nan
+            results[f'p{q:g}'] = values
+        return results
+
+def _valid_pixels(zones:np.ndarray, values:np.ndarray, no_data:Optional[float]=None) -> tuple[np.ndarray, np.ndarray]:
+    valid = (zones > 0) & np.isfinite(values)
+    if no_data is not None:
+        valid &= values != no_data
+    return zones[valid], values[valid].astype(np.float64)
+
+def write_zonal_table(layer:"Layer", zone_stats:dict[str, np.ndarray], out_path:str, batch_size:int=WRITE_BATCH_SIZE) -> str:
+    # features of the layer with their attributes and the statistics of their zone
+    out_ext = Path(out_path).suffix[1:].lower()
+    assert out_ext in ZONAL_TABLE_DRIVERS, f'extension of the zonal statistics table should be one of {list(ZONAL_TABLE_DRIVERS.keys())}'
+
+    out_ds = create_datasource(out_path, ZONAL_TABLE_DRIVERS[out_ext])
+    out_layer = out_ds.CreateLayer(Path(out_path).stem, layer.GetSpatialRef(), layer.GetGeomType())
+    src_fields = get_vector_fields(layer)
+    for field_defn in src_fields:
+        out_layer.CreateField(field_defn)
+    for name, values in zone_stats.items():
+        out_layer.CreateField(ogr.FieldDefn(name, ogr.OFTInteger64 if values.dtype.kind in 'iu' else ogr.OFTReal))
+
+    # statistics are set by index, drivers may shorten the names of the fields
+    out_defn = out_layer.GetLayerDefn()
+    stat_fields = [(len(src_fields) + i, values) for i, values in enumerate(zone_stats.values())]
+
+    def stat_features() -> Iterator["Feature"]:
+        for zone_idx, in_feat in enumerate(iter_features(layer)):
+            out_feat = ogr.Feature(out_defn)
+            out_feat.SetFrom(in_feat)
+            for field_idx, values in stat_fields:
+                if np.isfinite(values[zone_idx]):
+                    out_feat.SetField(field_idx, values[zone_idx].item())
+            yield out_feat
+
+    write_features(out_layer, stat_features(), batch_size)
+    out_ds = None
+    return out_path
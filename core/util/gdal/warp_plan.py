@@ -0,0 +1,232 @@
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+from osgeo import gdal, gdal_array, osr
+
+if TYPE_CHECKING:
+    from osgeo.gdal import Dataset
+
+# resamplings applied from a plan, the other ones are warped by gdal
+PLAN_RESAMPLINGS = ['near']
+
+# dst pixels between two exactly transformed points of the plan, the others are interpolated like the approximate
+# transformer of gdal
+WARP_PLAN_STEP = 16
+REMAP_BLOCK_PIXELS = 1 << 22
+
+def warp_plan_key(ds:"Dataset", warp_params:dict) -> Optional[tuple]:
+    # scenes on the same grid with the same params share a plan, datasets located by gcps or rpcs have no plan
+    gt = ds.GetGeoTransform(can_return_null=True)
+    src_wkt = warp_params.get('srcSRS', ds.GetProjection())
+    if gt is None or not src_wkt or ds.GetGCPCount() > 0 or ds.GetMetadata('RPC'):
+        return None
+    return tuple(gt), ds.RasterXSize, ds.RasterYSize, str(src_wkt), repr(sorted(warp_params.items()))
+
+def _srs(wkt:str) -> osr.SpatialReference:
+    srs = osr.SpatialReference()
+    srs.SetFromUserInput(wkt)
+    srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return srs
+
+def _coarse_positions(size:int, step:int) -> np.ndarray:
+    return np.unique(np.r_[np.arange(0, size, step), size - 1])
+
+def _interp_axis(values:np.ndarray, coarse:np.ndarray, positions:np.ndarray, axis:int) -> np.ndarray:
+    # linear interpolation of values sampled at the coarse positions along the axis
+    if len(coarse) == 1:
+        return np.repeat(values, len(positions), axis=axis)
+    idx = np.clip(np.searchsorted(coarse, positions, side='right') - 1, 0, len(coarse) - 2)
+    w = ((positions - coarse[idx]) / (coarse[idx + 1] - coarse[idx])).astype(np.float32)
+    lower, upper = np.take(values, idx, axis=axis), np.take(values, idx + 1, axis=axis)
+    if axis == 0:
+        w = w[:, None]
+    return lower + (upper - lower) * w
+
+class WarpPlan:
+    """
+    Destination grid of a warp and the source pixel coordinates of its pixel centers.
+
+    The coordinates are transformed exactly every WARP_PLAN_STEP pixels and stored as float32, the pixels between
+    them are interpolated when the plan is applied.
+    """
+
+    def __init__(self, dst_gt:tuple, dst_size:tuple[int, int], dst_wkt:str, src_x:np.ndarray, src_y:np.ndarray, step:int=WARP_PLAN_STEP):
+        self.dst_gt = dst_gt
+        self.dst_size = dst_size
+        self.dst_wkt = dst_wkt
+        self.src_x = src_x
+        self.src_y = src_y
+        self.step = step
+
+    @classmethod
+    def from_warp(cls, ds:"Dataset", warp_params:dict, step:int=WARP_PLAN_STEP) -> "WarpPlan":
+        # the destination grid is the one gdal.Warp chooses, no pixel is warped here
+        grid_ds = gdal.Warp('', ds, options=gdal.WarpOptions(format='VRT', **warp_params))
+        dst_gt, dst_wkt = grid_ds.GetGeoTransform(), grid_ds.GetProjection()
+        dst_size = (grid_ds.RasterXSize, grid_ds.RasterYSize)
+        grid_ds = None
+
+        cols, rows = _coarse_positions(dst_size[0], step), _coarse_positions(dst_size[1], step)
+        px, py = np.meshgrid(cols + 0.5, rows + 0.5)
+        geo_x = dst_gt[0] + px * dst_gt[1] + py * dst_gt[2]
+        geo_y = dst_gt[3] + px * dst_gt[4] + py * dst_gt[5]
+
+        src_srs, dst_srs = _srs(warp_params.get('srcSRS', ds.GetProjection())), _srs(dst_wkt)
+        if not src_srs.IsSame(dst_srs):
+            points = osr.CoordinateTransformation(dst_srs, src_srs).TransformPoints(list(zip(geo_x.ravel().tolist(), geo_y.ravel().tolist())))
+            points = np.array(points, dtype=np.float64)[:, :2]
+            geo_x, geo_y = points[:, 0].reshape(px.shape), points[:, 1].reshape(px.shape)
+
+        inv_gt = gdal.InvGeoTransform(ds.GetGeoTransform())
+        src_x = inv_gt[0] + geo_x * inv_gt[1] + geo_y * inv_gt[2]
+        src_y = inv_gt[3] + geo_x * inv_gt[4] + geo_y * inv_gt[5]
+
+        # points failed to transform are outside of the source
+        invalid = ~(np.isfinite(src_x) & np.isfinite(src_y))
+        src_x[invalid], src_y[invalid] = -1., -1.
+
+        return cls(dst_gt, dst_size, dst_wkt, src_x.astype(np.float32), src_y.astype(np.float32), step)
+
+    @property
+    def nbytes(self) -> int:
+        return self.src_x.nbytes + self.src_y.nbytes
+
+    def src_coords(self, row_off:int, rows:int) -> tuple[np.ndarray, np.ndarray]:
+        # source pixel coordinates of the dst rows [row_off, row_off + rows)
+        dst_x, dst_y = self.dst_size
+        coarse_cols, coarse_rows = _coarse_positions(dst_x, self.step), _coarse_positions(dst_y, self.step)
+
+        # only the coarse rows around the dst rows are interpolated
+        lo = max(0, int(np.searchsorted(coarse_rows, row_off, side='right')) - 1)
+        hi = min(len(coarse_rows), int(np.searchsorted(coarse_rows, row_off + rows - 1, side='left')) + 1)
+        row_positions, col_positions = np.arange(row_off, row_off + rows), np.arange(dst_x)
+
+        coords = []
+        for values in [self.src_x, self.src_y]:
+            by_col = _interp_axis(values[lo:hi], coarse_cols, col_positions, axis=1)
+            coords.append(_interp_axis(by_col, coarse_rows[lo:hi], row_positions, axis=0))
+        return coords[0], coords[1]
+
+    def remap(self, ds:"Dataset") -> Optional["Dataset"]:
+        # nearest neighbour warp into a MEM dataset, None when the bands do not share one data type
+        data_types = set([ds.GetRasterBand(i + 1).DataType for i in range(ds.RasterCount)])
+        if len(data_types) != 1:
+            return None
+        data_type = data_types.pop()
+        dtype = gdal_array.GDALTypeCodeToNumericTypeCode(data_type)
+
+        dst_x, dst_y = self.dst_size
+        out_ds = gdal.GetDriverByName('MEM').Create('', dst_x, dst_y, ds.RasterCount, data_type)
+        out_ds.SetGeoTransform(self.dst_gt)
+        out_ds.SetProjection(self.dst_wkt)
+        if ds.GetMetadata():
+            out_ds.SetMetadata(ds.GetMetadata())
+
+        src_bands, no_data_list = [], []
+        for i in range(ds.RasterCount):
+            src_band, out_band = ds.GetRasterBand(i + 1), out_ds.GetRasterBand(i + 1)
+            no_data = src_band.GetNoDataValue()
+            if no_data is not None:
+                out_band.SetNoDataValue(no_data)
+            if src_band.GetDescription():
+                out_band.SetDescription(src_band.GetDescription())
+            src_bands.append(src_band)
+            no_data_list.append(0 if no_data is None else no_data)
+
+        block_rows = max(1, REMAP_BLOCK_PIXELS // dst_x)
+        for row_off in range(0, dst_y, block_rows):
+            rows = min(block_rows, dst_y - row_off)
+            src_x, src_y = self.src_coords(row_off, rows)
+            # a dst pixel takes the source pixel containing its center, same as the nearest kernel of gdal
+            ix, iy = np.floor(src_x + 1e-10).astype(np.int64), np.floor(src_y + 1e-10).astype(np.int64)
+            valid = (ix >= 0) & (ix < ds.RasterXSize) & (iy >= 0) & (iy < ds.RasterYSize)
+
+            # only the source window under the block is read, so a lazy source is never loaded as a whole
+            x_off, y_off, x_size, y_size = 0, 0, 0, 0
+            if valid.any():
+                ix, iy = ix[valid], iy[valid]
+                x_off, y_off = int(ix.min()), int(iy.min())
+                x_size, y_size = int(ix.max()) - x_off + 1, int(iy.max()) - y_off + 1
+
+            for i, (src_band, no_data) in enumerate(zip(src_bands, no_data_list)):
+                out_arr = np.full((rows, dst_x), no_data, dtype=dtype)
+                if x_size > 0:
+                    src_arr = src_band.ReadAsArray(x_off, y_off, x_size, y_size)
+                    out_arr[valid] = src_arr[iy - y_off, ix - x_off]
+                out_ds.GetRasterBand(i + 1).WriteArray(out_arr, 0, row_off)
+
+        return out_ds
+
+class WarpPlanCache:
+    """
+    Warp plans of the source grids warped in this process, most recently used first.
+
+    Scenes of a batch are mostly on the same tile grid, the transformation of their pixel coordinates is done for the
+    first scene and the next ones are remapped with it. A remapped scene is computed at once instead of lazily, block by
+    block from the source window under each block. The cache is disabled until enabled with a number of plans.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WarpPlanCache, cls).__new__(cls)
+            cls._instance._plans = OrderedDict()
+            cls._instance._lock = threading.Lock()
+            cls._instance.max_plans = 0
+            cls._instance.hits = 0
+            cls._instance.misses = 0
+        return cls._instance
+
+    @classmethod
+    def get_warp_plan_cache(cls):
+        return cls()
+
+    @property
+    def active(self) -> bool:
+        return self.max_plans > 0
+
+    def enable(self, max_plans:int=8):
+        assert max_plans > 0, 'max_plans of the warp plan cache should be greater than 0'
+        self.max_plans = max_plans
+
+    def disable(self):
+        self.max_plans = 0
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._plans = OrderedDict()
+            self.hits, self.misses = 0, 0
+
+    def get_plan(self, ds:"Dataset", warp_params:dict) -> Optional[WarpPlan]:
+        key = warp_plan_key(ds, warp_params)
+        if key is None:
+            return None
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+
+        plan = WarpPlan.from_warp(ds, warp_params)
+        with self._lock:
+            self.misses += 1
+            self._plans[key] = plan
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+        return plan
+
+    def warp(self, ds:"Dataset", warp_params:dict) -> Optional["Dataset"]:
+        # warped MEM dataset, None when the warp can not be done from a plan
+        if not self.active or warp_params.get('resampleAlg', 'near') not in PLAN_RESAMPLINGS:
+            return None
+
+        plan = self.get_plan(ds, warp_params)
+        if plan is None:
+            return None
+        return plan.remap(ds)
@@ -1,57 +1,58 @@
 import numpy as np
 
-def grid_extend(data, ex=2, ey=2, iterations=1, crop=True):
+def _window_bounds(n:int) -> tuple[np.ndarray, np.ndarray]:
+    # window of each cell along an axis, [i:i+3] at the start, [i-2:i+3] in the middle and [i-2:i+1] at the end
+    i = np.arange(n)
+    lo = np.where(i < 2, i, i - 2)
+    hi = np.where(i < 2, np.minimum(i + 3, n), np.where(i < n - 2, i + 3, i + 1))
+    return lo, hi
+
+def _extend_axis(src:np.ndarray, tar:np.ndarray, axis:int) -> np.ndarray:
+    # fills non-finite cells of tar which have exactly two finite values in their window of src,
+    # by linear extrapolation from the first two (or last two) values of the window
+    n = src.shape[axis]
+    lo, hi = _window_bounds(n)
+
+    finite_count = np.cumsum(np.isfinite(src), axis=axis)
+    finite_count = np.concatenate([np.zeros_like(np.take(finite_count, [0], axis=axis)), finite_count], axis=axis)
+    count = np.take(finite_count, hi, axis=axis) - np.take(finite_count, lo, axis=axis)
+
+    s_first = np.take(src, lo, axis=axis)
+    s_second = np.take(src, np.minimum(lo + 1, n - 1), axis=axis)
+    s_last = np.take(src, hi - 1, axis=axis)
+    s_before_last = np.take(src, np.maximum(hi - 2, 0), axis=axis)
+
+    v = np.where(np.isnan(s_first), s_before_last - (s_last - s_before_last), s_second + (s_second - s_first))
 
-    in_shape = data.shape
-    out_shape = data.shape[0]+ey, data.shape[1]+ex
+    fill = (count == 2) & ~np.isfinite(tar)
+    tar[fill] = v[fill]
+    return tar
+
+def _grid_extend(data:np.ndarray, ex:int, ey:int, iterations:int, crop:bool) -> np.ndarray:
+    out_shape = data.shape[:-2] + (data.shape[-2]+ey, data.shape[-1]+ex)
 
     for it in range(iterations):
         if it == 0:
             tmp_src = np.zeros(out_shape)+np.nan
-            tmp_src[1:-1,1:-1]=data*1
+            tmp_src[..., 1:-1, 1:-1] = data*1
             tmp_tar = np.zeros(out_shape)+tmp_src
         else:
             tmp_src = tmp_tar*1
 
         ## do y direction
-        for i in range(tmp_src.shape[0]):
-            for j in range(tmp_src.shape[1]):
-                if np.isfinite(tmp_tar[i,j]): continue
-
-                if (i<2):
-                    s = tmp_src[i:i+3, j]
-                elif (i>=2) & (i<tmp_src.shape[0]-2):
-                    s = tmp_src[i-2:i+3, j]
-                else:
-                    s = tmp_src[i-2:i+1, j]
-
-                l = np.where(np.isfinite(s))[0]
-                if len(l) == 2:
-                    if np.isnan(s[0]):
-                        v = s[-2]-(s[-1]-s[-2])
-                    else:
-                        v =  s[1]+(s[1]-s[0])
-                    tmp_tar[i,j] = v
-
+        tmp_tar = _extend_axis(tmp_src, tmp_tar, axis=-2)
         ## do x direction
-        for i in range(tmp_src.shape[0]):
-            for j in range(tmp_src.shape[1]):
-                if np.isfinite(tmp_tar[i,j]): continue
-
-                if (j<2):
-                    s = tmp_src[i, j:j+3]
-                elif (j>=2) & (j<tmp_src.shape[1]-2):
-                    s = tmp_src[i, j-2:j+3]
-                else:
-                    s = tmp_src[i, j-2:j+1]
-
-                l = np.where(np.isfinite(s))[0]
-                if len(l) == 2:
-                    if np.isnan(s[0]):
-                        v = s[-2]-(s[-1]-s[-2])
-                    else:
-                        v =  s[1]+(s[1]-s[0])
-                    tmp_tar[i,j] = v
-
-    if crop: tmp_tar = tmp_tar[1:-1,1:-1]
-    return(tmp_tar)
+        tmp_tar = _extend_axis(tmp_src, tmp_tar, axis=-1)
+
+    if crop: tmp_tar = tmp_tar[..., 1:-1, 1:-1]
+    return tmp_tar
+
+def grid_extend(data, ex=2, ey=2, iterations=1, crop=True):
+    assert data.ndim == 2, 'grid_extend expects a 2d grid, use grid_extend_batch for a stack of grids'
+    return _grid_extend(data, ex, ey, iterations, crop)
+
+def grid_extend_batch(data, ex=2, ey=2, iterations=1, crop=True):
+    # extends a stack of grids with shape (n, rows, cols) at once
+    data = np.asarray(data)
+    assert data.ndim == 3, 'grid_extend_batch expects a stack of grids with shape (n, rows, cols)'
+    return _grid_extend(data, ex, ey, iterations, crop)
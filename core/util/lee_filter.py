@@ -1,22 +1,25 @@
+import numpy as np
 from scipy.ndimage import uniform_filter, variance
 
-def apply_lee_filter(bands:dict, size:int):
+def apply_lee_filter(bands:dict, size:int, overall_variances:dict=None):
     """
     Apply Lee filter to reduce speckle noise.
 
     Parameters:
         bands (dict): Input bands data.
         size (int): Size of the window filter.
+        overall_variances (dict): Variance of each whole band, computed from the given bands if None.
 
     Returns:
         dict: Filtered bands.
     """
     for key, value in bands.items():
         band = value['value']
-        value['value'] = lee_filter(band, size)
+        overall_variance = None if overall_variances is None else overall_variances[key]
+        value['value'] = lee_filter(band, size, overall_variance)
     return bands
 
-def lee_filter(img, size):
+def lee_filter(img, size, overall_variance=None):
     # added from original preprocessing code
     """
     Apply Lee filter to reduce speckle noise.
@@ -24,6 +27,7 @@ def lee_filter(img, size):
     Parameters:
         img (np.array): Input image data.
         size (int): Size of the window filter.
+        overall_variance (float): Variance of the whole image, computed from img if None.
 
     Returns:
         np.array: Filtered image.
@@ -32,10 +36,30 @@ def lee_filter(img, size):
     img_sqr_mean = uniform_filter(img ** 2, size)
     img_variance = img_sqr_mean - img_mean ** 2
 
-    overall_variance = variance(img)
+    if overall_variance is None:
+        overall_variance = variance(img)
 
     # Calculate the weights for the filter
     img_weights = img_variance / (img_variance + overall_variance)
     img_output = img_mean + img_weights * (img - img_mean)
 
-    return img_output
\ No newline at end of file
+    return img_output
+
+def accumulate_moments(bands:dict, moments:dict=None) -> dict:
+    # accumulates (count, sum, sum of squares) of each band over windows
+    if moments is None:
+        moments = {}
+
+    for key, value in bands.items():
+        band = value['value'].astype(np.float64)
+        count, total, total_sqr = moments.get(key, (0, 0.0, 0.0))
+        moments[key] = (count + band.size, total + np.sum(band), total_sqr + np.sum(band ** 2))
+
+    return moments
+
+def variance_from_moments(moments:dict) -> dict:
+    variances = {}
+    for key, (count, total, total_sqr) in moments.items():
+        mean = total / count
+        variances[key] = total_sqr / count - mean ** 2
+    return variances
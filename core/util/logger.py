@@ -45,6 +45,8 @@ class Logger:
 
         self.logger = logging.getLogger('senj')
         self.logger.setLevel(logger_level_map[logging_level])
+        self.log_level = logging_level
+        self.log_file_path = log_file_path
 
         formatter = TruncatedFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', max_length=500)
 
@@ -59,6 +61,10 @@ class Logger:
             file_handler.setFormatter(formatter)
             self.logger.addHandler(file_handler)
 
+    def __reduce__(self):
+        # ops are sent to the workers of MultiProcessor, which set up their own logger
+        return Logger.get_logger, (self.log_level, self.log_file_path)
+
     def log(self, level, msg):
         level = level.lower()
         log_method = getattr(self.logger, level)
@@ -0,0 +1,59 @@
+import threading
+from contextlib import contextmanager
+
+class MemoryAccount:
+    """
+    Bytes held by the results of op calls, i.e. cached bands and MEM datasets.
+
+    The largest result of every (proc_name, op_name) is kept for the run, and the calls of one scene can be tracked
+    in the calling thread to measure its working set.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(MemoryAccount, cls).__new__(cls)
+            cls._instance.peaks = {}
+            cls._instance._lock = threading.Lock()
+            cls._instance._local = threading.local()
+        return cls._instance
+
+    @classmethod
+    def get_account(cls):
+        return cls()
+
+    def record(self, proc_name:str, op_name:str, nbytes:int):
+        key = (proc_name, op_name)
+        with self._lock:
+            self.peaks[key] = max(self.peaks.get(key, 0), nbytes)
+
+        calls = getattr(self._local, 'calls', None)
+        if calls is not None:
+            calls.append(nbytes)
+
+    def merge(self, peaks:dict[tuple[str, str], int]):
+        # peaks recorded in the workers of MultiProcessor
+        with self._lock:
+            for key, nbytes in peaks.items():
+                self.peaks[key] = max(self.peaks.get(key, 0), nbytes)
+
+    def clear(self):
+        with self._lock:
+            self.peaks = {}
+
+    @contextmanager
+    def track(self):
+        # bytes of the results of the op calls made in this thread, in call order
+        prev_calls = getattr(self._local, 'calls', None)
+        self._local.calls = []
+        try:
+            yield self._local.calls
+        finally:
+            self._local.calls = prev_calls
+
+def working_set(calls:list[int]) -> int:
+    # an op holds its input and its result together
+    if len(calls) == 0:
+        return 0
+    return max([calls[0]] + [prev + cur for prev, cur in zip(calls, calls[1:])])
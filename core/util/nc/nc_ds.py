@@ -11,7 +11,7 @@ def copy_dimenstions(src_ds:Dataset, target_ds:Dataset):
     return target_ds
 
 
-def copy_nc_ds(src_ds:Dataset, selected_bands:List[AnyStr]=None):
+def copy_nc_ds(src_ds:Dataset, selected_bands:List[AnyStr]=None, close_src:bool=True):
 
     if selected_bands:
         matched_band = selected_bands
@@ -34,7 +34,8 @@ def copy_nc_ds(src_ds:Dataset, selected_bands:List[AnyStr]=None):
         target_ds[name][:] = src_band[:]
 
     target_ds.setncatts(src_ds.__dict__)
-    src_ds.close()
+    if close_src:
+        src_ds.close()
 
     return target_ds
 
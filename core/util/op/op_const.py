@@ -40,6 +40,7 @@ FUNC_OP = 'func'
 
 # etc
 PROJECTION_OP = 'projection'
+ZONAL_STATS_OP = 'zonal_stats'
 
 # etri
 DEM_SLOPE_OP = 'dem_slope'
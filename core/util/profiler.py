@@ -0,0 +1,157 @@
+import os, csv, json, time, threading
+from contextlib import contextmanager
+from typing import Optional
+
+PROFILE_FIELDS = ['proc_name', 'op_name', 'counter', 'depth', 'wall_time', 'cpu_time', 'peak_rss_delta',
+                  'bytes_read', 'bytes_written', 'raster_bytes', 'shape', 'pid']
+RSS_SAMPLE_INTERVAL = 0.01
+
+def _current_rss() -> Optional[int]:
+    # bytes resident now, the high-water mark of getrusage rarely moves after the first scenes so peaks are sampled from it
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return None
+
+def _io_counters() -> tuple[Optional[int], Optional[int]]:
+    # bytes passed to read and write calls of this process, including reads served by the page cache
+    try:
+        with open('/proc/self/io') as f:
+            io = dict(line.split(': ') for line in f.read().splitlines())
+        return int(io['rchar']), int(io['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+def _diff(after, before):
+    if after is None or before is None:
+        return None
+    return after - before
+
+class Profiler:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Profiler, cls).__new__(cls)
+            cls._instance.enabled = False
+            cls._instance.records = []
+            cls._instance._lock = threading.Lock()
+            cls._instance._local = threading.local()
+            cls._instance._watches = []
+            cls._instance._sampler = None
+            cls._instance._stop_sampling = threading.Event()
+        return cls._instance
+
+    @classmethod
+    def get_profiler(cls):
+        return cls()
+
+    def enable(self):
+        self.enabled = True
+        if self._sampler is None or not self._sampler.is_alive():
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(target=self._sample_rss, name='profiler-rss', daemon=True)
+            self._sampler.start()
+
+    def disable(self):
+        self.enabled = False
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def _sample_rss(self):
+        # the resident set is sampled while profiling, so memory allocated and freed inside a call still raises its peak
+        while not self._stop_sampling.wait(RSS_SAMPLE_INTERVAL):
+            self._update_watches()
+
+    def _update_watches(self):
+        rss = _current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            for watch in self._watches:
+                watch['peak'] = max(watch['peak'], rss)
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+
+    def pop_records(self) -> list[dict]:
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def extend(self, records:list[dict]):
+        with self._lock:
+            self.records.extend(records)
+
+    @contextmanager
+    def profile(self, proc_name:str, op_name:str):
+        # the yielded record can be completed by the caller, e.g. with the shape of the result
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+
+        record = {'proc_name': proc_name, 'op_name': op_name, 'counter': None, 'depth': depth, 'shape': None, 'raster_bytes': None, 'pid': os.getpid()}
+        rss_before = _current_rss()
+        # calls running on other threads share the resident set of the process, so their peaks overlap
+        watch = {'peak': rss_before}
+        if rss_before is not None:
+            with self._lock:
+                self._watches.append(watch)
+        read_before, written_before = _io_counters()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+
+        try:
+            yield record
+        finally:
+            record['wall_time'] = time.perf_counter() - wall_before
+            record['cpu_time'] = time.process_time() - cpu_before
+            if rss_before is not None:
+                self._update_watches()
+                with self._lock:
+                    self._watches.remove(watch)
+            record['peak_rss_delta'] = _diff(watch['peak'], rss_before)
+            read_after, written_after = _io_counters()
+            record['bytes_read'] = _diff(read_after, read_before)
+            record['bytes_written'] = _diff(written_after, written_before)
+
+            self._local.depth = depth
+            with self._lock:
+                self.records.append(record)
+
+    def summary(self) -> list[dict]:
+        # totals per processor and op, nested op calls (e.g. write in multi_write) are also counted in their caller
+        summary = {}
+        for record in self.records:
+            key = (record['proc_name'], record['op_name'])
+            if key not in summary:
+                summary[key] = {'proc_name': key[0], 'op_name': key[1], 'calls': 0, 'wall_time': 0., 'cpu_time': 0.,
+                                'peak_rss_delta': 0, 'bytes_read': 0, 'bytes_written': 0, 'raster_bytes': 0}
+            item = summary[key]
+            item['calls'] += 1
+            item['wall_time'] += record['wall_time']
+            item['cpu_time'] += record['cpu_time']
+            item['peak_rss_delta'] = max(item['peak_rss_delta'], record['peak_rss_delta'] or 0)
+            item['bytes_read'] += record['bytes_read'] or 0
+            item['bytes_written'] += record['bytes_written'] or 0
+            item['raster_bytes'] = max(item['raster_bytes'], record.get('raster_bytes') or 0)
+
+        return sorted(summary.values(), key=lambda x: x['wall_time'], reverse=True)
+
+    def write_report(self, out_path_stem:str) -> tuple[str, str]:
+        json_path = f'{out_path_stem}.json'
+        csv_path = f'{out_path_stem}.csv'
+
+        with open(json_path, 'w') as f:
+            json.dump({'summary': self.summary(), 'calls': self.records}, f, indent=2, default=str)
+
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS)
+            writer.writeheader()
+            for record in self.records:
+                writer.writerow({k: record.get(k) for k in PROFILE_FIELDS})
+
+        return json_path, csv_path
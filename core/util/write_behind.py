@@ -0,0 +1,108 @@
+import os, threading
+from typing import Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core.util.logger import Logger
+
+class WriteBehind:
+    """
+    Pool writing finished rasters in the background while the chain goes on.
+
+    A write is keyed by its output path, so a reader of the path can wait for it. At most max_pending writes are
+    queued or running, the next submit blocks until one of them finishes. The first failed write is raised by the
+    next submit, wait or flush. The pool belongs to the process which enabled it, forked workers write in place.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(WriteBehind, cls).__new__(cls)
+            cls._instance._pool = None
+            cls._instance._pid = None
+            cls._instance._slots = None
+            cls._instance._pending = {}
+            cls._instance._errors = []
+            cls._instance._lock = threading.Lock()
+            cls._instance.max_pending = 0
+        return cls._instance
+
+    @classmethod
+    def get_write_behind(cls):
+        return cls()
+
+    @property
+    def active(self) -> bool:
+        return self._pool is not None and self._pid == os.getpid()
+
+    def enable(self, workers:int=2, max_pending:int=4):
+        assert workers > 0, 'workers of the write behind pool should be greater than 0'
+        assert max_pending >= workers, 'max_pending writes should not be less than workers'
+
+        self.shutdown()
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='write_behind')
+        self._pid = os.getpid()
+
+    def _raise_error(self):
+        with self._lock:
+            if len(self._errors) == 0:
+                return
+            error, self._errors = self._errors[0], []
+        raise error
+
+    def _run(self, path:str, func:Callable, *args, **kwargs):
+        # the error is recorded before the future is done, so a waiter always finds it
+        try:
+            return func(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._errors.append(e)
+            Logger.get_logger().log('error', f'(WriteBehind) writing "{path}" failed : {e}')
+            raise
+        finally:
+            self._slots.release()
+
+    def _done(self, path:str, future:Future):
+        with self._lock:
+            if self._pending.get(path) is future:
+                del self._pending[path]
+
+    def submit(self, path:str, func:Callable, *args, **kwargs) -> Future:
+        self._raise_error()
+        # backpressure, the chain waits here when max_pending writes are not finished yet
+        self._slots.acquire()
+        path = os.path.abspath(path)
+        future = self._pool.submit(self._run, path, func, *args, **kwargs)
+        with self._lock:
+            self._pending[path] = future
+        future.add_done_callback(lambda f: self._done(path, f))
+        return future
+
+    def wait(self, path:str):
+        with self._lock:
+            future:Optional[Future] = self._pending.get(os.path.abspath(path))
+        if future is not None:
+            future.exception()
+        self._raise_error()
+
+    def flush(self):
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.exception()
+        self._raise_error()
+
+    def shutdown(self):
+        if self._pool is None:
+            return
+        try:
+            if self.active:
+                self.flush()
+        finally:
+            if self.active:
+                self._pool.shutdown(wait=True)
+            self._pool = None
+            self._pid = None
+            self._pending = {}
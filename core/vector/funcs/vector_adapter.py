@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING
 
 from osgeo import ogr
 from core.base.adapter import BaseAdapter
-from core.util.gdal import read_vector_ds, create_datasource, copy_layer, copy_features
+from core.util.gdal import read_vector_ds, create_datasource, copy_layer, iter_features, write_features
 
 if TYPE_CHECKING:
     from osgeo import Dataset
@@ -20,7 +20,7 @@ class GdalVectorAdapter(BaseAdapter):
         copy_layer(to_datasource, dataset)
         src_layer = dataset.GetLayer()
         to_layer = to_datasource.GetLayer()
-        copy_features(to_layer, src_layer)
+        write_features(to_layer, iter_features(src_layer))
         to_datasource.FlushCache()
         to_datasource = None
         
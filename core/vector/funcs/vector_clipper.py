@@ -8,7 +8,7 @@ if TYPE_CHECKING:
 
 class VectorClipper:
     @staticmethod
-    def clip(vector: Vector, bounds: "Geometry") -> "Vector":
+    def clip(vector: Vector, bounds: "Geometry", workers: int = 1) -> "Vector":
         new_vector = Vector.like(vector)
-        new_vector.raw = clip_vector(vector.raw, bounds, new_vector.raw)
+        new_vector.raw = clip_vector(vector.raw, bounds, new_vector.raw, workers=workers)
         return new_vector
\ No newline at end of file
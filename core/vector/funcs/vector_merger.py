@@ -1,11 +1,11 @@
 from typing import List
 
-from core.util.gdal import copy_features
+from core.util.gdal import WRITE_BATCH_SIZE, create_ds, unify_fields, unify_geom_type, append_vector_ds
 from core.vector.vector import Vector
 
 class VectorMerger:
     @staticmethod
-    def merge(vector_list: List[Vector]) -> Vector:
+    def merge(vector_list: List[Vector], batch_size:int=WRITE_BATCH_SIZE) -> Vector:
         if not vector_list:
             raise ValueError('vector_list is empty')
         
@@ -17,12 +17,14 @@ class VectorMerger:
         for vector in vector_list:
             if vector.handler != handler:
                 raise ValueError('All vectors must have the same handler')
-                
-        merged_vector = Vector.like(vector_list[0])
 
-        for vector in vector_list:
-            from_layer = vector.raw.GetLayer()
-            merged_layer = merged_vector.raw.GetLayer()
-            merged_layer = copy_features(merged_layer, from_layer)
+        # the merged layer is created once with the fields of all vectors, which are then appended by ogr2ogr
+        layers = [vector.raw.GetLayer() for vector in vector_list]
+        ref_srs = layers[0].GetSpatialRef()
+        merged_vector = Vector.create("", vector_list[0].module_type)
+        merged_vector.raw = create_ds(gdal_format="Memory", is_vector=True, field_defs=unify_fields(layers), geom_type=unify_geom_type(layers),
+                                      proj_wkt=ref_srs.ExportToWkt() if ref_srs else None)
+
+        append_vector_ds(merged_vector.raw, [vector.raw for vector in vector_list], batch_size)
         
         return merged_vector
@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, TYPE_CHECKING
+from typing import Dict, List, TYPE_CHECKING, Iterator, Optional, Union
 from osgeo import osr, ogr
 
 
-from core.util.gdal.gdal_vector import get_vector_envelope, create_envelope, get_vector_fields
+from core.util.gdal.gdal_vector import get_vector_envelope, create_envelope, get_vector_fields, iter_feature_pages, \
+    feature_record, FEATURE_PAGE_SIZE
 from core.util.gdal import create_ds, create_datasource
 
 if TYPE_CHECKING:
@@ -18,6 +19,16 @@ class VectorHandler(ABC):
     @abstractmethod
     def get_features(self, raw) -> Dict:
         pass
+
+    @abstractmethod
+    def iter_pages(self, raw, page_size:int, attribute_filter:Optional[str]=None, spatial_filter:Optional["Geometry"]=None,
+                   as_wkb:bool=False, layer_idx:int=0) -> Iterator[list]:
+        pass
+
+    def iter_features(self, raw, page_size:int=FEATURE_PAGE_SIZE, attribute_filter:Optional[str]=None,
+                      spatial_filter:Optional["Geometry"]=None, as_wkb:bool=False, layer_idx:int=0) -> Iterator:
+        for page in self.iter_pages(raw, page_size, attribute_filter, spatial_filter, as_wkb, layer_idx):
+            yield from page
     
     @abstractmethod
     def get_envelope_geom(self, raw) -> "Geometry":
@@ -39,28 +50,28 @@ class VectorHandler(ABC):
 class GdalVectorHandler(VectorHandler):    
 
     def get_features(self, raw) -> Dict:
+        # every feature of every layer with its geometry as wkt, iter_features reads them without holding the layers
         features = {}
         for layer_idx in range(raw.GetLayerCount()):
-            layer = raw.GetLayerByIndex(layer_idx)
-            layer_name = layer.GetName()
-            
+            layer_name = raw.GetLayerByIndex(layer_idx).GetName()
             features[layer_name] = []
-            layer.ResetReading()
-            
-            for feature in layer:
-                feature_dict = {
+
+            for feature in self.iter_features(raw, layer_idx=layer_idx):
+                geom = feature.GetGeometryRef()
+                features[layer_name].append({
                     'id': feature.GetFID(),
-                    'geometry': feature.GetGeometryRef().ExportToWkt(),
-                    'attributes': {}
-                }
-                
-                for i in range(feature.GetFieldCount()):
-                    field_name = feature.GetFieldDefnRef(i).GetName()
-                    feature_dict['attributes'][field_name] = feature.GetField(i)
-                
-                features[layer_name].append(feature_dict)
-                
+                    'geometry': geom.ExportToWkt() if geom is not None else None,
+                    'attributes': feature.items()
+                })
+
         return features
+
+    def iter_pages(self, raw, page_size:int=FEATURE_PAGE_SIZE, attribute_filter:Optional[str]=None,
+                   spatial_filter:Optional["Geometry"]=None, as_wkb:bool=False, layer_idx:int=0) -> Iterator[list[Union["Feature", dict]]]:
+        # ogr features, or records of wkb and attributes, page by page, the filters are evaluated by ogr
+        layer = raw.GetLayerByIndex(layer_idx)
+        for page in iter_feature_pages(layer, page_size, attribute_filter, spatial_filter):
+            yield [feature_record(feature) for feature in page] if as_wkb else page
     
     def bounds(self, raw: "Dataset") -> tuple[float, float, float, float]:
         layer = raw.GetLayerByIndex(0)
@@ -95,6 +106,13 @@ class GdalVectorHandler(VectorHandler):
             fields.append(field_defn.GetName())
         return fields
 
+    def get_feature_count(self, raw:"Dataset") -> int:
+        # counted by the driver, the features are not read
+        return raw.GetLayerByIndex(0).GetFeatureCount()
+
+    def get_layer_names(self, raw:"Dataset") -> List[str]:
+        return [raw.GetLayerByIndex(i).GetName() for i in range(raw.GetLayerCount())]
+
     def empty_raw(self, raw) -> "Dataset":
         
         in_layer = raw.GetLayerByIndex(0)        
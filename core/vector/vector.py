@@ -1,11 +1,13 @@
-from typing import Union, TypeVar, Dict, List, Any, TYPE_CHECKING, Optional
+from typing import Union, TypeVar, Dict, List, Any, TYPE_CHECKING, Optional, Iterator
 from pathlib import Path
 
 from core.base import GeoData
 from core.util import ModuleType
 from core.vector.handler import GdalVectorHandler
+from core.util.gdal.gdal_vector import FEATURE_PAGE_SIZE
 
 if TYPE_CHECKING:
+    from osgeo.ogr import Geometry
     from core.vector.handler import VectorHandler
 
 T = TypeVar('T', bound='Vector')
@@ -62,6 +64,15 @@ class Vector(GeoData):
     @features.setter
     def features(self, features: Dict):
         self._features_data = features
+
+    def iter_features(self, page_size: int = FEATURE_PAGE_SIZE, attribute_filter: Optional[str] = None,
+                      spatial_filter: Optional["Geometry"] = None, as_wkb: bool = False, layer_idx: int = 0) -> Iterator:
+        # features read lazily from the layer, unlike features which holds every feature as wkt
+        return self.handler.iter_features(self.raw, page_size, attribute_filter, spatial_filter, as_wkb, layer_idx)
+
+    def iter_pages(self, page_size: int = FEATURE_PAGE_SIZE, attribute_filter: Optional[str] = None,
+                   spatial_filter: Optional["Geometry"] = None, as_wkb: bool = False, layer_idx: int = 0) -> Iterator[list]:
+        return self.handler.iter_pages(self.raw, page_size, attribute_filter, spatial_filter, as_wkb, layer_idx)
     
     @property
     def geometry_type(self) -> str:        
@@ -4,16 +4,29 @@ from datetime import datetime
 
 from core import SCHEMA_PATH
 from core.config import load_schema_map
-from core.util import read_yaml, Logger, expand_var
+from core.util import read_yaml, Logger, Profiler, MemoryAccount, WriteBehind, expand_var
+from core.util.gdal import WarpPlanCache
 from core.graph import GraphManager
 from core.logic import Context
 from core.logic.processor import ProcessorBuilder
+from core.logic.executor import ResultCache, MemoryBudget
+from core.logic.planner import Planner
 
 def parse_args():
     parser = ArgumentParser(description="main script to preprocesss radar and optical product based on yaml config file")
     parser.add_argument('--config_path', help="yaml based config file path")
     parser.add_argument('--log_dir', default='$ROOT_DIR/OUTPUTDATA', help="log directory path")
     parser.add_argument('--log_level', default='info', help="log level")
+    parser.add_argument('--profile', action='store_true', help="write a per op profiling report(json, csv) next to the log file")
+    parser.add_argument('--branch_workers', type=int, default=0, help="threads running independent branches and end points concurrently, 0 runs them one after another")
+    parser.add_argument('--queue_size', type=int, default=2, help="items a concurrent branch can produce ahead of its consumer")
+    parser.add_argument('--cache_dir', '--cache-dir', help="directory of the op result cache, results of unchanged ops are reused from it")
+    parser.add_argument('--cache_max_gb', type=float, default=50., help="size of the op result cache, least recently used results are removed over it")
+    parser.add_argument('--max_memory', '--max-memory', type=float, help="memory budget in GB of the scenes processed at the same time by multi worker processors")
+    parser.add_argument('--write_workers', type=int, default=0, help="threads writing gdal outputs in the background while the chain goes on, 0 writes in place")
+    parser.add_argument('--max_pending_writes', type=int, default=4, help="background writes queued or running before the chain waits")
+    parser.add_argument('--warp_plans', type=int, default=0, help="warp plans of source grids kept to remap the next scenes on the same grid with nearest resampling, 0 warps every scene with gdal")
+    parser.add_argument('--plan', action='store_true', help="print the estimated shapes, peak memory and time of every op without running them")
     args = parser.parse_args()
     return args
 
@@ -32,15 +45,60 @@ def main(args):
     assert Path(config_path).exists(), f'Config file({config_path}) does not exist'
     schema_map = load_schema_map(SCHEMA_PATH)
 
+    if args.plan:
+        with Context(GraphManager(read_yaml(config_path), schema_map)) as ctx:
+            planner = Planner(ctx)
+            planner.plan()
+            report = planner.report()
+        print(report)
+        Logger.get_logger().log('info', f'Plan of {config_name} :\n{report}')
+        return
+
+    profiler = Profiler.get_profiler()
+    if args.profile:
+        profiler.enable()
+
+    result_cache = None
+    if args.cache_dir:
+        result_cache = ResultCache(expand_var(args.cache_dir), max_size=int(args.cache_max_gb * 1024 ** 3))
+
+    write_behind = WriteBehind.get_write_behind()
+    if args.write_workers > 0:
+        write_behind.enable(workers=args.write_workers, max_pending=args.max_pending_writes)
+
+    warp_plan_cache = WarpPlanCache.get_warp_plan_cache()
+    if args.warp_plans > 0:
+        warp_plan_cache.enable(max_plans=args.warp_plans)
+
     out_path = []
     all_config = read_yaml(config_path)
-    with Context(GraphManager(all_config, schema_map)) as ctx:
-        processor_builder = ProcessorBuilder(ctx)
-        end_points = processor_builder.build()
-        gens = [end_point.execute() for end_point in end_points]
-        for gen in gens:
-            for x in gen:
-                out_path.append(x)
+    try:
+        with Context(GraphManager(all_config, schema_map)) as ctx:
+            memory_budget = MemoryBudget(ctx, max_bytes=int(args.max_memory * 1024 ** 3)) if args.max_memory else None
+            processor_builder = ProcessorBuilder(ctx, result_cache=result_cache, memory_budget=memory_budget)
+            end_points = processor_builder.build()
+            with processor_builder.build_scheduler(workers=args.branch_workers, queue_size=args.queue_size) as scheduler:
+                for x in scheduler.run():
+                    out_path.append(x)
+
+        # outputs still written in the background are flushed, a failed write fails the run
+        write_behind.shutdown()
+    finally:
+        if result_cache is not None:
+            Logger.get_logger().log('info', f'Result cache : {result_cache.hits} results reused, {result_cache.stores} results stored in "{result_cache.cache_dir}"')
+
+        if warp_plan_cache.active:
+            Logger.get_logger().log('info', f'Warp plan cache : {warp_plan_cache.hits} warps reused a plan, {warp_plan_cache.misses} plans computed')
+
+        peaks = sorted(MemoryAccount.get_account().peaks.items(), key=lambda x: x[1], reverse=True)
+        for (proc_name, op_name), nbytes in peaks:
+            Logger.get_logger().log('debug', f'Memory : {proc_name}:{op_name} held at most {nbytes} bytes')
+
+        # the report is also written when the run fails, to see where the time was spent until then
+        if args.profile:
+            profiler.disable()
+            json_path, csv_path = profiler.write_report(str(Path(log_dir) / f'{log_id}_profile'))
+            Logger.get_logger().log('info', f'Profiling report is written to "{json_path}" and "{csv_path}"')
 
 if __name__ == '__main__':
     args = parse_args()
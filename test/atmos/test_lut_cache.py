@@ -0,0 +1,49 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+
+import core.atmos as atmos
+from core.atmos.aerlut import LutCache, make_lut_key, load_cached_lut, store_cached_lut
+
+class TestLutCache(unittest.TestCase):
+
+    def test_lut_key(self):
+        key_1 = make_lut_key('import_luts', sensor='S2A_MSI', base_luts=['MOD1', 'MOD2'], pressures=[500, 1013])
+        key_2 = make_lut_key('import_luts', pressures=[500, 1013], base_luts=['MOD1', 'MOD2'], sensor='S2A_MSI')
+        key_3 = make_lut_key('import_luts', sensor='S2B_MSI', base_luts=['MOD1', 'MOD2'], pressures=[500, 1013])
+        self.assertEqual(key_1, key_2)
+        self.assertNotEqual(key_1, key_3)
+
+    def test_lru_eviction(self):
+        cache = LutCache(max_size=2)
+        load_count = {'n': 0}
+
+        def loader(value):
+            load_count['n'] += 1
+            return value
+
+        cache.get_or_load(('a',), lambda: loader(1))
+        cache.get_or_load(('b',), lambda: loader(2))
+        self.assertEqual(cache.get_or_load(('a',), lambda: loader(3)), 1)
+        cache.get_or_load(('c',), lambda: loader(4))
+
+        self.assertEqual(load_count['n'], 3)
+        self.assertIn(('a',), cache)
+        self.assertNotIn(('b',), cache)
+        self.assertEqual(len(cache), 2)
+
+    def test_disk_cache(self):
+        prev_cache_dir = atmos.config.get('lut_cache_dir', '')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            atmos.config['lut_cache_dir'] = tmp_dir
+            try:
+                lut = np.random.rand(3, 4, 5).astype(np.float32)
+                store_cached_lut('TEST-LUT-0001mb', lut, {'par': ['romix', 'utott', 'dtott']})
+                cached_lut, meta = load_cached_lut('TEST-LUT-0001mb')
+
+                np.testing.assert_array_equal(cached_lut, lut)
+                self.assertEqual(meta['par'], ['romix', 'utott', 'dtott'])
+                self.assertIsNone(load_cached_lut('TEST-LUT-0001mb', sensor='S2A_MSI'))
+            finally:
+                atmos.config['lut_cache_dir'] = prev_cache_dir
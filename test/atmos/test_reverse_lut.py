@@ -0,0 +1,105 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+import scipy.interpolate
+from netCDF4 import Dataset
+
+from core.atmos.aerlut import reverse_lut_band, write_reverse_lut, interp_rows
+
+def _reverse_lut_band_loop(lutd, pid, b, pct=(1, 60), nbins=20):
+    ## reference implementation with the nested loops used before vectorising
+    if len(lutd['dim']) == 7:
+        wind_dim = True
+        pressures, pids, raas, vzas, szas, winds, aots = lutd['dim']
+    else:
+        pressures, pids, raas, vzas, szas, aots = lutd['dim']
+        wind_dim = False
+        winds = np.atleast_1d(2)
+
+    tmp = np.log(lutd['lut'][b][:, pid, :, :, :, :, :].flatten())
+    prc = np.nanpercentile(tmp, pct)
+    h = np.histogram(tmp, bins=nbins, range=prc)
+    rpath_bins = np.exp(h[1])
+
+    dim = [pressures, raas, vzas, szas, winds, rpath_bins]
+    luta = np.zeros([len(d) for d in dim]) + np.nan
+    for pi, pressure in enumerate(pressures):
+        for ri, raa in enumerate(raas):
+            for vi, vza in enumerate(vzas):
+                for si, sza in enumerate(szas):
+                    for wi, wind in enumerate(winds):
+                        if wind_dim:
+                            ret = lutd['rgi'][b]((pressure, pid, raa, vza, sza, wind, aots))
+                        else:
+                            ret = lutd['rgi'][b]((pressure, pid, raa, vza, sza, aots))
+                        luta[pi, ri, vi, si, wi, :] = np.interp(rpath_bins, ret, aots)
+    return dim, luta, aots
+
+class TestReverseLut(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.pressures = np.array([500., 750., 1013., 1100.])
+        self.raas = np.linspace(0, 180, 7)
+        self.vzas = np.linspace(0, 60, 5)
+        self.szas = np.linspace(0, 70, 6)
+        self.winds = np.array([2., 5., 10.])
+        self.aots = np.array([0.001, 0.01, 0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 1., 1.3, 1.6, 2., 3., 5.])
+
+        def make_lutd(with_wind):
+            shape = [len(self.pressures), 2, len(self.raas), len(self.vzas), len(self.szas)]
+            shape += [len(self.winds)] if with_wind else [1]
+            # romix is increasing along aot
+            steps = rng.uniform(0.001, 0.02, size=shape + [len(self.aots)])
+            lut = np.cumsum(steps, axis=-1).astype(np.float32)
+
+            if with_wind:
+                dim = [self.pressures, np.arange(2), self.raas, self.vzas, self.szas, self.winds, self.aots]
+                rgi = scipy.interpolate.RegularGridInterpolator(dim, lut, bounds_error=False, fill_value=None)
+            else:
+                dim = [self.pressures, np.arange(2), self.raas, self.vzas, self.szas, self.aots]
+                rgi = scipy.interpolate.RegularGridInterpolator(dim, lut[:, :, :, :, :, 0, :], bounds_error=False, fill_value=None)
+            return {'dim': dim, 'lut': {'1': lut}, 'rgi': {'1': rgi}}
+
+        self.lutd_wind = make_lutd(True)
+        self.lutd = make_lutd(False)
+
+    def test_interp_rows(self):
+        xp = np.cumsum(np.random.default_rng(1).uniform(0.1, 1, size=(50, 10)), axis=1)
+        fp = np.linspace(0, 1, 10)
+        x = np.concatenate([[-1., np.nan], np.linspace(0, 10, 40), xp[0, [0, 3, 9]]])
+        expected = np.stack([np.interp(x, row, fp) for row in xp])
+        np.testing.assert_array_equal(interp_rows(x, xp, fp), expected)
+
+    def test_reverse_lut_band_same_as_loop(self):
+        for name, lutd in [('with wind', self.lutd_wind), ('without wind', self.lutd)]:
+            with self.subTest(name):
+                dim, luta, aots = reverse_lut_band(lutd, 0, '1')
+                ref_dim, ref_luta, ref_aots = _reverse_lut_band_loop(lutd, 0, '1')
+                for d, ref_d in zip(dim, ref_dim):
+                    np.testing.assert_array_equal(d, ref_d)
+                np.testing.assert_array_equal(luta, ref_luta)
+
+    def test_reverse_lut_netcdf_identical(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            nc_path = os.path.join(tmp_dir, 'vectorised.nc')
+            ref_nc_path = os.path.join(tmp_dir, 'loop.nc')
+            slut = 'ACOLITE-LUT-202110-MOD1-reverse-TEST-romix-1'
+
+            write_reverse_lut(nc_path, slut, 'ACOLITE-LUT-202110-MOD1', *self._dim_luta(reverse_lut_band(self.lutd_wind, 0, '1')))
+            write_reverse_lut(ref_nc_path, slut, 'ACOLITE-LUT-202110-MOD1', *self._dim_luta(_reverse_lut_band_loop(self.lutd_wind, 0, '1')))
+
+            nc, ref_nc = Dataset(nc_path), Dataset(ref_nc_path)
+            try:
+                self.assertEqual(nc.ncattrs(), ref_nc.ncattrs())
+                for attr in nc.ncattrs():
+                    np.testing.assert_array_equal(getattr(nc, attr), getattr(ref_nc, attr))
+                np.testing.assert_array_equal(nc.variables['lut'][:], ref_nc.variables['lut'][:])
+            finally:
+                nc.close()
+                ref_nc.close()
+
+    @staticmethod
+    def _dim_luta(result):
+        dim, luta, aots = result
+        return aots, dim, luta
@@ -0,0 +1,24 @@
+import unittest
+import numpy as np
+
+from core.util import calculate_back_coef, calculate_positive_min
+
+class TestBackCoef(unittest.TestCase):
+    def setUp(self) -> None:
+        self.bands = {
+            'VV': {'value': np.array([[0., 2.], [10., 100.]]), 'no_data': 0},
+            'VH': {'value': np.array([[0., 0.], [0., 0.]]), 'no_data': 0}
+        }
+
+    def test_window_min_values(self):
+        min_values = calculate_positive_min({'VV': self.bands['VV']})
+        bands = calculate_back_coef({'VV': self.bands['VV']}, min_values)
+        np.testing.assert_allclose(bands['VV']['value'], 10 * np.log10([[2., 2.], [10., 100.]]))
+
+    def test_band_without_positive_value(self):
+        min_values = calculate_positive_min(self.bands)
+        self.assertNotIn('VH', min_values)
+        with self.assertRaisesRegex(ValueError, 'VH'):
+            calculate_back_coef(self.bands, min_values)
+        with self.assertRaisesRegex(ValueError, 'VH'):
+            calculate_back_coef({'VH': self.bands['VH']})
@@ -0,0 +1,88 @@
+import unittest
+import numpy as np
+
+from core.util import BandCache
+
+class TestBandCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.arr = np.arange(3 * 4 * 5, dtype=np.float32).reshape(3, 4, 5)
+        self.cache = BandCache.from_array(self.arr, ['b1', 'b2', 'b3'], [0, 0, None])
+
+    def test_from_array_is_view(self):
+        for slot, bname in enumerate(['b1', 'b2', 'b3']):
+            self.assertTrue(np.shares_memory(self.cache[bname]['value'], self.arr))
+            np.testing.assert_array_equal(self.cache[bname]['value'], self.arr[slot])
+        self.assertIsNone(self.cache['b3']['no_data'])
+
+    def test_to_array_without_copy(self):
+        packed = self.cache.to_array()
+        self.assertTrue(np.shares_memory(packed, self.arr))
+        np.testing.assert_array_equal(packed, self.arr)
+
+    def test_reorder_and_pack(self):
+        expected = self.arr[[2, 0]].copy()
+        cache = self.cache.reorder(['b3', 'b1'])
+        packed = cache.to_array()
+        self.assertEqual(list(cache.keys()), ['b3', 'b1'])
+        np.testing.assert_array_equal(packed, expected)
+        np.testing.assert_array_equal(cache['b3']['value'], expected[0])
+        np.testing.assert_array_equal(cache['b1']['value'], expected[1])
+
+    def test_replaced_value_is_packed(self):
+        self.cache['b2'] = {'value': np.ones((4, 5), dtype=np.float32), 'no_data': 0}
+        packed = self.cache.to_array()
+        self.assertTrue(np.shares_memory(packed, self.arr))
+        np.testing.assert_array_equal(packed[1], np.ones((4, 5)))
+        self.assertTrue(np.shares_memory(self.cache['b2']['value'], packed))
+
+    def test_append_and_drop(self):
+        expected = {bname: self.cache[bname]['value'].copy() for bname in ['b1', 'b3']}
+        self.cache.drop('b2')
+        self.cache.append('b4', np.full((4, 5), 7, dtype=np.float32), 0)
+        self.assertTrue(np.shares_memory(self.cache['b4']['value'], self.arr))
+
+        self.cache.append('b5', np.full((4, 5), 9, dtype=np.float32), 0)
+        packed = self.cache.to_array()
+        self.assertEqual(packed.shape, (4, 4, 5))
+        self.assertEqual(list(self.cache.keys()), ['b1', 'b3', 'b4', 'b5'])
+        np.testing.assert_array_equal(packed[0], expected['b1'])
+        np.testing.assert_array_equal(packed[1], expected['b3'])
+        np.testing.assert_array_equal(packed[2], 7)
+        np.testing.assert_array_equal(packed[3], 9)
+
+    def test_dropped_bands_are_released(self):
+        self.cache.drop('b2')
+        packed = self.cache.to_array()
+        self.assertEqual(packed.shape, (2, 4, 5))
+        self.assertIsNone(packed.base)
+        self.assertFalse(np.shares_memory(packed, self.arr))
+        self.assertTrue(np.shares_memory(self.cache['b3']['value'], packed))
+        np.testing.assert_array_equal(packed[1], self.arr[2])
+
+    def test_to_array_with_other_dtype(self):
+        self.cache['b1'] = {'value': np.zeros((4, 5), dtype=np.float64), 'no_data': 0}
+        packed = self.cache.to_array()
+        self.assertEqual(packed.dtype, np.float64)
+        self.assertFalse(np.shares_memory(packed, self.arr))
+        np.testing.assert_array_equal(packed[1:], self.arr[1:])
+
+    def test_wrap_plain_dict(self):
+        cache = BandCache({'b1': {'value': np.ones((2, 2), dtype=np.int16), 'no_data': 0},
+                           'b2': {'value': np.zeros((2, 2), dtype=np.int16), 'no_data': 0}})
+        packed = cache.to_array()
+        self.assertEqual(packed.shape, (2, 2, 2))
+        self.assertTrue(np.shares_memory(cache['b2']['value'], packed))
+
+    def test_copy(self):
+        self.cache['b2'] = {'value': np.full((4, 5), 7, dtype=np.float32), 'no_data': 0}
+        copied = self.cache.copy()
+        self.assertTrue(isinstance(copied, BandCache))
+        self.assertEqual(list(copied.keys()), ['b1', 'b2', 'b3'])
+        for bname in copied:
+            self.assertFalse(np.shares_memory(copied[bname]['value'], self.arr))
+            self.assertFalse(np.shares_memory(copied[bname]['value'], self.cache[bname]['value']))
+            np.testing.assert_array_equal(copied[bname]['value'], self.cache[bname]['value'])
+        self.assertTrue(np.shares_memory(copied['b1']['value'], copied.buffer))
+
+        copied['b1']['value'][:] = -1
+        np.testing.assert_array_equal(self.cache['b1']['value'], self.arr[0])
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+
+from core.util.gdal import create_gcp, get_cached_gcp, geolocation_hash, reproject_arr_using_gcp, reproject_arr_using_geoloc
+
+class TestGdalReproj(unittest.TestCase):
+    def setUp(self) -> None:
+        rows, cols = np.meshgrid(np.arange(60), np.arange(80), indexing='ij')
+        # a slightly rotated swath
+        self.lons = (127. + cols * 0.01 + rows * 0.001).astype(np.float32)
+        self.lats = (37. - rows * 0.01 + cols * 0.001).astype(np.float32)
+        self.arr = (cols * 2 + rows).astype(np.float32)
+
+    def test_create_gcp(self):
+        gcps = create_gcp(self.lons, self.lats, grid_size=20)
+        self.assertEqual(len(gcps), 3 * 4)
+        self.assertEqual([(gcp.GCPPixel, gcp.GCPLine) for gcp in gcps[:5]], [(0, 0), (20, 0), (40, 0), (60, 0), (0, 20)])
+        self.assertAlmostEqual(gcps[5].GCPX, float(self.lons[20, 20]))
+        self.assertAlmostEqual(gcps[5].GCPY, float(self.lats[20, 20]))
+
+        with self.subTest('gcps without a location are dropped'):
+            lons = self.lons.copy()
+            lons[0, 0] = np.nan
+            self.assertEqual(len(create_gcp(lons, self.lats, grid_size=20)), 3 * 4 - 1)
+
+    def test_geolocation_hash(self):
+        self.assertEqual(geolocation_hash(self.lons, self.lats, 20), geolocation_hash(self.lons.copy(), self.lats.copy(), 20))
+        self.assertNotEqual(geolocation_hash(self.lons, self.lats, 20), geolocation_hash(self.lons, self.lats, 10))
+        self.assertNotEqual(geolocation_hash(self.lons, self.lats), geolocation_hash(self.lons + 1e-3, self.lats))
+
+    def test_cached_gcp(self):
+        gcps = get_cached_gcp(self.lons, self.lats, grid_size=20)
+        self.assertIs(get_cached_gcp(self.lons.copy(), self.lats.copy(), grid_size=20), gcps)
+        self.assertIsNot(get_cached_gcp(self.lons, self.lats, grid_size=10), gcps)
+        self.assertEqual([(gcp.GCPX, gcp.GCPY) for gcp in gcps], [(gcp.GCPX, gcp.GCPY) for gcp in create_gcp(self.lons, self.lats, grid_size=20)])
+
+    def test_geolocation_reprojection(self):
+        bounds = dict(min_x=float(self.lons.min()), max_x=float(self.lons.max()), min_y=float(self.lats.min()), max_y=float(self.lats.max()))
+        gcp_ds = reproject_arr_using_gcp(self.arr, create_gcp(self.lons, self.lats, grid_size=10), res=0.01, resampling_method='bilinear', **bounds)
+        geoloc_ds = reproject_arr_using_geoloc(self.arr, self.lons, self.lats, res=0.01, resampling_method='bilinear', **bounds)
+
+        self.assertEqual(geoloc_ds.GetGeoTransform(), gcp_ds.GetGeoTransform())
+        self.assertEqual((geoloc_ds.RasterXSize, geoloc_ds.RasterYSize), (gcp_ds.RasterXSize, gcp_ds.RasterYSize))
+
+        # the swath is linear, so both locate the pixels inside of it at the same place
+        gcp_arr, geoloc_arr = gcp_ds.ReadAsArray(), geoloc_ds.ReadAsArray()
+        inside = (gcp_arr > 0) & (geoloc_arr > 0)
+        self.assertGreater(inside.sum(), 0)
+        self.assertLess(np.abs(gcp_arr[inside] - geoloc_arr[inside]).mean(), 1.)
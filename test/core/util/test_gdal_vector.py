@@ -1,4 +1,13 @@
+import os
 import unittest
+import tempfile
+from osgeo import ogr
+
+from core.util.gdal import create_envelope, clip_vector
+from test.synthetic import make_grid_ds
+
+def _clipped_areas(out_ds) -> dict:
+    return {feat.GetField('cell'): round(feat.GetGeometryRef().Area(), 6) for feat in out_ds.GetLayer()}
 
 class TestGdalVector(unittest.TestCase):
 
@@ -8,3 +17,30 @@ class TestGdalVector(unittest.TestCase):
 
     def test_clip_vector(self):
         pass
+
+    def test_clip_vector_bulk(self):
+        # the clip box covers 4 x 4 cells fully and cuts the cells around them in half
+        clip_geom = create_envelope(2.5, 7.5, 7.5, 7.5, 7.5, 2.5, 2.5, 2.5)
+        in_ds = make_grid_ds()
+        out_ds = make_grid_ds(size=0)
+
+        areas = _clipped_areas(clip_vector(in_ds, clip_geom, out_ds, batch_size=7))
+        self.assertEqual(len(areas), 6 * 6)
+        self.assertEqual(areas[4 * 10 + 4], 1.)
+        self.assertEqual(areas[2 * 10 + 4], 0.5)
+        self.assertEqual(areas[2 * 10 + 2], 0.25)
+        self.assertIsNone(in_ds.GetLayer().GetSpatialFilter())
+
+        with self.subTest('polygons clip by their shape'):
+            triangle = ogr.CreateGeometryFromWkt('POLYGON ((0 0, 10 0, 0 10, 0 0))')
+            areas = _clipped_areas(clip_vector(in_ds, triangle, make_grid_ds(size=0)))
+            self.assertAlmostEqual(sum(areas.values()), 50.)
+            self.assertEqual(areas[0], 1.)
+
+        with self.subTest('strips clipped in parallel give the same features'):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                shp_ds = make_grid_ds('ESRI Shapefile', os.path.join(tmp_dir, 'grid.shp'))
+                shp_ds.FlushCache()
+                parallel_areas = _clipped_areas(clip_vector(shp_ds, clip_geom, make_grid_ds(size=0), workers=3))
+                shp_ds = None
+            self.assertEqual(parallel_areas, _clipped_areas(clip_vector(in_ds, clip_geom, make_grid_ds(size=0))))
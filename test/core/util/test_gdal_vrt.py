@@ -0,0 +1,47 @@
+import unittest
+import numpy as np
+from osgeo import gdal
+
+from core.util.gdal import stack_vrt, mosaic_vrt, select_bands_vrt, warp_vrt, is_vrt_ds, \
+    materialize_ds, merge, mosaic_tiles, ds_to_fileinfos, copy_ds
+from test.synthetic import make_ds
+
+class TestGdalVrt(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.arr1 = rng.integers(1, 100, (2, 10, 10)).astype(np.float32)
+        self.arr2 = rng.integers(1, 100, (3, 10, 10)).astype(np.float32)
+
+    def test_stack_vrt(self):
+        ds_list = [make_ds(self.arr1), make_ds(self.arr2)]
+        vrt_ds = stack_vrt(ds_list)
+        self.assertTrue(is_vrt_ds(vrt_ds))
+        self.assertEqual(vrt_ds.RasterCount, 5)
+        np.testing.assert_array_equal(vrt_ds.ReadAsArray(), merge(ds_list).ReadAsArray())
+
+    def test_select_bands_vrt(self):
+        ds = make_ds(self.arr2)
+        vrt_ds = select_bands_vrt(ds, [3, 1])
+        np.testing.assert_array_equal(vrt_ds.ReadAsArray(), copy_ds(ds, 'MEM', selected_index=[3, 1]).ReadAsArray())
+
+    def test_sources_outlive_references(self):
+        vrt_ds = select_bands_vrt(stack_vrt([make_ds(self.arr1), make_ds(self.arr2)]), [2, 3])
+        np.testing.assert_array_equal(vrt_ds.ReadAsArray(), np.stack([self.arr1[1], self.arr2[0]]))
+
+    def test_mosaic_vrt(self):
+        ds_list = [make_ds(self.arr1, ulx=0.), make_ds(self.arr1 + 1, ulx=50.)]
+        vrt_ds = mosaic_vrt(ds_list)
+        mosaic_ds = mosaic_tiles(ds_to_fileinfos(ds_list))
+        self.assertEqual((vrt_ds.RasterXSize, vrt_ds.RasterYSize), (mosaic_ds.RasterXSize, mosaic_ds.RasterYSize))
+        self.assertEqual(vrt_ds.GetGeoTransform(), mosaic_ds.GetGeoTransform())
+        np.testing.assert_array_equal(vrt_ds.ReadAsArray(), mosaic_ds.ReadAsArray())
+
+    def test_warp_vrt(self):
+        ds = make_ds(self.arr1)
+        warp_params = {'xRes': 20, 'yRes': 20, 'resampleAlg': 'near'}
+        vrt_ds = warp_vrt(ds, warp_params)
+        mem_ds = gdal.Warp('', ds, options=gdal.WarpOptions(format='MEM', **warp_params))
+
+        self.assertTrue(is_vrt_ds(vrt_ds))
+        np.testing.assert_array_equal(materialize_ds(vrt_ds).ReadAsArray(), mem_ds.ReadAsArray())
+        self.assertFalse(is_vrt_ds(materialize_ds(vrt_ds)))
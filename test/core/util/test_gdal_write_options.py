@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from osgeo import gdal
+
+from core.util.gdal import build_tiff_options, get_overview_levels, create_ds_with_arr, copy_ds, COG_PROFILE
+from core.raster.funcs.adapter import GdalRasterAdapter
+
+class TestGdalWriteOptions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        arr = np.arange(2 * 600 * 700, dtype=np.float32).reshape(2, 600, 700)
+        self.src_ds = create_ds_with_arr(arr, gdal_format='MEM', transform=(0, 10, 0, 0, 0, -10))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_defaults_from_dtype(self):
+        float_options = build_tiff_options(gdal.GDT_Float32, compress='deflate', compress_level=6)
+        self.assertIn('PREDICTOR=3', float_options)
+        self.assertIn('ZLEVEL=6', float_options)
+        self.assertIn('TILED=YES', float_options)
+
+        int_options = build_tiff_options(gdal.GDT_UInt16, compress='zstd')
+        self.assertIn('PREDICTOR=2', int_options)
+
+        lerc_options = build_tiff_options(gdal.GDT_Float32, compress='lerc', max_z_error=0.01)
+        self.assertFalse(any(option.startswith('PREDICTOR') for option in lerc_options))
+        self.assertIn('MAX_Z_ERROR=0.01', lerc_options)
+
+    def test_cog_options(self):
+        options = build_tiff_options(gdal.GDT_Float32, profile=COG_PROFILE, compress='deflate', overviews=True)
+        self.assertIn('PREDICTOR=FLOATING_POINT', options)
+        self.assertIn('OVERVIEWS=AUTO', options)
+        self.assertFalse(any(option.startswith('TILED') for option in options))
+
+    def test_overview_levels(self):
+        self.assertEqual(get_overview_levels(2048, 1000, 512), [2, 4])
+        self.assertEqual(get_overview_levels(500, 500, 512), [])
+
+    def test_write_tiled_tif(self):
+        out_path = os.path.join(self.tmp_dir.name, 'tiled.tif')
+        options = build_tiff_options(gdal.GDT_Float32, compress='deflate', block_size=256)
+        GdalRasterAdapter().write_data(self.src_ds, out_path, is_bigtiff=False, compress=True, options=options, overview_levels=[])
+
+        out_ds = gdal.Open(out_path)
+        self.assertEqual(out_ds.GetRasterBand(1).GetBlockSize(), [256, 256])
+        self.assertEqual(out_ds.GetMetadataItem('COMPRESSION', 'IMAGE_STRUCTURE'), 'DEFLATE')
+        self.assertEqual(out_ds.GetRasterBand(1).GetOverviewCount(), 1)
+        np.testing.assert_array_equal(out_ds.ReadAsArray(), self.src_ds.ReadAsArray())
+
+    def test_overviews_compressed_like_base(self):
+        out_path = os.path.join(self.tmp_dir.name, 'zeros.tif')
+        zero_ds = create_ds_with_arr(np.zeros((2, 600, 700), dtype=np.float32), gdal_format='MEM', transform=(0, 10, 0, 0, 0, -10))
+        options = build_tiff_options(gdal.GDT_Float32, compress='deflate', block_size=256)
+        out_ds = GdalRasterAdapter().write_data(zero_ds, out_path, is_bigtiff=False, compress=True, options=options, overview_levels=[2])
+        out_ds = None
+
+        # an uncompressed overview of the level 2 takes 2 * 300 * 350 * 4 bytes
+        self.assertEqual(gdal.Open(out_path).GetRasterBand(1).GetOverviewCount(), 1)
+        self.assertLess(os.path.getsize(out_path), 2 * 300 * 350 * 4 // 10)
+
+    def test_write_cog(self):
+        out_path = os.path.join(self.tmp_dir.name, 'cog.tif')
+        options = build_tiff_options(gdal.GDT_Float32, profile=COG_PROFILE, compress='deflate', block_size=256, overviews=True)
+        GdalRasterAdapter().write_data(self.src_ds, out_path, is_bigtiff=False, compress=True, options=options, profile=COG_PROFILE)
+
+        out_ds = gdal.Open(out_path)
+        self.assertEqual(out_ds.GetMetadataItem('LAYOUT', 'IMAGE_STRUCTURE'), 'COG')
+        np.testing.assert_array_equal(out_ds.ReadAsArray(), copy_ds(self.src_ds, 'MEM').ReadAsArray())
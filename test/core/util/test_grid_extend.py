@@ -0,0 +1,62 @@
+import unittest
+import numpy as np
+
+from core.util import grid_extend, grid_extend_batch
+
+def _grid_extend_loop(data, ex=2, ey=2, iterations=1, crop=True):
+    # reference implementation walking every cell
+    out_shape = data.shape[0]+ey, data.shape[1]+ex
+    for it in range(iterations):
+        if it == 0:
+            tmp_src = np.zeros(out_shape)+np.nan
+            tmp_src[1:-1,1:-1]=data*1
+            tmp_tar = np.zeros(out_shape)+tmp_src
+        else:
+            tmp_src = tmp_tar*1
+
+        for axis in (0, 1):
+            n = tmp_src.shape[axis]
+            for i in range(tmp_src.shape[0]):
+                for j in range(tmp_src.shape[1]):
+                    if np.isfinite(tmp_tar[i,j]): continue
+                    k = i if axis == 0 else j
+                    line = tmp_src[:, j] if axis == 0 else tmp_src[i, :]
+                    if k < 2:
+                        s = line[k:k+3]
+                    elif k < n-2:
+                        s = line[k-2:k+3]
+                    else:
+                        s = line[k-2:k+1]
+                    if len(np.where(np.isfinite(s))[0]) == 2:
+                        tmp_tar[i,j] = s[-2]-(s[-1]-s[-2]) if np.isnan(s[0]) else s[1]+(s[1]-s[0])
+
+    if crop: tmp_tar = tmp_tar[1:-1,1:-1]
+    return tmp_tar
+
+class TestGridExtend(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.grids = []
+        for _ in range(50):
+            h, w = rng.integers(1, 12, 2)
+            grid = rng.normal(size=(h, w))
+            grid[rng.random((h, w)) < rng.random()] = np.nan
+            self.grids.append(grid)
+
+        # detector footprint grids are finite only in a part of the 23x23 grid
+        self.footprint_grids = rng.normal(size=(13, 23, 23))
+        self.footprint_grids[:, :6] = np.nan
+        self.footprint_grids[:, :, -5:] = np.nan
+
+    def test_grid_extend(self):
+        for grid in self.grids:
+            for iterations in (1, 2):
+                for crop in (True, False):
+                    np.testing.assert_array_equal(grid_extend(grid, iterations=iterations, crop=crop),
+                                                  _grid_extend_loop(grid, iterations=iterations, crop=crop))
+
+    def test_grid_extend_batch(self):
+        extended = grid_extend_batch(self.footprint_grids, iterations=1, crop=False)
+        self.assertEqual(extended.shape, (13, 25, 25))
+        for grid, ext_grid in zip(self.footprint_grids, extended):
+            np.testing.assert_array_equal(ext_grid, _grid_extend_loop(grid, iterations=1, crop=False))
@@ -0,0 +1,84 @@
+import os
+import csv
+import json
+import time
+import tempfile
+import unittest
+
+from core.util import Profiler, RSS_SAMPLE_INTERVAL
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.profiler = Profiler.get_profiler()
+        self.profiler.clear()
+        self.profiler.enable()
+
+    def tearDown(self) -> None:
+        self.profiler.disable()
+        self.profiler.clear()
+
+    def test_singleton(self):
+        self.assertIs(Profiler.get_profiler(), self.profiler)
+
+    def test_nested_profile(self):
+        with self.profiler.profile('proc1', 'multi_write') as outer:
+            for _ in range(2):
+                with self.profiler.profile('proc1', 'write') as inner:
+                    inner['shape'] = (3, 10, 10)
+                    sum(range(10000))
+
+        records = self.profiler.records
+        self.assertEqual([r['op_name'] for r in records], ['write', 'write', 'multi_write'])
+        self.assertEqual([r['depth'] for r in records], [1, 1, 0])
+        self.assertEqual(records[0]['shape'], (3, 10, 10))
+        self.assertGreaterEqual(outer['wall_time'], records[0]['wall_time'] + records[1]['wall_time'])
+
+        summary = {s['op_name']: s for s in self.profiler.summary()}
+        self.assertEqual(summary['write']['calls'], 2)
+        self.assertEqual(summary['multi_write']['calls'], 1)
+
+    def test_peak_rss_delta(self):
+        if not os.path.exists('/proc/self/statm'):
+            self.skipTest('current rss is read from /proc')
+        with self.profiler.profile('proc1', 'read'):
+            held = b'\x01' * (64 << 20)
+        self.assertGreater(self.profiler.records[0]['peak_rss_delta'], 32 << 20)
+        del held
+
+        # memory freed before the end of the call is still counted by the sampler
+        with self.profiler.profile('proc1', 'filter'):
+            temp = b'\x01' * (64 << 20)
+            time.sleep(RSS_SAMPLE_INTERVAL * 10)
+            del temp
+        self.assertGreater(self.profiler.records[1]['peak_rss_delta'], 32 << 20)
+
+    def test_worker_starts_without_parent_records(self):
+        from core.logic.processor.multi_processor import _init_worker
+        with self.profiler.profile('parent', 'read'):
+            pass
+        _init_worker(None)
+        self.assertEqual(self.profiler.pop_records(), [])
+
+    def test_record_on_failure(self):
+        with self.assertRaises(ValueError):
+            with self.profiler.profile('proc1', 'read'):
+                raise ValueError('failed')
+        self.assertEqual(len(self.profiler.records), 1)
+        self.assertIn('wall_time', self.profiler.records[0])
+
+    def test_write_report(self):
+        with self.profiler.profile('proc1', 'read'):
+            pass
+        with self.profiler.profile('proc2', 'write'):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            json_path, csv_path = self.profiler.write_report(os.path.join(tmp_dir, 'run_profile'))
+            with open(json_path) as f:
+                report = json.load(f)
+            with open(csv_path) as f:
+                rows = list(csv.DictReader(f))
+
+        self.assertEqual(len(report['calls']), 2)
+        self.assertEqual({(s['proc_name'], s['op_name']) for s in report['summary']}, {('proc1', 'read'), ('proc2', 'write')})
+        self.assertEqual([row['proc_name'] for row in rows], ['proc1', 'proc2'])
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from osgeo import gdal
+
+from core.util.gdal import WarpPlan, WarpPlanCache, warp_gdal
+from core.util.gdal import warp_plan
+from test.synthetic import make_ds
+
+class TestWarpPlan(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.arr = rng.integers(1, 1000, (2, 100, 120)).astype(np.uint16)
+        self.plan_cache = WarpPlanCache.get_warp_plan_cache()
+
+    def tearDown(self) -> None:
+        self.plan_cache.disable()
+
+    def _assert_parity(self, warp_params:dict, min_equal_ratio:float):
+        ds = make_ds(self.arr)
+        plan_ds = WarpPlan.from_warp(ds, warp_params).remap(ds)
+        gdal_ds = gdal.Warp('', ds, options=gdal.WarpOptions(format='MEM', **warp_params))
+
+        self.assertEqual((plan_ds.RasterXSize, plan_ds.RasterYSize), (gdal_ds.RasterXSize, gdal_ds.RasterYSize))
+        np.testing.assert_allclose(plan_ds.GetGeoTransform(), gdal_ds.GetGeoTransform())
+        self.assertEqual(plan_ds.GetRasterBand(1).GetNoDataValue(), gdal_ds.GetRasterBand(1).GetNoDataValue())
+        equal_ratio = np.mean(plan_ds.ReadAsArray() == gdal_ds.ReadAsArray())
+        self.assertGreaterEqual(equal_ratio, min_equal_ratio)
+
+    def test_resample_parity(self):
+        self._assert_parity({'xRes': 15, 'yRes': 15, 'resampleAlg': 'near'}, 1.)
+
+    def test_reprojection_parity(self):
+        # pixel centers near the edge of a source pixel can be taken from its neighbour by the approximate transformer
+        self._assert_parity({'dstSRS': 'EPSG:4326', 'resampleAlg': 'near'}, 0.99)
+
+    def test_block_remap_parity(self):
+        # blocks of a few rows read only the source window under them
+        block_pixels = warp_plan.REMAP_BLOCK_PIXELS
+        warp_plan.REMAP_BLOCK_PIXELS = 200
+        try:
+            self._assert_parity({'dstSRS': 'EPSG:4326', 'resampleAlg': 'near'}, 0.99)
+        finally:
+            warp_plan.REMAP_BLOCK_PIXELS = block_pixels
+
+    def test_plan_cache(self):
+        snap_params = {'pixelSizeX': 20, 'pixelSizeY': 20, 'resamplingName': 'nearest'}
+
+        with self.subTest('disabled cache warps with gdal'):
+            warped_ds = warp_gdal(make_ds(self.arr), snap_params)
+            self.assertEqual(warped_ds.GetDriver().ShortName, 'VRT')
+
+        self.plan_cache.enable(max_plans=1)
+        with self.subTest('scenes on the same grid share a plan'):
+            first_ds = warp_gdal(make_ds(self.arr), snap_params)
+            second_ds = warp_gdal(make_ds(self.arr[::-1]), snap_params)
+            self.assertEqual((self.plan_cache.hits, self.plan_cache.misses), (1, 1))
+            self.assertEqual(second_ds.GetDriver().ShortName, 'MEM')
+            np.testing.assert_array_equal(first_ds.ReadAsArray()[::-1], second_ds.ReadAsArray())
+
+        with self.subTest('the least recently used plan is dropped'):
+            warp_gdal(make_ds(self.arr, ulx=310000.), snap_params)
+            warp_gdal(make_ds(self.arr), snap_params)
+            self.assertEqual((self.plan_cache.hits, self.plan_cache.misses), (1, 3))
+
+        with self.subTest('other resamplings are warped by gdal'):
+            warped_ds = warp_gdal(make_ds(self.arr), {'pixelSizeX': 20, 'pixelSizeY': 20, 'resamplingName': 'bilinear'})
+            self.assertEqual(warped_ds.GetDriver().ShortName, 'VRT')
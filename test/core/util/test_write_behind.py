@@ -0,0 +1,51 @@
+import time
+import threading
+import unittest
+
+from core.util import WriteBehind
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self) -> None:
+        self.write_behind = WriteBehind.get_write_behind()
+        self.write_behind.enable(workers=1, max_pending=2)
+
+    def tearDown(self) -> None:
+        try:
+            self.write_behind.shutdown()
+        except RuntimeError:
+            pass
+
+    def test_backpressure_and_flush(self):
+        release = threading.Event()
+        written = []
+
+        def write(path):
+            release.wait(timeout=5)
+            written.append(path)
+
+        self.write_behind.submit('a.tif', write, 'a.tif')
+        self.write_behind.submit('b.tif', write, 'b.tif')
+
+        # the third write waits until one of the two pending writes is done
+        submitted = threading.Event()
+        submitter = threading.Thread(target=lambda: (self.write_behind.submit('c.tif', write, 'c.tif'), submitted.set()))
+        submitter.start()
+        time.sleep(0.1)
+        self.assertFalse(submitted.is_set())
+
+        release.set()
+        submitter.join(timeout=5)
+        self.write_behind.flush()
+        self.assertEqual(written, ['a.tif', 'b.tif', 'c.tif'])
+
+    def test_wait_and_error(self):
+        def fail():
+            time.sleep(0.05)
+            raise RuntimeError('disk full')
+
+        self.write_behind.submit('failed.tif', fail)
+        with self.assertRaises(RuntimeError):
+            self.write_behind.wait('failed.tif')
+
+        # the error is raised once
+        self.write_behind.flush()
@@ -0,0 +1,61 @@
+import unittest
+from osgeo import ogr
+
+from core.util import ModuleType
+from core.util.gdal import create_envelope
+from core.vector import Vector
+from core.vector.funcs import VectorMerger
+from test.synthetic import make_grid_ds
+
+def _make_grid_vector(size:int=10, fields:dict=None) -> Vector:
+    vector = Vector.create('', ModuleType.GDAL)
+    vector.raw = make_grid_ds(size=size, fields=fields)
+    return vector
+
+class TestVectorFeatures(unittest.TestCase):
+    def setUp(self) -> None:
+        self.vector = _make_grid_vector()
+
+    def test_iter_pages(self):
+        pages = list(self.vector.iter_pages(page_size=30))
+        self.assertEqual([len(page) for page in pages], [30, 30, 30, 10])
+        self.assertEqual([feat.GetField('cell') for page in pages for feat in page], list(range(100)))
+
+    def test_filters(self):
+        with self.subTest('attribute filter'):
+            cells = [feat.GetField('cell') for feat in self.vector.iter_features(attribute_filter='cell < 5')]
+            self.assertEqual(cells, [0, 1, 2, 3, 4])
+
+        with self.subTest('spatial filter'):
+            box = create_envelope(0.2, 1.8, 1.8, 1.8, 1.8, 0.2, 0.2, 0.2)
+            cells = sorted([feat.GetField('cell') for feat in self.vector.iter_features(spatial_filter=box)])
+            self.assertEqual(cells, [0, 1, 10, 11])
+
+        with self.subTest('filters are removed after the iteration'):
+            layer = self.vector.raw.GetLayer()
+            self.assertIsNone(layer.GetSpatialFilter())
+            self.assertEqual(layer.GetFeatureCount(), 100)
+
+    def test_wkb_records(self):
+        record = next(iter(self.vector.iter_features(as_wkb=True, attribute_filter='cell = 42')))
+        self.assertEqual(record['attributes'], {'cell': 42})
+        self.assertAlmostEqual(ogr.CreateGeometryFromWkb(record['wkb']).Area(), 1.)
+        self.assertEqual(len(self.vector.features['layer0']), 100)
+
+    def test_merge_streamed(self):
+        merged = VectorMerger.merge([self.vector, _make_grid_vector(size=3)])
+        self.assertEqual(len(merged), 100 + 9)
+
+    def test_merge_unified_fields(self):
+        other = _make_grid_vector(size=3, fields={'cell': ogr.OFTReal, 'name': ogr.OFTString})
+        merged = VectorMerger.merge([self.vector, other], batch_size=7)
+        layer = merged.raw.GetLayer()
+        defn = layer.GetLayerDefn()
+
+        self.assertEqual([defn.GetFieldDefn(i).GetName() for i in range(defn.GetFieldCount())], ['cell', 'name'])
+        self.assertEqual(defn.GetFieldDefn(0).GetType(), ogr.OFTReal)
+        self.assertEqual(layer.GetFeatureCount(), 100 + 9)
+
+        names = [feat.GetField('name') for feat in merged.iter_features()]
+        self.assertEqual(names[:100], [None] * 100)
+        self.assertEqual(names[100:], [str(i) for i in range(9)])
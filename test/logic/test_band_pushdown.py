@@ -0,0 +1,60 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+
+from core import SCHEMA_PATH
+from core.config import load_schema_map
+from core.graph import GraphManager
+from core.util import expand_var
+from core.raster import ModuleType
+from core.raster.funcs.reader import ReaderFactory
+from core.logic import Context
+from core.logic.op import ops_needed_bands
+from core.logic.processor import ProcessorBuilder
+from core.operations import Read, Select, Write, Split, MinMax_Clip
+from core.operations.cached import BandMath
+
+class TestBandPushdown(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tif_src_1 = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test', 'tif', 's1', 'gdal', 'src_1'))
+
+    def test_ops_needed_bands(self):
+        with self.subTest('bands of band math and write'):
+            ops = [
+                MinMax_Clip(min_val=0, max_val=1, min_clip_val=0, max_clip_val=1),
+                BandMath(func_name='sort_by_name', func_target_bands=['B4', 'B8'], out_band_name='ndvi'),
+                Write(out_dir='.', bands=['ndvi', 'B2'])
+            ]
+            self.assertEqual(sorted(ops_needed_bands(ops)), ['B2', 'B4', 'B8'])
+
+        with self.subTest('select and split'):
+            self.assertEqual(ops_needed_bands([Select(bands=['B2', 'B3']), Write(out_dir='.')]), ['B2', 'B3'])
+            self.assertEqual(sorted(ops_needed_bands([Split(bands=[['B2'], ['B3', 'B2']])])), ['B2', 'B3'])
+
+        with self.subTest('indices and unknown needs keep all bands'):
+            self.assertIsNone(ops_needed_bands([Select(bands=[1, 2])]))
+            self.assertIsNone(ops_needed_bands([BandMath(func_name='sort_by_name', func_target_bands=['B4']), Write(out_dir='.')]))
+            self.assertIsNone(ops_needed_bands([Write(out_dir='.')]))
+
+    def test_read_needed_bands(self):
+        file_path = str(sorted(Path(self.tif_src_1).glob('*.tif'))[0])
+        band_name = ReaderFactory.get_reader(file_path, ModuleType.GDAL).read(file_path=file_path).get_band_names()[0]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = {
+                'read': {'input': {'path': self.tif_src_1, 'pattern': '*.tif'}, 'operations': ['read'], 'read': {'module': 'gdal'}},
+                'selected': {'input': {'path': ['{{read}}']}, 'operations': ['select', 'write'], 'select': {'bands': [band_name]},
+                           'write': {'out_dir': tmp_dir, 'out_stem': 'selected', 'out_ext': 'tif'}}
+            }
+            with Context(GraphManager(config, load_schema_map(SCHEMA_PATH))) as ctx:
+                end_points = ProcessorBuilder(ctx).build()
+                read_op = end_points[0].proc_list[0].ops[0]
+                self.assertEqual(read_op._selected_bands_or_indices, [band_name])
+
+                results = list(end_points[0].execute())
+
+            self.assertEqual(len(results), len(list(Path(self.tif_src_1).glob('*.tif'))))
+            for out_path in results:
+                raster = ReaderFactory.get_reader(out_path, ModuleType.GDAL).read(file_path=out_path)
+                self.assertEqual(raster.get_band_names(), [band_name])
@@ -0,0 +1,66 @@
+import os
+import unittest
+import tempfile
+import threading
+from pathlib import Path
+
+from core import SCHEMA_PATH
+from core.config import load_schema_map, expand_var
+from core.graph import GraphManager
+from core.logic import Context
+from core.logic.executor import Branch
+from core.logic.processor import ProcessorBuilder
+
+class TestGraphScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.schema_map = load_schema_map(SCHEMA_PATH)
+        self.tif_src_1 = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test', 'tif', 's1', 'gdal', 'src_1'))
+        self.file_size = len(list(Path(self.tif_src_1).glob('*.tif')))
+
+    def _diamond_config(self, out_dir:str) -> dict:
+        # read -> (select_1, select_2) -> stack, and read_2 as an independent end point
+        return {
+            'read': {'input': {'path': self.tif_src_1, 'pattern': '*.tif'}, 'operations': ['read'], 'read': {'module': 'gdal'}},
+            'select_1': {'input': {'path': ['{{read}}']}, 'operations': ['select'], 'select': {'bands': [1]}},
+            'select_2': {'input': {'path': ['{{read}}']}, 'operations': ['select'], 'select': {'bands': [1]}},
+            'stack': {'input': {'path': ['{{select_1}}', '{{select_2}}']}, 'operations': ['stack', 'write'],
+                      'write': {'out_dir': out_dir, 'out_stem': 'stacked', 'out_ext': 'tif'}},
+            'read_2': {'input': {'path': self.tif_src_1, 'pattern': '*.tif'}, 'operations': ['read', 'write'], 'read': {'module': 'gdal'},
+                       'write': {'out_dir': out_dir, 'out_stem': 'copied', 'out_ext': 'tif'}}
+        }
+
+    def _run(self, out_dir:str, workers:int) -> list:
+        with Context(GraphManager(self._diamond_config(out_dir), self.schema_map)) as ctx:
+            processor_builder = ProcessorBuilder(ctx)
+            processor_builder.build()
+            with processor_builder.build_scheduler(workers=workers, queue_size=1) as scheduler:
+                return list(scheduler.run())
+
+    def test_same_results_as_sequential(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            seq_out = self._run(os.path.join(tmp_dir, 'seq'), workers=0)
+            con_out = self._run(os.path.join(tmp_dir, 'con'), workers=4)
+
+            self.assertEqual(len(seq_out), self.file_size * 2)
+            self.assertEqual(sorted([Path(p).name for p in seq_out]), sorted([Path(p).name for p in con_out]))
+            for out_path in con_out:
+                self.assertTrue(Path(out_path).exists())
+
+    def test_branch_backpressure(self):
+        branch = Branch(queue_size=2)
+        produced = []
+
+        def produce():
+            for i in range(10):
+                if not branch.put(i):
+                    break
+                produced.append(i)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        self.assertEqual(next(branch), 0)
+        branch.close()
+        producer.join(timeout=5)
+
+        self.assertFalse(producer.is_alive())
+        self.assertLessEqual(len(produced), 4)
@@ -0,0 +1,129 @@
+import os
+import pickle
+import unittest
+import tempfile
+import numpy as np
+from pathlib import Path
+from osgeo import gdal
+
+from core import SCHEMA_PATH
+from core.config import load_schema_map
+from core.graph import GraphManager
+from core.util import expand_var, MemoryAccount, working_set
+from core.util.gdal import create_ds_with_arr
+from core.raster import Raster
+from core.raster.funcs import raster_nbytes, read_band_from_raw
+from core.logic import Context
+from core.logic.executor import ProcessingExecutor, MemoryBudget
+from core.logic.processor import FileProcessor, MultiProcessor, ProcessorBuilder
+from core.operations import Read, Write, GCPReproject
+
+class TestMultiProcessor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tif_src_1 = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test', 'tif', 's1', 'gdal', 'src_1'))
+
+    def test_multi_processor_preprocess_order(self):
+        f_processor = FileProcessor(proc_name="processor_1", path=[self.tif_src_1], pattern='*.tif')
+        m_processor = MultiProcessor(proc_name="processor_1", path=[self.tif_src_1], pattern='*.tif', workers=2)
+        self.assertEqual(list(f_processor.preprocess()), list(m_processor.collect_file_paths()))
+
+    def test_multi_processor_same_result(self):
+        executor = ProcessingExecutor(Context(None))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            f_processor = FileProcessor(proc_name="processor_1", path=[self.tif_src_1], pattern='*.tif').add_op(Read(module='gdal'))
+            m_processor = MultiProcessor(proc_name="processor_1", path=[self.tif_src_1], pattern='*.tif', workers=2, max_pending=2) \
+                .add_op(Read(module='gdal')) \
+                .add_op(Write(out_dir=tmp_dir, out_stem='out'))
+            f_processor.set_executor(executor)
+            m_processor.set_executor(executor)
+
+            with self.subTest('results are returned in file order'):
+                f_results = list(f_processor.execute())
+                m_results = list(m_processor.execute())
+                self.assertEqual(len(f_results), len(m_results))
+                for i, (f_raster, out_path) in enumerate(zip(f_results, m_results)):
+                    self.assertTrue(isinstance(f_raster, Raster))
+                    self.assertEqual(Path(out_path).name, f'out.{i}.tif')
+                    self.assertTrue(Path(out_path).exists())
+
+            with self.subTest('write counters are advanced in parent'):
+                self.assertEqual(m_processor.ops[-1].counter, len(m_results))
+
+    def test_multi_processor_pickled_for_workers(self):
+        # workers are started by the forkserver, so the processor is sent to them
+        executor = ProcessingExecutor(Context(None))
+        m_processor = MultiProcessor(proc_name="processor_1", path=[self.tif_src_1], pattern='*.tif', workers=2) \
+            .add_op(Read(module='gdal')) \
+            .add_op(Write(out_dir='.', out_stem='out'))
+        m_processor.set_executor(executor)
+
+        worker_processor = pickle.loads(pickle.dumps(m_processor))
+        self.assertIsNone(worker_processor.executor)
+        self.assertEqual([op.op_name for op in worker_processor.ops], [op.op_name for op in m_processor.ops])
+        self.assertIs(m_processor.executor, executor)
+
+    def test_gcp_reproject_in_workers(self):
+        # gcps of the workers are cached in their process, the context sent back holds no swig objects
+        rows, cols = np.meshgrid(np.arange(60), np.arange(80), indexing='ij')
+        lats = 37. - rows * 0.01 + cols * 0.001
+        lngs = 127. + cols * 0.01 + rows * 0.001
+        executor = ProcessingExecutor(Context(None))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            in_dir = os.path.join(tmp_dir, 'in')
+            os.makedirs(in_dir)
+            for i in range(3):
+                arr = np.stack([lats, lngs, cols * 2 + rows + i]).astype(np.float32)
+                gdal.GetDriverByName('GTiff').CreateCopy(os.path.join(in_dir, f'swath_{i}.tif'), create_ds_with_arr(arr, gdal_format='MEM'))
+
+            m_processor = MultiProcessor(proc_name='processor_1', path=[in_dir], pattern='*.tif', workers=2) \
+                .add_op(Read(module='gdal')) \
+                .add_op(GCPReproject(lat_band='band_1', lng_band='band_2', pixel_size=0.01, bands=['band_3'], method='gcp', gcp_grid_size=10)) \
+                .add_op(Write(out_dir=tmp_dir, out_stem='out'))
+            m_processor.set_executor(executor)
+
+            out_paths = list(m_processor.execute())
+            self.assertEqual(len(out_paths), 3)
+            for out_path in out_paths:
+                self.assertEqual(gdal.Open(out_path).RasterCount, 1)
+            self.assertFalse(any(key.startswith('gcp_') for key in executor.context.cache))
+
+    def test_multi_processor_fail(self):
+        with self.assertRaises(AssertionError):
+            MultiProcessor(proc_name="processor_1", path=[self.tif_src_1], workers=4, max_pending=2)
+
+    def test_memory_budget(self):
+        with self.subTest('scenes over the budget wait for the ones in flight'):
+            budget = MemoryBudget(Context(None), max_bytes=100)
+            self.assertEqual(budget.try_acquire(60), 60)
+            self.assertIsNone(budget.try_acquire(60))
+            self.assertEqual(budget.try_acquire(200, force=True), 100)
+            budget.release(60)
+            budget.release(100)
+            self.assertEqual(budget.in_use, 0)
+            self.assertEqual(working_set([10, 30, 5]), 40)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = {
+                'multi': {'input': {'path': self.tif_src_1, 'pattern': '*.tif', 'workers': 2}, 'operations': ['read', 'write'],
+                          'read': {'module': 'gdal'}, 'write': {'out_dir': tmp_dir, 'out_stem': 'out', 'out_ext': 'tif'}}
+            }
+            with Context(GraphManager(config, load_schema_map(SCHEMA_PATH))) as ctx:
+                # a budget smaller than one scene runs the scenes one at a time
+                budget = MemoryBudget(ctx, max_bytes=1)
+                processor_builder = ProcessorBuilder(ctx, memory_budget=budget)
+                end_points = processor_builder.build()
+                results = list(end_points[0].execute())
+
+                file_path = sorted(Path(self.tif_src_1).glob('*.tif'))[0]
+                self.assertGreater(budget._chain_peak('multi', str(file_path)), 0)
+
+            self.assertEqual(len(results), len(list(Path(self.tif_src_1).glob('*.tif'))))
+            self.assertEqual(budget.in_use, 0)
+            self.assertIn(('multi', 'read'), MemoryAccount.get_account().peaks)
+
+        with self.subTest('cached bands are counted once'):
+            raster = Read(module='gdal')(str(file_path), Context(None))
+            raster.bands = None
+            self.assertEqual(raster_nbytes(raster), 0)
+            read_band_from_raw(raster)
+            self.assertEqual(raster_nbytes(raster), sum([band['value'].nbytes for band in raster.bands.values()]))
@@ -0,0 +1,61 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+
+from core import SCHEMA_PATH
+from core.config import load_schema_map, expand_var
+from core.graph import GraphManager
+from core.logic import Context
+from core.logic.planner import Planner, PlanShape, apply_shape_rule, read_input_shape
+
+class TestPlanner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.schema_map = load_schema_map(SCHEMA_PATH)
+        self.tif_src_1 = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test', 'tif', 's1', 'gdal', 'src_1'))
+        self.file_size = len(list(Path(self.tif_src_1).glob('*.tif')))
+
+    def test_shape_rules(self):
+        shape = PlanShape(width=100, height=50, bands=4, dtype='uint16', transform=(0., 10., 0., 500., 0., -10.))
+
+        with self.subTest('select and split'):
+            self.assertEqual(apply_shape_rule('select', shape, {'bands': [1, 2]}).bands, 2)
+            self.assertEqual(len(apply_shape_rule('split', shape, {})), 4)
+
+        with self.subTest('stack sums the selected bands'):
+            stacked = apply_shape_rule('stack', [shape, shape], {'bands_list': [[1], None]})
+            self.assertEqual(stacked.bands, 5)
+            self.assertEqual(stacked.nbytes, 100 * 50 * 5 * 2)
+
+        with self.subTest('resample with the pixel size'):
+            resampled = apply_shape_rule('resample', shape, {'pixel_size': 20})
+            self.assertEqual((resampled.width, resampled.height), (50, 25))
+
+        with self.subTest('ops without a rule keep the shape'):
+            self.assertEqual(apply_shape_rule('convert', shape, {}), shape)
+
+    def test_plan(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config = {
+                'read': {'input': {'path': self.tif_src_1, 'pattern': '*.tif'}, 'operations': ['read'], 'read': {'module': 'gdal'}},
+                'select_1': {'input': {'path': ['{{read}}']}, 'operations': ['select'], 'select': {'bands': [1]}},
+                'select_2': {'input': {'path': ['{{read}}']}, 'operations': ['select'], 'select': {'bands': [1]}},
+                'stack': {'input': {'path': ['{{select_1}}', '{{select_2}}']}, 'operations': ['stack', 'write'],
+                          'write': {'out_dir': tmp_dir, 'out_stem': 'stacked', 'out_ext': 'tif'}}
+            }
+            with Context(GraphManager(config, self.schema_map)) as ctx:
+                planner = Planner(ctx, sec_per_byte=1e-9)
+                op_plans = planner.plan()
+                report = planner.report()
+
+            # nothing is written by a dry run
+            self.assertEqual(len(list(Path(tmp_dir).iterdir())), 0)
+
+        first_shape = read_input_shape(str(sorted(Path(self.tif_src_1).glob('*.tif'))[0]))
+        self.assertEqual([op_plan.op_name for op_plan in op_plans], ['read', 'select', 'select', 'stack', 'write'])
+        self.assertTrue(all([op_plan.item_count == self.file_size for op_plan in op_plans]))
+        self.assertEqual(op_plans[1].out_shapes.bands, 1)
+        self.assertEqual(op_plans[3].out_shapes.bands, 2)
+        self.assertEqual(op_plans[3].out_shapes.width, first_shape.width)
+        self.assertGreater(op_plans[0].peak_bytes, 0)
+        self.assertIn('estimated peak', report)
@@ -3,14 +3,18 @@ import unittest
 from functools import partial
 from pathlib import Path
 
+import numpy as np
+from osgeo import gdal
+
 from core.util import expand_var
 from core.util import sort_by_pattern
 from core.util.errors import OperationTypeError
 from core.raster import Raster
 from core.logic import Context
 from core.logic.executor import ProcessingExecutor
+from core.logic.op import find_read_window
 from core.logic.processor import FileProcessor, LinkProcessor
-from core.operations import Read, Write, Stack
+from core.operations import Read, Write, Stack, Select, RasterClip
 
 class TestProcessor(unittest.TestCase):
     def setUp(self) -> None:
@@ -96,4 +100,89 @@ class TestProcessor(unittest.TestCase):
         l_processor.set_executor(executor)
         with self.subTest('test link processor'):
             for raster_list in l_processor.preprocess():
-                self.assertEqual(len(raster_list), 2)
\ No newline at end of file
+                self.assertEqual(len(raster_list), 2)
+
+    def test_link_processor_shared_upstream(self):
+        # diamond : file -> (select_1, select_2) -> stack, the file processor runs once per file
+        file_size = len(list(Path(self.tif_src_1).glob('*.tif')))
+        f_processor = FileProcessor(proc_name="file", path=self.tif_src_1, pattern='*.tif', sort=None, splittable=True).add_op(Read(module='gdal'))
+        l_processor_1 = LinkProcessor(proc_name="select_1", processors=[f_processor]).add_op(Select(bands=[1]))
+        l_processor_2 = LinkProcessor(proc_name="select_2", processors=[f_processor]).add_op(Select(bands=[1]))
+        end_processor = LinkProcessor(proc_name="stack", processors=[l_processor_1, l_processor_2]).add_op(Stack())
+        f_processor.share_results(2)
+
+        end_processor.set_all_op_types()
+        end_processor.chaining()
+        end_processor.set_executor(ProcessingExecutor(Context(None)))
+
+        results = list(end_processor.execute())
+
+        with self.subTest('each processor runs once per file'):
+            self.assertEqual(len(results), file_size)
+            self.assertEqual(f_processor.ops[0].counter, file_size)
+            self.assertEqual(l_processor_1.ops[0].counter, file_size)
+            self.assertEqual(l_processor_2.ops[0].counter, file_size)
+            self.assertEqual(end_processor.ops[0].counter, file_size)
+
+        with self.subTest('consumers get their own raster'):
+            for raster in results:
+                self.assertTrue(isinstance(raster, Raster))
+                self.assertEqual(raster.get_bands_size(), 2)
+
+        with self.subTest('shared upstream runs again for the next execution'):
+            self.assertEqual(len(list(end_processor.execute())), file_size)
+            self.assertEqual(f_processor.ops[0].counter, file_size * 2)
+
+    def test_file_processor_prefetch(self):
+        file_size = len(list(Path(self.tif_src_1).glob('*.tif')))
+        executor = ProcessingExecutor(Context(None))
+        processors = []
+        for prefetch in [0, 2]:
+            processor = FileProcessor(proc_name=f'prefetch_{prefetch}', path=[self.tif_src_1], pattern='*.tif', prefetch=prefetch) \
+                .add_op(Read(module='gdal')) \
+                .add_op(Select(bands=[1]))
+            processor.set_executor(executor)
+            processors.append(processor)
+
+        results = [list(processor.execute()) for processor in processors]
+
+        with self.subTest('read ahead results keep the file order'):
+            self.assertEqual(len(results[1]), file_size)
+            self.assertEqual([raster.path for raster in results[0]], [raster.path for raster in results[1]])
+            self.assertEqual(processors[1].ops[0].counter, file_size)
+            self.assertEqual(processors[1].ops[1].counter, file_size)
+
+        with self.subTest('reads ahead of a stopped run are discarded'):
+            gen = processors[1].execute()
+            next(gen)
+            gen.close()
+            self.assertLessEqual(processors[1].ops[0].counter, file_size + 3)
+
+    def test_read_window_pushdown(self):
+        path = str(sorted(Path(self.tif_src_1).glob('*.tif'))[0])
+        lons, lats = zip(*gdal.Info(path, format='json')['wgs84Extent']['coordinates'][0])
+        min_x, max_x, min_y, max_y = min(lons), max(lons), min(lats), max(lats)
+        # the central quarter of the scene
+        bounds = [min_x + (max_x - min_x) / 4, max_y - (max_y - min_y) / 4, max_x - (max_x - min_x) / 4, min_y + (max_y - min_y) / 4]
+
+        results, processors = [], []
+        for push_down in [True, False]:
+            processor = FileProcessor(proc_name=f'window_{push_down}', path=[path], pattern='*.tif') \
+                .add_op(Read(module='gdal')) \
+                .add_op(Select(bands=[1])) \
+                .add_op(RasterClip(bounds=bounds))
+            processor.set_all_op_types()
+            processor.chaining()
+            if not push_down:
+                processor.ops[0].set_window(None)
+            processor.set_executor(ProcessingExecutor(Context(None)))
+            results.append(list(processor.execute())[0])
+            processors.append(processor)
+
+        with self.subTest('the clip is pushed down to the read'):
+            self.assertIsNotNone(find_read_window(processors[0].ops))
+            self.assertEqual(processors[0].ops[0]._window_bounds, processors[0].ops[2].bounds)
+
+        with self.subTest('the same pixels are clipped'):
+            self.assertEqual(results[0].raw.GetGeoTransform(), results[1].raw.GetGeoTransform())
+            np.testing.assert_array_equal(results[0].raw.ReadAsArray(), results[1].raw.ReadAsArray())
@@ -0,0 +1,82 @@
+import os
+import json
+import unittest
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from core.util import expand_var
+from core.logic import Context
+from core.logic.executor import ProcessingExecutor, ResultCache, normalize_param, input_key, op_fingerprint, op_key
+from core.logic.processor import FileProcessor
+from core.operations import Read, Write, Select
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tif_src_1 = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test', 'tif', 's1', 'gdal', 'src_1'))
+        self.file_size = len(list(Path(self.tif_src_1).glob('*.tif')))
+
+    def test_keys(self):
+        with self.subTest('parameters are normalised'):
+            self.assertEqual(normalize_param({'b': (1, 2), 'a': Path('x')}), {'a': 'x', 'b': [1, 2]})
+            self.assertEqual(normalize_param(np.arange(4)), normalize_param(np.arange(4)))
+            self.assertNotEqual(normalize_param(np.arange(4)), normalize_param(np.arange(1, 5)))
+
+        with self.subTest('op keys depend on the parameters and the previous key'):
+            self.assertEqual(op_fingerprint(Select(bands=[1])), op_fingerprint(Select(bands=[1])))
+            self.assertNotEqual(op_fingerprint(Select(bands=[1])), op_fingerprint(Select(bands=[2])))
+            fingerprint = op_fingerprint(Select(bands=[1]))
+            self.assertNotEqual(op_key('a', fingerprint), op_key('b', fingerprint))
+
+        with self.subTest('file keys change with the file'):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, 'a.tif')
+                Path(path).write_bytes(b'1')
+                key = input_key(path)
+                self.assertEqual(key, input_key(path))
+                Path(path).write_bytes(b'12')
+                self.assertNotEqual(key, input_key(path))
+                self.assertIsNone(input_key((0, None)))
+
+    def _run(self, cache:ResultCache, out_dir:str, bands:list) -> tuple[FileProcessor, list]:
+        processor = FileProcessor(proc_name='cached', path=self.tif_src_1, pattern='*.tif', sort=None, splittable=True) \
+            .add_op(Read(module='gdal')) \
+            .add_op(Select(bands=bands)) \
+            .add_op(Write(out_dir=out_dir, out_stem='out'))
+        processor.set_executor(ProcessingExecutor(Context(None), result_cache=cache))
+        return processor, list(processor.execute())
+
+    def test_reuse_results(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResultCache(os.path.join(tmp_dir, 'cache'))
+
+            processor, first_out = self._run(cache, os.path.join(tmp_dir, 'first'), [1])
+            with self.subTest('results of cached ops are stored'):
+                self.assertEqual(cache.stores, self.file_size)
+                self.assertEqual(cache.hits, 0)
+                self.assertEqual(processor.ops[1].counter, self.file_size)
+
+            processor, second_out = self._run(cache, os.path.join(tmp_dir, 'second'), [1])
+            with self.subTest('ops before the hit are skipped and the write still runs'):
+                self.assertEqual(cache.hits, self.file_size)
+                self.assertEqual(processor.ops[0].counter, 0)
+                self.assertEqual(processor.ops[1].counter, 0)
+                self.assertEqual(len(second_out), len(first_out))
+                for out_path in second_out:
+                    self.assertTrue(Path(out_path).exists())
+
+            processor, _ = self._run(cache, os.path.join(tmp_dir, 'third'), [2])
+            with self.subTest('changed parameters miss the cache'):
+                self.assertEqual(cache.hits, self.file_size)
+                self.assertEqual(processor.ops[1].counter, self.file_size)
+
+    def test_lru_eviction(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ResultCache(os.path.join(tmp_dir, 'cache'), max_size=1)
+            self._run(cache, os.path.join(tmp_dir, 'out'), [1])
+
+            entries = list(Path(tmp_dir, 'cache').glob('*.json'))
+            self.assertEqual(len(entries), 1)
+            with open(entries[0]) as f:
+                self.assertTrue(Path(tmp_dir, 'cache', json.load(f)['file']).exists())
@@ -0,0 +1,54 @@
+import os, gc, unittest
+import numpy as np
+from unittest import mock
+
+from core.logic import Context
+from core.util import expand_var
+from core.operations import Read
+from core.operations.cached import BackCoef, CachedSpeckleFilter, BandMath
+
+class TestWindowOp(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data_root = expand_var(os.path.join('$PROJECT_PATH', 'data', 'test'))
+        self.s1_tif_path = os.path.join(self.data_root, 'tif', 's1', 'gdal', 'src_1', 'terrain_corrected_0.tif')
+
+    def _assert_same_raster(self, full_raster, window_raster):
+        self.assertEqual(full_raster.get_band_names(), window_raster.get_band_names())
+        np.testing.assert_allclose(full_raster.raw.ReadAsArray(), window_raster.raw.ReadAsArray(), rtol=1e-5, equal_nan=True)
+
+    def test_back_coef_by_window(self):
+        context = Context(None)
+        full_raster = BackCoef()(Read(module='gdal')(self.s1_tif_path, context), context)
+        window_raster = BackCoef(window_size=128)(Read(module='gdal')(self.s1_tif_path, context), context)
+        self._assert_same_raster(full_raster, window_raster)
+
+    def test_window_output_on_disk(self):
+        # scratch outputs over the /vsimem threshold are temporary files removed with their dataset
+        context = Context(None)
+        with mock.patch('core.util.gdal.gdal_ds.SCRATCH_VSIMEM_BYTES', 0):
+            window_raster = BackCoef(window_size=128)(Read(module='gdal')(self.s1_tif_path, context), context)
+        out_path = window_raster.raw.GetDescription()
+        self.assertEqual(window_raster.raw.GetDriver().ShortName, 'GTiff')
+        self.assertTrue(os.path.exists(out_path))
+
+        full_raster = BackCoef()(Read(module='gdal')(self.s1_tif_path, context), context)
+        self._assert_same_raster(full_raster, window_raster)
+
+        window_raster = None
+        gc.collect()
+        self.assertFalse(os.path.exists(out_path))
+
+    def test_speckle_filter_by_window(self):
+        context = Context(None)
+        with self.subTest('windows with halo'):
+            full_raster = CachedSpeckleFilter(drop_other_bands=True)(Read(module='gdal')(self.s1_tif_path, context), context)
+            window_raster = CachedSpeckleFilter(drop_other_bands=True, window_size=100)(Read(module='gdal')(self.s1_tif_path, context), context)
+            self._assert_same_raster(full_raster, window_raster)
+
+        with self.subTest('block aligned windows'):
+            window_raster = CachedSpeckleFilter(drop_other_bands=True, window_size='block')(Read(module='gdal')(self.s1_tif_path, context), context)
+            self._assert_same_raster(full_raster, window_raster)
+
+    def test_band_math_window_with_normalize(self):
+        with self.assertRaises(AssertionError):
+            BandMath(func_name='sort_by_name', func_target_bands=[1, 2], normalize=True, window_size=256)
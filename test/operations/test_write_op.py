@@ -2,10 +2,11 @@ import os
 import re
 import unittest
 import locale
+import tempfile
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from core.util import expand_var, Logger
+from core.util import expand_var, Logger, WriteBehind
 from core.operations import Write, Read
 from core.logic import Context
 
@@ -155,4 +156,27 @@ class TestWriteOp(unittest.TestCase):
             ge_raster = Read(module='gdal')(self.ge_xml_path, context)
             for i in range(3):
                 date_obj = date_obj + timedelta(days=i)
-                Write(out_dir=out_dir, out_stem=f'{date_obj.strftime("%y%b%d%H%M%S")}-{"_".join(Path(self.ge_xml_path).stem.split("-")[1:])}', out_ext='tif')(ge_raster)
\ No newline at end of file
+                Write(out_dir=out_dir, out_stem=f'{date_obj.strftime("%y%b%d%H%M%S")}-{"_".join(Path(self.ge_xml_path).stem.split("-")[1:])}', out_ext='tif')(ge_raster)
+
+    def test_write_behind(self):
+        context = Context(None)
+        write_behind = WriteBehind.get_write_behind()
+        write_behind.enable(workers=2, max_pending=2)
+        try:
+            with tempfile.TemporaryDirectory() as out_dir:
+                out_paths = []
+                for i in range(3):
+                    raster = Read(module='gdal')(self.s1_tif_gdal_path, context)
+                    write_op = Write(out_dir=out_dir, out_stem='behind', out_ext='tif')
+                    write_op.counter = i
+                    out_paths.append(write_op(raster))
+
+                with self.subTest('written outputs can be read back'):
+                    raster = Read(module='gdal')(out_paths[0], context)
+                    self.assertEqual(raster.get_bands_size(), Read(module='gdal')(self.s1_tif_gdal_path, context).get_bands_size())
+
+                write_behind.flush()
+                for out_path in out_paths:
+                    self.assertTrue(Path(out_path).exists())
+        finally:
+            write_behind.shutdown()
@@ -0,0 +1,69 @@
+import os
+import unittest
+import tempfile
+import numpy as np
+from osgeo import gdal, ogr, osr
+
+from core.logic import Context
+from core.operations import Read, ZonalStats
+from core.util.gdal import create_ds_with_arr, create_envelope
+
+ULX, ULY, PSIZE = 300000., 4100000., 10.
+
+def _make_zones(path:str, boxes:list[tuple[int, int, int, int]]):
+    # boxes of (col_off, row_off, cols, rows) in pixels of the raster
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(32652)
+    ds = ogr.GetDriverByName('GPKG').CreateDataSource(path)
+    layer = ds.CreateLayer('zones', srs, ogr.wkbPolygon)
+    layer.CreateField(ogr.FieldDefn('parcel', ogr.OFTString))
+    for i, (col, row, cols, rows) in enumerate(boxes):
+        min_x, max_x = ULX + col * PSIZE, ULX + (col + cols) * PSIZE
+        max_y, min_y = ULY - row * PSIZE, ULY - (row + rows) * PSIZE
+        feat = ogr.Feature(layer.GetLayerDefn())
+        feat.SetField('parcel', f'p{i}')
+        feat.SetGeometry(create_envelope(min_x, max_y, max_x, max_y, max_x, min_y, min_x, min_y))
+        layer.CreateFeature(feat)
+    ds = None
+
+class TestZonalStatsOp(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.arr = rng.uniform(1, 100, (2, 90, 70)).astype(np.float32)
+        self.boxes = [(5, 5, 20, 30), (40, 50, 25, 35)]
+
+    def test_zonal_stats(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            srs = osr.SpatialReference()
+            srs.ImportFromEPSG(32652)
+            tif_path = os.path.join(tmp_dir, 'src.tif')
+            mem_ds = create_ds_with_arr(self.arr.copy(), gdal_format='MEM', proj_wkt=srs.ExportToWkt(), transform=(ULX, PSIZE, 0, ULY, 0, -PSIZE))
+            gdal.GetDriverByName('GTiff').CreateCopy(tif_path, mem_ds).FlushCache()
+            zone_path = os.path.join(tmp_dir, 'zones.gpkg')
+            _make_zones(zone_path, self.boxes)
+
+            context = Context(None)
+            raster = Read(module='gdal')(tif_path, context)
+            band_name = raster.get_band_names()[1]
+
+            # windows smaller than the zones, so they are accumulated over several windows
+            out_path = ZonalStats(vector_path=zone_path, out_dir=tmp_dir, bands=[band_name], percentiles=[50], window_size=16)(raster, context)
+
+            out_ds = ogr.Open(out_path)
+            features = list(out_ds.GetLayer())
+            self.assertEqual([feat.GetField('parcel') for feat in features], ['p0', 'p1'])
+
+            for feat, (col, row, cols, rows) in zip(features, self.boxes):
+                values = self.arr[1, row:row + rows, col:col + cols].astype(np.float64)
+                self.assertEqual(feat.GetField(f'{band_name}_count'), values.size)
+                self.assertAlmostEqual(feat.GetField(f'{band_name}_mean'), values.mean(), places=4)
+                self.assertAlmostEqual(feat.GetField(f'{band_name}_std'), values.std(), places=4)
+                self.assertAlmostEqual(feat.GetField(f'{band_name}_min'), values.min(), places=4)
+                self.assertAlmostEqual(feat.GetField(f'{band_name}_max'), values.max(), places=4)
+                # percentiles come from histograms of 256 bins between the min and max of the zone
+                self.assertLessEqual(abs(feat.GetField(f'{band_name}_p50') - np.median(values)), (values.max() - values.min()) / 256)
+            out_ds = None
+
+    def test_invalid_stats(self):
+        with self.assertRaises(AssertionError):
+            ZonalStats(vector_path='zones.gpkg', out_dir='.', stats=['median'])
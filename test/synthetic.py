@@ -0,0 +1,35 @@
+import numpy as np
+from osgeo import ogr, osr
+
+from core.util.gdal import create_ds, create_ds_with_arr, create_envelope
+
+## synthetic datasets shared by the tests, like benchmarks/synthetic.py for the benchmarks
+
+EPSG = 32652
+
+def make_ds(arr:np.ndarray, ulx:float=300000., uly:float=4100000., psize:float=10.):
+    # MEM dataset of a copy of arr on a utm grid, 0 is the no data value of every band
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(EPSG)
+    ds = create_ds_with_arr(arr.copy(), gdal_format='MEM', proj_wkt=srs.ExportToWkt(), transform=(ulx, psize, 0, uly, 0, -psize))
+    for i in range(ds.RasterCount):
+        ds.GetRasterBand(i+1).SetNoDataValue(0)
+    return ds
+
+def make_grid_ds(gdal_format:str='Memory', out_path:str='', size:int=10, fields:dict=None):
+    # size x size unit squares, every field holds the index of the cell
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(EPSG)
+    fields = fields if fields else {'cell': ogr.OFTInteger}
+    field_defs = [ogr.FieldDefn(name, field_type) for name, field_type in fields.items()]
+    ds = create_ds(gdal_format=gdal_format, is_vector=True, out_path=out_path, geom_type=ogr.wkbPolygon, field_defs=field_defs,
+                   proj_wkt=srs.ExportToWkt())
+    layer = ds.GetLayer()
+    for row in range(size):
+        for col in range(size):
+            feat = ogr.Feature(layer.GetLayerDefn())
+            for name in fields:
+                feat.SetField(name, row * size + col)
+            feat.SetGeometry(create_envelope(col, row + 1, col + 1, row + 1, col + 1, row, col, row))
+            layer.CreateFeature(feat)
+    return ds